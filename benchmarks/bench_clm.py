@@ -0,0 +1,319 @@
+import os
+import io
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+import subprocess
+from datetime import datetime
+from contextlib import contextmanager
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+import clm_client  # noqa: E402
+from clm_simulator import CLMSimulator, SimulatorConfig  # noqa: E402
+
+BENCHMARKS = []
+
+# Hard ceiling on the HTML the catalog sends per rerun (3.8 KB now, 15.8 KB before static_assets);
+# exceeding it fails the run whether or not a baseline exists
+CATALOG_EMITTED_BYTES_LIMIT = 5000
+
+def benchmark(name):
+    """Register a benchmark; the function returns (operations, extra metrics) for one timed run"""
+    def register(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return register
+
+class BenchSession(dict):
+    """Plain stand-in for st.session_state, which is always empty outside `streamlit run`"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
+def build_attribute_tree(groups, attributes_per_group):
+    """Build a document payload shaped like get_document_attributes output"""
+    return {
+        "Name": "Benchmark Document.pdf",
+        "AttributeGroups": {
+            f"Group {g}": {
+                f"Attribute {a}": {"AttributeType": "Text", "Value": f"Status: Contract Review {g}.{a}"}
+                for a in range(attributes_per_group)
+            }
+            for g in range(groups)
+        }
+    }
+
+@benchmark("docgen_configurations_pagination")
+def bench_pagination(app, context):
+    result = app.get_docgen_configurations(context['account_id'])
+    items = len(result['Items']) if result else 0
+    return context['pages'], {'items': items}
+
+@benchmark("doc_launcher_task_submission")
+def bench_task_submission(app, context):
+    submissions = context['task_submissions']
+    for _ in range(submissions):
+        app.create_doc_launcher_task(
+            context['account_id'],
+            f"{context['base_url']}/v2/{context['account_id']}/doclauncherconfigurations/bench",
+            '<Params><Source>Benchmark</Source></Params>'
+        )
+    return submissions, {}
+
+def make_filter_benchmark(groups, attributes_per_group):
+    tree = build_attribute_tree(groups, attributes_per_group)
+    nodes = groups * attributes_per_group
+
+    def bench_filter(app, context):
+        matches = app.filter_attributes(tree, "contract review")
+        return nodes, {'nodes': nodes, 'matches': len(matches)}
+    return bench_filter
+
+for _groups, _per_group in [(5, 20), (20, 50), (50, 200), (100, 1000)]:
+    benchmark(f"filter_attributes_{_groups * _per_group}_attributes")(make_filter_benchmark(_groups, _per_group))
+
+@benchmark("serialize_for_logging")
+def bench_serialize(app, context):
+    document = context['document']
+    iterations = 200
+    for _ in range(iterations):
+        clm_client.serialize_for_logging(document)
+    return iterations, {}
+
+@benchmark("log_api_call")
+def bench_log_api_call(app, context):
+    document = context['document']
+    iterations = 200
+    for _ in range(iterations):
+        clm_client.log_api_call("GET", "https://example.invalid/v2/documents/1", response_data=document)
+    return iterations, {}
+
+@benchmark("dict_to_sourcing_xml")
+def bench_sourcing_xml(app, context):
+    iterations = 20000
+    customers = app.DUMMY_CUSTOMERS
+    for index in range(iterations):
+        app.st.session_state.sourcing_data = {
+            "agreement_type": app.AGREEMENT_TYPES[index % len(app.AGREEMENT_TYPES)],
+            "customer": customers[index % len(customers)]
+        }
+        app.dict_to_sourcing_xml()
+    return iterations, {}
+
+@benchmark("concurrent_document_reads")
+def bench_concurrent_reads(app, context):
+    """Many sessions opening the same document at once; counts the requests that reach CLM"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    readers = 32
+    state = context['simulator'].server.state
+    state.config.latency_ms = 50
+    requests_before = state.request_count
+    try:
+        with ThreadPoolExecutor(max_workers=readers) as executor:
+            documents = list(executor.map(
+                lambda _: app.get_document_attributes(context['account_id'], 'shared-document'), range(readers)
+            ))
+    finally:
+        state.config.latency_ms = 0
+    if not all(documents):
+        raise RuntimeError("A concurrent document read failed")
+    return readers, {'upstream_requests': state.request_count - requests_before}
+
+@benchmark("catalog_render")
+def bench_catalog_render(app, context):
+    """Render the catalog view headlessly and measure the HTML it sends to the browser"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(SRC_DIR, 'app.py'), default_timeout=30)
+    at.session_state.authenticated = True
+    at.session_state.token_data = {
+        'access_token': 'benchmark-token',
+        'refresh_token': 'benchmark-refresh-token',
+        'token_type': 'Bearer',
+        'expires_in': 28800,
+        'timestamp': datetime.now().isoformat()
+    }
+    at.session_state.account_id = context['account_id']
+    # The script needs the real session state, not the shim the other benchmarks use
+    shim, app.st.session_state = app.st.session_state, context['session_state']
+    try:
+        at.run()
+    finally:
+        app.st.session_state = shim
+    if at.exception:
+        raise RuntimeError(f"Catalog view failed: {at.exception[0].value}")
+    emitted_bytes = sum(len(element.value.encode('utf-8')) for element in at.markdown)
+    return 1, {'markdown_elements': len(at.markdown), 'emitted_bytes': emitted_bytes,
+               'emitted_bytes_limit': CATALOG_EMITTED_BYTES_LIMIT}
+
+@contextmanager
+def working_directory(path):
+    saved = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(saved)
+
+def run_benchmarks(selected=None, repeat=5, configurations=5000, task_submissions=200):
+    """Run the registered benchmarks against a local simulator and return the results document"""
+    config = SimulatorConfig(configuration_count=configurations, result_urls=False, seed=1)
+    # The app writes logs, tokens and its task ledger under the working directory; keep them out of the repo
+    with CLMSimulator(config) as simulator, tempfile.TemporaryDirectory() as scratch, working_directory(scratch):
+        os.environ.update(simulator.environment)
+        os.environ['TASK_LEDGER_DB'] = os.path.join(scratch, 'ledger.db')
+        import app  # Reads the base URLs from the environment on import
+
+        # Route log output to memory so the logging benchmarks measure formatting, not the terminal
+        root_logger = logging.getLogger()
+        saved_handlers = root_logger.handlers[:]
+        root_logger.handlers = [logging.StreamHandler(io.StringIO())]
+
+        saved_session_state = app.st.session_state
+        app.st.session_state = BenchSession(token_data={'access_token': 'benchmark-token'})
+        context = {
+            'account_id': 'benchmark-account',
+            'base_url': simulator.base_url,
+            'pages': -(-configurations // 100),
+            'task_submissions': task_submissions,
+            'document': build_attribute_tree(20, 50),
+            'session_state': saved_session_state,
+            'simulator': simulator
+        }
+
+        results = {}
+        try:
+            for name, func in BENCHMARKS:
+                if selected and not any(pattern in name for pattern in selected):
+                    continue
+                timings = []
+                extra = {}
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    operations, extra = func(app, context)
+                    timings.append(time.perf_counter() - start)
+                median = statistics.median(timings)
+                results[name] = {
+                    'operations': operations,
+                    'median_seconds': median,
+                    'min_seconds': min(timings),
+                    'max_seconds': max(timings),
+                    'ops_per_second': operations / median if median else None,
+                    **extra
+                }
+                print(f"{name:45s} {results[name]['ops_per_second']:>14,.1f} ops/s  (median {median * 1000:.2f} ms)")
+        finally:
+            app.st.session_state = saved_session_state
+            root_logger.handlers = saved_handlers
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'commit': current_commit(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=SRC_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def check_limits(results):
+    """Return the benchmarks whose emitted payload is over its hard limit"""
+    failures = []
+    for name, current in results['results'].items():
+        limit = current.get('emitted_bytes_limit')
+        if limit is not None and current.get('emitted_bytes', 0) > limit:
+            print(f"{name:45s} emitted {current['emitted_bytes']} bytes, limit {limit}  FAILED")
+            failures.append(name)
+    return failures
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of regressions: benchmarks whose throughput fell or whose emitted payload grew"""
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous and previous.get('emitted_bytes') and current.get('emitted_bytes') is not None:
+            # Payload size is deterministic, so any growth is worth a look
+            if current['emitted_bytes'] > previous['emitted_bytes']:
+                print(f"{name:45s} emitted {previous['emitted_bytes']} -> {current['emitted_bytes']} bytes  REGRESSION")
+                regressions.append(name)
+        if not previous or not previous.get('ops_per_second') or not current.get('ops_per_second'):
+            continue
+        change = current['ops_per_second'] / previous['ops_per_second'] - 1
+        marker = "REGRESSION" if change < -tolerance else "ok"
+        print(f"{name:45s} {change:+8.1%}  {marker}")
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    default_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark the CLM client and data-processing hot paths")
+    parser.add_argument('--only', action='append', help="Run only benchmarks whose name contains this text")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark (the median is reported)")
+    parser.add_argument('--configurations', type=int, default=5000, help="Simulated DocLauncher configurations")
+    parser.add_argument('--tasks', type=int, default=200, help="Task submissions per run")
+    parser.add_argument('--output', default=os.path.join(default_dir, 'results', 'latest.json'),
+                        help="Where to write the results JSON")
+    parser.add_argument('--baseline', default=os.path.join(default_dir, 'baseline.json'),
+                        help="Baseline results to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Allowed throughput drop before a benchmark counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, args.repeat, args.configurations, args.tasks)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    over_limit = check_limits(results)
+    if over_limit:
+        print(f"{len(over_limit)} benchmark(s) over their payload limit: {', '.join(over_limit)}")
+        return 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    else:
+        print("No baseline found, run with --save-baseline to create one")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+def profile_import(module, src_dir=SRC_DIR):
+    """Import a module in a fresh interpreter under -X importtime and return {module: (self_us, cumulative_us)}"""
+    code = f"import sys; sys.path.insert(0, {src_dir!r}); import {module}"
+    # Run in a scratch directory so the app's logs/ and .tokens/ folders don't land in the repo
+    with tempfile.TemporaryDirectory() as scratch:
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=scratch, capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def build_report(module, repeat, top):
+    """Profile the import several times and summarise the median cost of the heaviest modules"""
+    runs = [profile_import(module) for _ in range(repeat)]
+    total = statistics.median(run[module][1] for run in runs if module in run)
+    names = set().union(*runs)
+    heaviest = sorted(
+        ((name, statistics.median(run.get(name, (0, 0))[1] for run in runs)) for name in names if name != module),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    return {
+        'module': module,
+        'repeat': repeat,
+        'total_ms': total / 1000.0,
+        'modules_imported': len(names),
+        'heaviest': [{'module': name, 'cumulative_ms': us / 1000.0} for name, us in heaviest[:top]]
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report what importing the app costs at cold start")
+    parser.add_argument('--module', default='app', help="Module under src/ to import (default: app)")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters to profile (median is reported)")
+    parser.add_argument('--top', type=int, default=15, help="Number of heaviest imports to list")
+    parser.add_argument('--output', help="Also write the report as JSON to this path")
+    parser.add_argument('--compare', help="A previous JSON report to compare the total against")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.module, args.repeat, args.top)
+    print(f"Import of '{report['module']}': {report['total_ms']:.1f} ms "
+          f"(median of {report['repeat']}, {report['modules_imported']} modules)")
+    print("Heaviest imports (cumulative):")
+    for entry in report['heaviest']:
+        print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        change = report['total_ms'] - previous['total_ms']
+        print(f"Compared with {args.compare}: {previous['total_ms']:.1f} ms -> {report['total_ms']:.1f} ms ({change:+.1f} ms)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
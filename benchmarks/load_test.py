@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, SRC_DIR)
+
+from clm_simulator import CLMSimulator, SimulatorConfig  # noqa: E402
+from bench_clm import current_commit  # noqa: E402
+
+FLOWS = {}
+
+def flow(name):
+    """Register a scripted user journey; the function drives one SessionDriver through it once"""
+    def register(func):
+        FLOWS[name] = func
+        return func
+    return register
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def percentiles(values):
+    """p50/p90/p95/p99/max of a list of seconds, in milliseconds"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {'p50_ms': at(0.50), 'p90_ms': at(0.90), 'p95_ms': at(0.95), 'p99_ms': at(0.99),
+            'max_ms': ordered[-1] * 1000}
+
+class SessionDriver:
+    """
+    One headless browser session: an AppTest whose interactions are timed. Each interaction
+    is a full script run, including any st.rerun() it triggers, as a user would wait for it.
+    """
+
+    def __init__(self, account_id, think_seconds=0.0):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(os.path.join(SRC_DIR, 'app.py'), default_timeout=60)
+        self.at.session_state.authenticated = True
+        self.at.session_state.token_data = {
+            'access_token': 'load-test-token',
+            'refresh_token': 'load-test-refresh-token',
+            'token_type': 'Bearer',
+            'expires_in': 28800,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.at.session_state.account_id = account_id
+        self.think_seconds = think_seconds
+        self.timings = []
+
+    def run(self, step, widget=None):
+        """Rerun the script (after clicking or editing `widget`, if given) and record how long it took"""
+        if self.think_seconds:
+            time.sleep(self.think_seconds)
+        started = time.perf_counter()
+        if widget is not None:
+            widget.run()
+        else:
+            self.at.run()
+        self.timings.append((step, time.perf_counter() - started))
+        if self.at.exception:
+            raise RuntimeError(f"{step}: {self.at.exception[0].value}")
+
+    def button(self, label):
+        for button in self.at.button:
+            if button.label == label and not button.disabled:
+                return button
+        raise RuntimeError(f"No '{label}' button on the {self.at.session_state.current_view} page")
+
+    def text_input(self, label):
+        for text_input in self.at.text_input:
+            if text_input.label == label:
+                return text_input
+        raise RuntimeError(f"No '{label}' field on the {self.at.session_state.current_view} page")
+
+@flow("docgen")
+def docgen_flow(session):
+    """Catalog -> DocGen (pages in the configuration catalog) -> search -> create a task -> back"""
+    session.run("catalog")
+    session.run("open_docgen", session.at.button(key='btn_docgen_active').click())
+    session.run("search_configurations", session.text_input("Search Configurations").input("Configuration 1"))
+    session.run("create_task", session.button("Create DocLauncher Task").click())
+    session.run("back_to_catalog", session.button("← Back to Catalog").click())
+
+@flow("sourcing")
+def sourcing_flow(session):
+    """Catalog -> sourcing login -> agreement type -> customer -> create contract -> status refresh"""
+    session.run("catalog")
+    session.run("open_sourcing", session.at.button(key='btn_sourcing_login_active').click())
+    session.text_input("Username").input("load-test")
+    session.text_input("Password").input("load-test")
+    session.run("sourcing_login", session.button("Login").click())
+    session.run("agreement_type", session.button("Continue").click())
+    session.run("customer_selection", session.button("Continue").click())
+    session.run("create_contract", session.button("Create Contract").click())
+    session.run("status_refresh")
+    # The sourcing pages have no way back to the catalog once a contract is created
+    session.at.session_state.current_view = 'catalog'
+
+def run_session(index, flow_name, duration, think_seconds, barrier, results):
+    """Worker process: warm up one session, wait for the others, then loop its flow until time is up"""
+    # The app logs every API call; keep it out of the report
+    sys.stdout = sys.stderr = open(os.devnull, 'w')
+    rss_before = peak_rss_mb()
+    session = SessionDriver('load-test-account', think_seconds)
+    error = None
+    try:
+        # First run imports the app and builds its shared resources; reported as the cold start
+        session.run("cold_start")
+    except Exception as e:
+        error = f"cold start: {str(e)}"
+    cold_start = session.timings[0][1] if session.timings else None
+    session.timings = []
+    rss_warm = peak_rss_mb()
+
+    barrier.wait()
+    flows = failures = 0
+    errors = []
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    deadline = started + duration
+    while error is None and time.perf_counter() < deadline:
+        try:
+            FLOWS[flow_name](session)
+            flows += 1
+        except Exception as e:
+            failures += 1
+            errors.append(str(e))
+            # Start the next round from a clean slate, as a user reloading the page would
+            session.at.session_state.current_view = 'catalog'
+    results.put({
+        'session': index,
+        'flow': flow_name,
+        'flows': flows,
+        'failures': failures,
+        'errors': errors[:5] + ([error] if error else []),
+        'timings': session.timings,
+        'cold_start_seconds': cold_start,
+        'elapsed_seconds': time.perf_counter() - started,
+        'cpu_seconds': time.process_time() - cpu_started,
+        'rss_before_mb': rss_before,
+        'rss_warm_mb': rss_warm,
+        'rss_peak_mb': peak_rss_mb()
+    })
+
+def summarize(sessions, wall_seconds):
+    """Aggregate per-session reports into latency percentiles, throughput and per-session cost"""
+    timings = [seconds for report in sessions for _, seconds in report['timings']]
+    steps = {}
+    for report in sessions:
+        for step, seconds in report['timings']:
+            steps.setdefault(step, []).append(seconds)
+    reruns = len(timings)
+
+    def mean(key):
+        values = [report[key] for report in sessions if report[key] is not None]
+        return statistics.mean(values) if values else None
+
+    return {
+        'sessions': len(sessions),
+        'wall_seconds': wall_seconds,
+        'reruns': reruns,
+        'flows': sum(report['flows'] for report in sessions),
+        'failed_flows': sum(report['failures'] for report in sessions),
+        'reruns_per_second': reruns / wall_seconds if wall_seconds else None,
+        'flows_per_second': sum(report['flows'] for report in sessions) / wall_seconds if wall_seconds else None,
+        'rerun_latency': percentiles(timings),
+        'steps': {step: dict(percentiles(values), count=len(values)) for step, values in sorted(steps.items())},
+        'cold_start_ms': (mean('cold_start_seconds') or 0) * 1000,
+        'cpu_seconds_per_session': mean('cpu_seconds'),
+        'cpu_ms_per_rerun': sum(report['cpu_seconds'] for report in sessions) * 1000 / reruns if reruns else None,
+        'rss_warm_mb_per_session': mean('rss_warm_mb'),
+        'rss_peak_mb_per_session': mean('rss_peak_mb'),
+        'rss_growth_mb_per_session': (mean('rss_peak_mb') - mean('rss_warm_mb'))
+                                     if mean('rss_peak_mb') is not None else None,
+        'errors': sorted({message for report in sessions for message in report['errors']})[:10]
+    }
+
+def run_load_test(sessions=10, flow_name='mixed', duration=30.0, think_seconds=0.0,
+                  latency_ms=50, configurations=500):
+    """Start a simulator, run `sessions` concurrent sessions for `duration` seconds and summarise them"""
+    config = SimulatorConfig(configuration_count=configurations, latency_ms=latency_ms, seed=1)
+    flow_names = list(FLOWS) if flow_name == 'mixed' else [flow_name]
+    context = multiprocessing.get_context('spawn')
+    # Logs, tokens and the task ledger land in a scratch directory, not the repo
+    with CLMSimulator(config) as simulator, tempfile.TemporaryDirectory() as scratch:
+        saved_environment, saved_cwd = dict(os.environ), os.getcwd()
+        os.environ.update(simulator.environment)
+        os.environ['TASK_LEDGER_DB'] = os.path.join(scratch, 'ledger.db')
+        os.chdir(scratch)
+        try:
+            barrier = context.Barrier(sessions + 1)
+            results = context.Queue()
+            workers = [
+                context.Process(target=run_session,
+                                args=(index, flow_names[index % len(flow_names)], duration, think_seconds,
+                                      barrier, results))
+                for index in range(sessions)
+            ]
+            for worker in workers:
+                worker.start()
+            print(f"Warming up {sessions} sessions...")
+            barrier.wait()
+            started = time.perf_counter()
+            print(f"Running {flow_name} flows for {duration:.0f}s")
+            reports = [results.get() for _ in workers]
+            wall_seconds = time.perf_counter() - started
+            for worker in workers:
+                worker.join()
+        finally:
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_environment)
+        upstream_requests = simulator.server.state.request_count
+
+    summary = summarize(reports, wall_seconds)
+    summary['upstream_requests'] = upstream_requests
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'commit': current_commit(),
+            'flow': flow_name,
+            'duration_seconds': duration,
+            'think_seconds': think_seconds,
+            'simulator_latency_ms': latency_ms,
+            'configurations': configurations
+        },
+        'summary': summary,
+        'sessions': [{key: value for key, value in report.items() if key != 'timings'} for report in reports]
+    }
+
+def print_report(results):
+    summary = results['summary']
+    latency = summary['rerun_latency']
+    print(f"{summary['sessions']} sessions, {summary['flows']} flows ({summary['failed_flows']} failed), "
+          f"{summary['reruns']} reruns in {summary['wall_seconds']:.1f}s")
+    print(f"Throughput: {summary['reruns_per_second']:.1f} reruns/s, {summary['flows_per_second']:.2f} flows/s, "
+          f"{summary['upstream_requests']} simulator requests")
+    if latency:
+        print(f"Rerun latency: p50 {latency['p50_ms']:.0f} ms  p90 {latency['p90_ms']:.0f} ms  "
+              f"p95 {latency['p95_ms']:.0f} ms  p99 {latency['p99_ms']:.0f} ms  max {latency['max_ms']:.0f} ms")
+    for step, stats in summary['steps'].items():
+        print(f"  {step:25s} {stats['count']:6d} x  p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms")
+    print(f"Cold start: {summary['cold_start_ms']:.0f} ms per session")
+    if summary['cpu_ms_per_rerun'] is not None:
+        print(f"CPU: {summary['cpu_seconds_per_session']:.2f}s per session, {summary['cpu_ms_per_rerun']:.1f} ms per rerun")
+    if summary['rss_peak_mb_per_session'] is not None:
+        print(f"Memory: {summary['rss_warm_mb_per_session']:.0f} MB per session after warm-up, "
+              f"peak {summary['rss_peak_mb_per_session']:.0f} MB (+{summary['rss_growth_mb_per_session']:.1f} MB under load)")
+    for message in summary['errors']:
+        print(f"Error: {message}")
+
+def main(argv=None):
+    default_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(
+        description="Drive concurrent headless app sessions through scripted flows against the local simulator"
+    )
+    parser.add_argument('--sessions', type=int, default=10, help="Concurrent sessions")
+    parser.add_argument('--flow', choices=['mixed'] + sorted(FLOWS), default='mixed',
+                        help="Flow every session repeats; mixed alternates them across sessions")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of load after warm-up")
+    parser.add_argument('--think-ms', type=float, default=0,
+                        help="Pause before each interaction, as a user reading the page (0 = as fast as possible)")
+    parser.add_argument('--latency-ms', type=int, default=50, help="Simulated CLM response time")
+    parser.add_argument('--configurations', type=int, default=500, help="Simulated DocLauncher configurations")
+    parser.add_argument('--output', default=os.path.join(default_dir, 'results', 'load_test.json'),
+                        help="Where to write the results JSON")
+    args = parser.parse_args(argv)
+
+    results = run_load_test(args.sessions, args.flow, args.duration, args.think_ms / 1000.0,
+                            args.latency_ms, args.configurations)
+    print_report(results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 1 if results['summary']['failed_flows'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
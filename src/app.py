@@ -1,25 +1,36 @@
 import streamlit as st
 import os
+import hashlib
+import tempfile
 import logging
 
 print("--- Render App Start --- Python script is running! ---") # Basic test print
 
 from datetime import datetime
-from dotenv import load_dotenv
 from docusign_auth import DocuSignAuth
-import webbrowser
+from config_catalog import ConfigCatalog
+from payload_templates import PayloadTemplateError, SOURCING_TEMPLATE, DOCGEN_PARAMS_TEMPLATE
+from customer_directory import customer_id, get_customer_directory
+from payload_stream import detect_format, preview_payloads, template_for_columns, wrap_binary_upload
+from static_assets import feature_card_html, inject_assets
+from image_assets import card_image_url
+from logo_store import LogoError, LogoStore
+from status_tracker import StatusTracker
+from request_coalescer import RequestCoalescer
+from rerun_profiler import ENABLED as PROFILING_ENABLED, begin_rerun, end_rerun, stage, timed
+from region_routing import RegionResolver, make_probe
+from task_ledger import TaskLedger, reconcile_pending
+from document_updates import DocumentUpdate, apply_updates, iter_updates, summarize
+from workflow_launcher import DEFAULT_RATE_PER_SECOND, WorkflowLaunch, iter_workflow_launches, launch_workflows, limiter_for
+from webhook_receiver import DEFAULT_WEBHOOK_PORT, EventStore, WebhookReceiver, secrets_from_environment, update_ledger
+from xml_merge import detect_merge_format, iter_merge_records, load_merge_template, validate_payload, write_merged
 import json
-import requests
-
-# GitHub raw content URLs
-REPO_URL = "https://raw.githubusercontent.com/Ryflx/CLM-API-Examples/main"
-FEATURE_IMAGES = {
-    "form": f"{REPO_URL}/src/image/form.png",
-    "metadata": f"{REPO_URL}/src/image/metadata.png",
-    "add-document": f"{REPO_URL}/src/image/add-document.png",
-    "work-in-progress": f"{REPO_URL}/src/image/work-in-progress.png",
-    "negotiation": f"{REPO_URL}/src/image/negotiation.png"
-}
+
+# Account holding the Purchase Agreement DocLauncher configuration used by the sourcing flow
+SOURCING_ACCOUNT_ID = "26238559-d602-4e8a-801e-27ca5cfdb446"
+
+# Maximum number of configurations handed to the DocGen selector at once
+CONFIG_SEARCH_LIMIT = 50
 
 # Get configuration from environment variables (Render compatible)
 def get_config(key):
@@ -29,51 +40,36 @@ def get_config(key):
     #     st.warning(f"Environment variable '{key}' not set.") 
     return value
 
-# Configure logging
-log_directory = "logs"
-if not os.path.exists(log_directory):
-    os.makedirs(log_directory)
-
-log_filename = os.path.join(log_directory, f"api_{datetime.now().strftime('%Y%m%d')}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-def serialize_for_logging(obj):
-    """Convert objects to JSON-serializable format"""
-    if hasattr(obj, 'to_dict'):
-        return obj.to_dict()
-    elif hasattr(obj, '__dict__'):
-        return obj.__dict__
-    elif isinstance(obj, (list, tuple)):
-        return [serialize_for_logging(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: serialize_for_logging(v) for k, v in obj.items()}
-    return str(obj)
+# Base URL, overridable so the app can target another environment; CLM hosts come from region_routing
+TELEMETRY_SERVICE_URL = (get_config('TELEMETRY_SERVICE_URL') or "https://telemetry-service.onrender.com").rstrip('/')
+
+@st.cache_resource
+def configure_logging():
+    """Set up file and console logging once per process rather than on every rerun"""
+    log_directory = "logs"
+    if not os.path.exists(log_directory):
+        os.makedirs(log_directory)
+
+    log_filename = os.path.join(log_directory, f"api_{datetime.now().strftime('%Y%m%d')}.log")
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_filename),
+            logging.StreamHandler()
+        ]
+    )
+    return logging.getLogger(__name__)
 
-# Initialize DocuSign authentication
-auth_handler = DocuSignAuth()
+logger = configure_logging()
 
-def log_api_call(method, endpoint, request_data=None, response_data=None, error=None):
-    """Log API call details"""
-    try:
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "method": method,
-            "endpoint": endpoint,
-            "request": serialize_for_logging(request_data) if request_data else None,
-            "response": serialize_for_logging(response_data) if response_data else None,
-            "error": str(error) if error else None
-        }
-        logger.info(f"API Call: {json.dumps(log_entry, indent=2)}")
-    except Exception as e:
-        logger.error(f"Failed to log API call: {str(e)}")
+@st.cache_resource
+def get_auth_handler():
+    """Create the DocuSign authentication handler once per process"""
+    return DocuSignAuth()
+
+# Initialize DocuSign authentication
+auth_handler = get_auth_handler()
 
 def handle_callback():
     """Handle the OAuth callback"""
@@ -114,6 +110,7 @@ def handle_callback():
             if 'client_id' in st.session_state:
                 print(f"DEBUG [handle_callback-ERROR]: client_id first few chars: {st.session_state.client_id[:8]}...")
 
+@timed()
 def check_token():
     """Check and refresh token if necessary"""
     if 'token_data' in st.session_state:
@@ -132,152 +129,101 @@ def check_token():
         return True
     return False
 
-def get_docgen_configurations(account_id, max_retries=3):
-    """Get list of docgen configurations with pagination support"""
-    try:
-        headers = {
-            'Authorization': f"Bearer {st.session_state.token_data['access_token']}",
-            'Content-Type': 'application/json'
-        }
-
-        all_items = []
-        next_url = f"https://apiuatna11.springcm.com/v2/{account_id}/doclauncherconfigurations?limit=100"
-
-        while next_url:
-            retry_count = 0
-            while retry_count < max_retries:
-                try:
-                    log_api_call("GET", next_url)
-                    response = requests.get(next_url, headers=headers)
-                    
-                    # Check if we got a 500 error
-                    if response.status_code == 500:
-                        retry_count += 1
-                        if retry_count < max_retries:
-                            st.warning(f"Server error, retrying... (Attempt {retry_count + 1}/{max_retries})")
-                            continue
-                        else:
-                            st.error("Maximum retries reached. Please try again later.")
-                            return None
-                    
-                    # For other errors, try to get more details
-                    if response.status_code != 200:
-                        try:
-                            error_data = response.json()
-                            error_msg = error_data.get('Message', response.text)
-                        except:
-                            error_msg = response.text
-                        st.error(f"API Error ({response.status_code}): {error_msg}")
-                        return None
-                    
-                    response_data = response.json()
-                    log_api_call("GET", next_url, response_data=response_data)
-                    
-                    if 'Items' in response_data:
-                        all_items.extend(response_data['Items'])
-                    
-                    # Check if there are more pages
-                    next_url = response_data.get('Next')
-                    if next_url:
-                        st.write(f"Fetching more configurations... ({len(all_items)} so far)")
-                    
-                    break  # Success, exit retry loop
-                    
-                except requests.exceptions.RequestException as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        st.warning(f"Connection error, retrying... (Attempt {retry_count + 1}/{max_retries})")
-                        continue
-                    else:
-                        st.error(f"Failed to connect after {max_retries} attempts: {str(e)}")
-                        return None
-
-        # Create final response with all items
-        final_response = {
-            'Items': all_items,
-            'Total': len(all_items)
-        }
-        
-        # Debug logging
-        st.write(f"Total configurations found: {len(all_items)}")
-        
-        return final_response
+@st.cache_resource
+def get_http_session():
+    """Share one HTTP connection pool to CLM across reruns and sessions"""
+    from clm_client import make_session
+    return make_session()
+
+@st.cache_resource
+def get_logo_store():
+    """One on-disk logo store shared by every session"""
+    return LogoStore()
+
+def show_logo(width=150):
+    """Display the session's logo thumbnail; returns False when no logo is set"""
+    path = get_logo_store().path(st.session_state.get('logo_id'))
+    if not path:
+        return False
+    st.image(path, width=width)
+    return True
+
+@st.cache_resource
+def get_task_ledger():
+    """One task ledger connection shared across reruns and sessions"""
+    return TaskLedger()
+
+@st.cache_resource
+def get_request_coalescer():
+    """Lets sessions reading the same CLM data at the same moment share one request"""
+    return RequestCoalescer()
+
+@st.cache_resource
+def get_region_resolver():
+    """Routes each account to its region's fastest healthy CLM host, shared by all sessions"""
+    return RegionResolver.from_environment(probe=make_probe(get_http_session()))
+
+def get_clm_client(max_retries=3):
+    """Build a CLM API client for the current session, reporting retries in the UI"""
+    # Imported on first use so cold starts don't pay for requests
+    from clm_client import CLMClient
+    return CLMClient(
+        st.session_state.token_data['access_token'],
+        endpoints=get_region_resolver().pool_for(st.session_state.get('account_id')),
+        max_retries=max_retries,
+        on_retry=st.warning,
+        session=get_http_session(),
+        coalescer=get_request_coalescer()
+    )
 
+def iter_docgen_configuration_pages(account_id, start_url=None, max_retries=3):
+    """Yield pages of docgen configurations as they arrive, following the Next links"""
+    from clm_client import CLMError
+    try:
+        yield from get_clm_client(max_retries).iter_configuration_pages(account_id, start_url)
+    except CLMError as e:
+        st.error(str(e))
     except Exception as e:
         error_msg = f"Failed to get docgen configurations: {str(e)}"
         logger.error(error_msg)
         st.error(error_msg)
+
+@timed()
+def get_docgen_configurations(account_id, max_retries=3):
+    """Get list of docgen configurations with pagination support"""
+    all_items = []
+    complete = False
+    for page in iter_docgen_configuration_pages(account_id, max_retries=max_retries):
+        all_items.extend(page['Items'])
+        complete = not page['Next']
+
+    # The page generator stops early (after reporting the error) if a request fails
+    if not complete:
         return None
 
+    # Create final response with all items
+    final_response = {
+        'Items': all_items,
+        'Total': len(all_items)
+    }
+    
+    # Debug logging
+    st.write(f"Total configurations found: {len(all_items)}")
+    
+    return final_response
+
+@timed()
 def create_doc_launcher_task(account_id, config_href, xml_payload, max_retries=3):
     """Create a DocLauncher task using CLM API"""
+    from clm_client import CLMError
     try:
-        # Prepare the request data
-        data = {
-            "Data": xml_payload,
-            "DataType": "XML",
-            "DocLauncherConfiguration": {
-                "Href": config_href
-            }
-        }
-
-        # Prepare headers
-        headers = {
-            'Authorization': f"Bearer {st.session_state.token_data['access_token']}",
-            'Content-Type': 'application/json'
-        }
-
-        # Make the API call
-        endpoint = f"https://apiuatna11.springcm.com/v2/{account_id}/doclaunchertasks"
-        
-        retry_count = 0
-        while retry_count < max_retries:
-            try:
-                log_api_call("POST", endpoint, request_data=data)
-                response = requests.post(
-                    endpoint,
-                    headers=headers,
-                    json=data
-                )
-                
-                # Check if we got a 500 error
-                if response.status_code == 500:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        st.warning(f"Server error, retrying... (Attempt {retry_count + 1}/{max_retries})")
-                        continue
-                    else:
-                        st.error("Maximum retries reached. Please try again later.")
-                        return None
-                
-                try:
-                    response_data = response.json()
-                    if response.status_code not in [200, 202]:
-                        error_details = response_data.get('Message', response.text)
-                        logger.error(f"API Error: {response.status_code} - {error_details}")
-                        st.error(f"API Error ({response.status_code}): {error_details}")
-                        return None
-                except ValueError:
-                    error_msg = f"API Error ({response.status_code}): {response.text}"
-                    logger.error(error_msg)
-                    st.error(error_msg)
-                    return None
-                
-                break  # Success, exit retry loop
-                
-            except requests.exceptions.RequestException as e:
-                retry_count += 1
-                if retry_count < max_retries:
-                    st.warning(f"Connection error, retrying... (Attempt {retry_count + 1}/{max_retries})")
-                    continue
-                else:
-                    st.error(f"Failed to connect after {max_retries} attempts: {str(e)}")
-                    return None
-            
-        response.raise_for_status()
-        log_api_call("POST", endpoint, response_data=response_data)
+        response_data = get_clm_client(max_retries).create_doc_launcher_task(account_id, config_href, xml_payload)
         st.success("DocLauncher task created successfully!")
-        logger.info(f"DocLauncher task created successfully: {response_data}")
+        try:
+            get_task_ledger().record_submission(account_id, config_href, xml_payload, response_data)
+        except Exception as e:
+            # The task exists in CLM either way; don't fail the submission over bookkeeping
+            logger.error(f"Failed to record DocLauncher task: {str(e)}")
         
         # Display Status first
         if "Status" in response_data:
@@ -287,26 +233,15 @@ def create_doc_launcher_task(account_id, config_href, xml_payload, max_retries=3
             else:
                 st.warning(f"Status: {status}")
 
-        # Display the DocLauncher Result URL
+        # Link to the DocLauncher form; the browser opens it, the server only resolves the redirect
         if "DocLauncherResultUrl" in response_data:
-            result_url = response_data['DocLauncherResultUrl']
-            
-            # Get the actual content URL with server-side request
             try:
-                headers = {
-                    'Authorization': f"Bearer {st.session_state.token_data['access_token']}",
-                    'Accept': 'text/html'
-                }
-                response = requests.get(result_url, headers=headers, allow_redirects=True)
-                if response.status_code == 200:
-                    st.info("Opening DocLauncher in a new tab...")
-                    webbrowser.open_new_tab(response.url)
-                    st.info("If the tab doesn't open automatically, click the link below:")
-                    st.markdown(f"[Open DocLauncher]({response.url})")
-                else:
-                    st.error(f"Failed to get DocLauncher URL: {response.status_code}")
-            except Exception as e:
-                st.error(f"Error accessing DocLauncher: {str(e)}")
+                doclauncher_url = resolve_doclauncher_url(
+                    response_data.get('Href'), response_data['DocLauncherResultUrl'], max_retries
+                )
+                st.link_button("Open DocLauncher", doclauncher_url)
+            except CLMError as e:
+                st.error(str(e))
 
         # Display the full response in expander
         with st.expander("View Full Response"):
@@ -314,67 +249,44 @@ def create_doc_launcher_task(account_id, config_href, xml_payload, max_retries=3
 
         return response_data
 
+    except CLMError as e:
+        st.error(str(e))
+        return None
     except Exception as e:
         error_msg = f"Failed to create DocLauncher task: {str(e)}"
         logger.error(error_msg)
         st.error(error_msg)
         return None
 
+def resolve_doclauncher_url(task_href, result_url, max_retries=3):
+    """Where a task's DocLauncher result URL leads, resolved once per task and kept in the ledger"""
+    task = get_task_ledger().get(task_href) if task_href else None
+    if task and task['resolved_url']:
+        return task['resolved_url']
+    resolved_url = get_clm_client(max_retries).resolve_result_url(result_url)
+    if task:
+        try:
+            get_task_ledger().set_resolved_url(task_href, resolved_url)
+        except Exception as e:
+            # The link works either way; it is just resolved again next time
+            logger.error(f"Failed to cache the DocLauncher URL of {task_href}: {str(e)}")
+    return resolved_url
+
 def get_document_attributes(account_id, doc_id, max_retries=3):
     """Get document attributes using CLM API"""
+    from clm_client import CLMError
     try:
-        headers = {
-            'Authorization': f"Bearer {st.session_state.token_data['access_token']}",
-            'Content-Type': 'application/json'
-        }
-        
-        endpoint = f"https://apiuatna11.springcm.com/v2/{account_id}/documents/{doc_id}?expand=AttributeGroups"
-        
-        retry_count = 0
-        while retry_count < max_retries:
-            try:
-                log_api_call("GET", endpoint)
-                response = requests.get(endpoint, headers=headers)
-                
-                # Check if we got a 500 error
-                if response.status_code == 500:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        st.warning(f"Server error, retrying... (Attempt {retry_count + 1}/{max_retries})")
-                        continue
-                    else:
-                        st.error("Maximum retries reached. Please try again later.")
-                        return None
-                
-                # For other errors, try to get more details
-                if response.status_code != 200:
-                    try:
-                        error_data = response.json()
-                        error_msg = error_data.get('Message', response.text)
-                    except:
-                        error_msg = response.text
-                    st.error(f"API Error ({response.status_code}): {error_msg}")
-                    return None
-                
-                response_data = response.json()
-                log_api_call("GET", endpoint, response_data=response_data)
-                return response_data
-                
-            except requests.exceptions.RequestException as e:
-                retry_count += 1
-                if retry_count < max_retries:
-                    st.warning(f"Connection error, retrying... (Attempt {retry_count + 1}/{max_retries})")
-                    continue
-                else:
-                    st.error(f"Failed to connect after {max_retries} attempts: {str(e)}")
-                    return None
-
+        return get_clm_client(max_retries).get_document_attributes(account_id, doc_id)
+    except CLMError as e:
+        st.error(str(e))
+        return None
     except Exception as e:
         error_msg = f"Failed to get document attributes: {str(e)}"
         logger.error(error_msg)
         st.error(error_msg)
         return None
 
+@timed()
 def filter_attributes(data, search_term):
     """Recursively search through nested JSON for matching attributes"""
     results = []
@@ -490,6 +402,225 @@ def show_document_attributes_interface():
             with st.expander("Full JSON Response", expanded=not search_term):
                 st.json(st.session_state.document_attributes)
 
+def show_update_document_interface():
+    """Show the document attribute update interface, for one document or a whole file of them"""
+    # Add back button
+    if st.button("← Back to Catalog"):
+        st.session_state.current_view = 'catalog'
+        st.rerun()
+
+    st.title("Update a Document")
+    st.write("Set attribute values on documents. Values that already match are left alone.")
+
+    client = get_clm_client()
+    account_id = st.session_state.account_id
+
+    st.subheader("Single Document")
+    doc_id = st.text_input("Document ID", key="update_doc_id")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        group = st.text_input("Attribute Group")
+    with col2:
+        attribute = st.text_input("Attribute")
+    with col3:
+        value = st.text_input("New Value")
+    if st.button("Update Attribute"):
+        if not doc_id or not group or not attribute:
+            st.error("Please enter a Document ID, Attribute Group and Attribute")
+        else:
+            update = DocumentUpdate(doc_id, {group: {attribute: value}})
+            result = list(apply_updates(client, account_id, [update], workers=1))[0]
+            if result.outcome == 'updated':
+                st.success(f"Updated {result.changes} attribute on document {doc_id}")
+            elif result.outcome == 'unchanged':
+                st.info("The attribute already has this value, nothing was written")
+            else:
+                st.error(result.error)
+
+    st.subheader("Bulk Update")
+    st.write("Upload a CSV with doc_id, group, attribute and value columns (one attribute per row), "
+             "or a JSONL file with doc_id and AttributeGroups on each line.")
+    updates_file = st.file_uploader("Upload updates", type=["csv", "jsonl", "ndjson"])
+    col1, col2 = st.columns(2)
+    with col1:
+        workers = st.number_input("Documents in parallel", min_value=1, max_value=32, value=8)
+    with col2:
+        dry_run = st.checkbox("Dry run (report changes without writing)")
+
+    if updates_file is not None and st.button("Apply Updates"):
+        updates_file.seek(0)
+        records = wrap_binary_upload(updates_file)
+        progress = st.empty()
+        failures = []
+
+        def on_result(result):
+            if result.outcome == 'failed' and len(failures) < 100:
+                failures.append(result._asdict())
+
+        def with_progress(results):
+            for done, result in enumerate(results, start=1):
+                if done % 25 == 0:
+                    progress.caption(f"Processed {done} documents...")
+                yield result
+
+        try:
+            counts = summarize(
+                with_progress(apply_updates(client, account_id, iter_updates(records, detect_format(updates_file.name)),
+                                            workers=int(workers), dry_run=dry_run)),
+                on_result=on_result
+            )
+        finally:
+            records.detach()
+        progress.empty()
+        st.write(", ".join(f"**{outcome}:** {count}" for outcome, count in sorted(counts.items())) or "No updates found")
+        if failures:
+            st.write("Failures (first 100):")
+            st.dataframe(failures, use_container_width=True)
+
+def show_workflow_interface():
+    """Show the workflow launch interface, for one workflow or a file of them"""
+    # Add back button
+    if st.button("← Back to Catalog"):
+        st.session_state.current_view = 'catalog'
+        st.rerun()
+
+    st.title("Kick off workflow")
+    st.write("Start CLM workflows with XML parameters")
+
+    client = get_clm_client()
+    account_id = st.session_state.account_id
+    ledger = get_task_ledger()
+
+    st.subheader("Single Workflow")
+    workflow_name = st.text_input("Workflow Name")
+    params = st.text_area("XML Parameters", value="<Params></Params>", height=150)
+    if st.button("Start Workflow"):
+        if not workflow_name or not params:
+            st.error("Please enter a workflow name and XML parameters")
+        else:
+            launch = WorkflowLaunch(1, workflow_name, params)
+            result = list(launch_workflows(client, account_id, [launch], workers=1, ledger=ledger,
+                                           limiter=limiter_for(account_id)))[0]
+            if result.error:
+                st.error(result.error)
+            else:
+                st.success(f"Workflow started: {result.status}")
+                st.write(result.href)
+
+    st.subheader("Bulk Launch")
+    st.write("Upload a CSV or JSONL file with a workflow column (optional if a default name is set) "
+             "and a params column holding the XML for each workflow.")
+    records_file = st.file_uploader("Upload workflow records", type=["csv", "jsonl", "ndjson"])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        default_name = st.text_input("Default Workflow Name")
+    with col2:
+        workers = st.number_input("Workflows in parallel", min_value=1, max_value=32, value=8)
+    with col3:
+        rate = st.number_input("Max starts per second", min_value=1.0, value=float(DEFAULT_RATE_PER_SECOND))
+
+    if records_file is not None and st.button("Start Workflows"):
+        records_file.seek(0)
+        records = wrap_binary_upload(records_file)
+        progress = st.empty()
+        counts = {'ok': 0, 'failed': 0}
+        failures = []
+        try:
+            launches = iter_workflow_launches(records, detect_format(records_file.name), default_name=default_name or None)
+            for result in launch_workflows(client, account_id, launches, workers=int(workers),
+                                           rate_per_second=rate, ledger=ledger):
+                counts['failed' if result.error else 'ok'] += 1
+                if result.error and len(failures) < 100:
+                    failures.append(result._asdict())
+                if (counts['ok'] + counts['failed']) % 25 == 0:
+                    progress.caption(f"Started {counts['ok']} workflows...")
+        finally:
+            records.detach()
+        progress.empty()
+        st.write(f"**Started:** {counts['ok']}, **Failed:** {counts['failed']}")
+        if failures:
+            st.write("Failures (first 100):")
+            st.dataframe(failures, use_container_width=True)
+
+    with st.expander("Started Workflows", expanded=True):
+        show_task_ledger(account_id, kind='workflow')
+
+def show_xml_merge_interface():
+    """Merge record data into a TemplateFieldData template locally, for previews and whole files"""
+    # Add back button
+    if st.button("← Back to Catalog"):
+        st.session_state.current_view = 'catalog'
+        st.rerun()
+
+    st.title("XML Merge")
+    st.write("Merge XML or JSON data into a TemplateFieldData template without calling CLM. "
+             "Elements the data leaves out keep the template's value.")
+
+    template_xml = st.text_area(
+        "Template",
+        value=SOURCING_TEMPLATE.render({'agreement_type': AGREEMENT_TYPES[0], 'customer': DUMMY_CUSTOMERS[0]}),
+        height=250
+    )
+    fill_defaults = st.checkbox("Use template values for missing elements", value=True)
+    try:
+        template = load_merge_template(template_xml)
+    except PayloadTemplateError as e:
+        st.error(str(e))
+        return
+
+    st.subheader("Preview")
+    data = st.text_area("Data (TemplateFieldData XML or a JSON object)",
+                        value='{"Account_Name": "XYZ Corporation", "Billing_City": "New York"}', height=120)
+    if data.strip():
+        try:
+            record = json.loads(data) if data.lstrip().startswith('{') else data
+            payload, unknown_fields = template.merge(record, fill_defaults=fill_defaults)
+        except (ValueError, PayloadTemplateError) as e:
+            st.error(str(e))
+        else:
+            if unknown_fields:
+                st.warning(f"Not in the template, ignored: {', '.join(unknown_fields)}")
+            st.code(payload, language="xml")
+
+    st.subheader("Batch Merge")
+    st.write("Upload a CSV or JSONL file keyed by element name, or an XML file of TemplateFieldData elements.")
+    records_file = st.file_uploader("Upload records", type=["csv", "jsonl", "ndjson", "xml"])
+    strict = st.checkbox("Fail records with fields the template does not have")
+    if records_file is not None and st.button("Merge Records"):
+        records_file.seek(0)
+        records = wrap_binary_upload(records_file)
+        # Payloads go to a temporary file as they are merged, not into memory
+        output = tempfile.NamedTemporaryFile('w+', encoding='utf-8', suffix='.jsonl', delete=False)
+        failures = []
+
+        def on_error(result):
+            if len(failures) < 100:
+                failures.append({"Record": result.record_number, "Error": result.error})
+
+        try:
+            results = template.merge_many(iter_merge_records(records, detect_merge_format(records_file.name)),
+                                          fill_defaults=fill_defaults, strict=strict)
+            written, failed = write_merged(results, output, on_error=on_error)
+        except ValueError as e:
+            st.error(str(e))
+            written = None
+        finally:
+            records.detach()
+            output.close()
+        try:
+            if written is None:
+                return
+            st.write(f"**Merged:** {written}, **Failed:** {failed}")
+            if failures:
+                st.write("Failures (first 100):")
+                st.dataframe(failures, use_container_width=True)
+            if written:
+                with open(output.name, 'rb') as merged:
+                    st.download_button("Download Payloads (JSONL)", merged,
+                                       file_name="merged_payloads.jsonl", mime="application/x-ndjson")
+        finally:
+            os.remove(output.name)
+
 def get_actual_redirect_uri():
     """Get the actual redirect URI based on how the app is being accessed"""
     # Get the URL where the app is being accessed
@@ -499,83 +630,14 @@ def get_actual_redirect_uri():
         return get_config('DOCUSIGN_REDIRECT_URI')
     return base_url
 
+@timed()
 def show_feature_card(title, description, feature_id, is_active=False, image_name=None):
     """Helper function to create a consistent feature card"""
-    # Card and button styling
-    st.markdown("""
-        <style>
-            .feature-card {
-                border: 1px solid #ddd;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 10px 0;
-                background-color: white;
-                height: 100%;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-align: center;
-            }
-            .feature-title {
-                margin: 15px 0;
-                font-size: 1.2em;
-                font-weight: bold;
-            }
-            .feature-description {
-                margin: 10px 0;
-                min-height: 60px;
-                color: #666;
-            }
-            /* Custom button styling */
-            .stButton > button {
-                width: 100%;
-                height: 3rem;
-                line-height: 1;
-                padding: 0 1.5rem;
-                font-size: 1rem;
-                font-weight: 500;
-                border-radius: 8px;
-                transition: all 0.3s ease;
-                margin-top: 1rem;
-                display: flex !important;
-                align-items: center;
-                justify-content: center;
-                white-space: nowrap;
-            }
-            /* Active button */
-            .stButton > button:not([disabled]) {
-                background-color: #00b4e6;
-                color: white;
-                border: none;
-                box-shadow: 0 2px 4px rgba(0, 180, 230, 0.2);
-            }
-            .stButton > button:not([disabled]):hover {
-                background-color: #0099cc;
-                box-shadow: 0 4px 8px rgba(0, 180, 230, 0.3);
-                transform: translateY(-1px);
-            }
-            /* Disabled button */
-            .stButton > button[disabled] {
-                background-color: #f5f5f5;
-                color: #999;
-                border: 1px solid #ddd;
-                cursor: not-allowed;
-                opacity: 0.8;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
     # Create card container
     with st.container():
-        # Construct the URL directly if image_name is provided
-        image_url = f"{REPO_URL}/src/image/{image_name}" if image_name else "https://via.placeholder.com/150"
-        st.markdown(f"""
-            <div class="feature-card">
-                <img src="{image_url}" style="max-width:150px; height:150px; object-fit:contain; margin:auto;">
-                <div class="feature-title">{title}</div>
-                <div class="feature-description">{description}</div>
-            </div>
-        """, unsafe_allow_html=True)
+        # Served from src/static, so the catalog needs no external fetches
+        image_url = card_image_url(image_name)
+        st.markdown(feature_card_html(title, description, image_url), unsafe_allow_html=True)
         
         # Center the button using columns
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -589,6 +651,12 @@ def show_feature_card(title, description, feature_id, is_active=False, image_nam
                         st.session_state.current_view = 'docgen'
                     elif feature_id == "document_attributes": 
                         st.session_state.current_view = 'document_attributes'
+                    elif feature_id == "update_document":
+                        st.session_state.current_view = 'update_document'
+                    elif feature_id == "kickoff_workflow":
+                        st.session_state.current_view = 'kickoff_workflow'
+                    elif feature_id == "xml_merge":
+                        st.session_state.current_view = 'xml_merge'
                     elif feature_id == "sourcing_login": 
                         st.session_state.current_view = 'sourcing_login'
                     elif feature_id == "settings": 
@@ -604,14 +672,8 @@ def show_catalog():
     # Add spacing between title and cards
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Style for columns
-    st.markdown("""
-        <style>
-            .stColumns {
-                gap: 2rem;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+    # Card, button and column styles, emitted once for all cards
+    inject_assets('catalog_styles')
     
     # Get the custom sourcing title, default if not set
     sourcing_title = st.session_state.get("sourcing_login_title", "Sourcing System Login")
@@ -639,6 +701,7 @@ def show_catalog():
             title="Update a Document",
             description="Update document properties and metadata",
             feature_id="update_document",
+            is_active=True,
             image_name="add-document.png"
         )
     
@@ -652,7 +715,7 @@ def show_catalog():
             title="Kick off workflow",
             description="Start a workflow in DocuSign CLM",
             feature_id="kickoff_workflow",
-            is_active=False,
+            is_active=True,
             image_name="work-in-progress.png"
         )
     with cols2[1]:
@@ -660,7 +723,7 @@ def show_catalog():
             title="XML Merge",
             description="Merge XML data with document templates",
             feature_id="xml_merge",
-            is_active=False,
+            is_active=True,
             image_name="work-in-progress.png"
         )
     with cols2[2]:
@@ -696,65 +759,166 @@ def show_docgen_interface():
     st.title("Launch DocGen Form")
     st.write("Enter details below to pull and kick off a Doc Gen Form")
     
-    # Get configurations if not already loaded
+    # Load the first page of configurations so the selector is usable straight away
     if not st.session_state.configs:
         with st.spinner("Loading DocGen configurations..."):
-            configs = get_docgen_configurations(st.session_state.account_id)
-            if configs:
-                st.session_state.configs = configs
+            first_page = next(iter_docgen_configuration_pages(st.session_state.account_id), None)
+            if first_page:
+                st.session_state.configs = {
+                    'Items': first_page['Items'],
+                    'Total': len(first_page['Items'])
+                }
+                st.session_state.configs_next_url = first_page['Next']
+                st.session_state.config_catalog = ConfigCatalog(first_page['Items'])
     
     # Display configuration selection
     if st.session_state.configs:
-        # Create initial list of configuration names and their hrefs
-        config_options = {}
-        for config in st.session_state.configs.get('Items', []):
-            name = config.get('Name', '')
-            config_id = config.get('Id', '')
-            href = config.get('Href')
-            display_name = f"{name} ({config_id})" if name and config_id else name or 'Unnamed'
-            config_options[display_name] = href
+        catalog = st.session_state.config_catalog
+        
+        # Search-as-you-type against the catalog index; only the top matches reach the selector
+        search_term = st.text_input("Search Configurations", "", placeholder="Type a name or ID")
+        option_names = catalog.search(search_term, limit=CONFIG_SEARCH_LIMIT)
+        if search_term:
+            st.write(f"Showing {len(option_names)} best matches out of {len(catalog)} configurations")
+        elif len(catalog) > len(option_names):
+            st.caption(f"Showing the first {len(option_names)} of {len(catalog)} configurations, type to narrow the list")
         
-        # Configuration selection
+        # Keep the current choice selected while later pages extend the catalog
+        previous_choice = st.session_state.get('selected_config_name')
         selected_config_name = st.selectbox(
             "Select DocGen Configuration",
-            options=list(config_options.keys()),
-            key="config_selector"
+            options=option_names,
+            index=option_names.index(previous_choice) if previous_choice in option_names else 0
         )
-
-        # Search functionality (optional)
-        show_search = st.checkbox("Enable Search")
-        if show_search:
-            search_term = st.text_input("Search Configurations", "").lower()
-            # Filter options based on search
-            if search_term:
-                filtered_options = {k: v for k, v in config_options.items() if search_term in k.lower()}
-                st.write(f"Found {len(filtered_options)} configurations matching search")
-                selected_config_name = st.selectbox(
-                    "Filtered Configurations",
-                    options=list(filtered_options.keys()),
-                    key="filtered_selector"
-                )
+        st.session_state.selected_config_name = selected_config_name
         
+        task_submitted = False
         if selected_config_name:
-            st.session_state.selected_config = config_options[selected_config_name]
+            st.session_state.selected_config = catalog.href_for(selected_config_name)
             
             # XML Payload input
             xml_payload = st.text_area(
                 "Enter XML Payload",
-                value='<Params><Source>CLM API Example</Source></Params>',
+                value=DOCGEN_PARAMS_TEMPLATE.render({"source": "CLM API Example"}),
                 height=150
             )
             
             # Create task button
             if st.button("Create DocLauncher Task"):
+                # Catch malformed XML here rather than after a round-trip to CLM
+                problems = validate_payload(xml_payload) if xml_payload else []
                 if not xml_payload:
                     st.error("Please enter an XML payload")
+                elif problems:
+                    st.error(problems[0])
                 else:
+                    task_submitted = True
                     create_doc_launcher_task(
                         st.session_state.account_id,
                         st.session_state.selected_config,
                         xml_payload
                     )
+            
+            # Bulk payload generation from a record file
+            with st.expander("Generate Payloads from a Record File"):
+                st.write("Columns (or JSON keys) must be named after the TemplateFieldData elements, as in docs/sourcing.xml")
+                record_file = st.file_uploader("Upload a CSV or JSONL file of records", type=["csv", "jsonl", "ndjson"])
+                if record_file is not None:
+                    show_payload_file_preview(record_file)
+
+        with st.expander("Submitted Tasks"):
+            show_task_ledger(st.session_state.account_id)
+
+        # Fetch the remaining pages one per run, after the selector has been rendered.
+        # Skip the run that submitted a task so its result stays on screen.
+        if st.session_state.configs_next_url and not task_submitted:
+            st.caption(f"Loading more configurations... ({len(st.session_state.config_catalog)} so far)")
+            next_page = next(iter_docgen_configuration_pages(
+                st.session_state.account_id,
+                start_url=st.session_state.configs_next_url
+            ), None)
+            if next_page:
+                st.session_state.configs['Items'].extend(next_page['Items'])
+                st.session_state.configs['Total'] = len(st.session_state.configs['Items'])
+                st.session_state.config_catalog.add_items(next_page['Items'])
+                st.session_state.configs_next_url = next_page['Next']
+                st.rerun()
+            else:
+                # Stop paging on failure; the error has already been reported
+                st.session_state.configs_next_url = None
+
+@timed()
+def show_task_ledger(account_id, kind='doclauncher', limit=50):
+    """Show task counts by status and the latest tasks, with a bulk refresh of pending ones"""
+    ledger = get_task_ledger()
+    label = "workflows" if kind == 'workflow' else "tasks"
+    counts = ledger.status_counts(account_id, kind=kind)
+    if not counts:
+        st.write("No workflows started yet" if kind == 'workflow' else "No DocLauncher tasks submitted yet")
+        return
+    st.write(", ".join(f"**{status}:** {count}" for status, count in counts.items()))
+
+    reconcile_key = f"last_reconcile_{kind}"
+    if st.button(f"Refresh Pending {label.title()}", key=f"refresh_{kind}"):
+        progress = st.empty()
+        st.session_state[reconcile_key] = reconcile_pending(
+            ledger,
+            get_clm_client(),
+            account_id=account_id,
+            kind=kind,
+            on_batch=lambda totals: progress.caption(f"Checked {totals['checked']} pending {label}...")
+        )
+        progress.empty()
+        st.rerun()
+    if st.session_state.get(reconcile_key):
+        totals = st.session_state[reconcile_key]
+        st.caption(f"Last refresh checked {totals['checked']} pending {label}: "
+                   f"{totals['changed']} changed, {totals['failed']} failed")
+
+    st.dataframe([
+        {
+            "Submitted": datetime.fromtimestamp(task['submitted_at']).strftime('%Y-%m-%d %H:%M:%S'),
+            "Status": task['status'],
+            "Workflow" if kind == 'workflow' else "Configuration":
+                task['name'] or (task['config_href'].rsplit('/', 1)[-1] if task['config_href'] else None),
+            "Href": task['href'],
+            "Error": task['error']
+        }
+        for task in ledger.recent(limit, account_id=account_id, kind=kind)
+    ], use_container_width=True)
+
+# Records read to preview an uploaded file; the preview reports when the file has more
+PAYLOAD_PREVIEW_RECORDS = 1000
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def preview_payload_file(file_hash, record_format, _record_file, preview_count):
+    """Preview of an uploaded record file, computed once per file content (file_hash is the cache key)"""
+    _record_file.seek(0)
+    records = wrap_binary_upload(_record_file)
+    try:
+        return preview_payloads(records, record_format, template_for_columns(),
+                                preview_count=preview_count, limit=PAYLOAD_PREVIEW_RECORDS)
+    finally:
+        records.detach()  # Leave the upload open for Streamlit
+
+def show_payload_file_preview(record_file, preview_count=3):
+    """Show counts and the first few payloads generated from an uploaded record file"""
+    try:
+        record_format = detect_format(record_file.name)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    with record_file.getbuffer() as data:
+        file_hash = hashlib.sha256(data).hexdigest()
+    preview = preview_payload_file(file_hash, record_format, record_file, preview_count)
+
+    checked = f"first {PAYLOAD_PREVIEW_RECORDS} records" if preview.truncated else "all records"
+    st.success(f"Generated {preview.valid} payloads ({preview.invalid} invalid records), checked {checked}")
+    for error in preview.errors:
+        st.warning(error)
+    for payload in preview.payloads:
+        st.code(payload, language="xml")
 
 def show_sourcing_login_interface():
     """Show the sourcing login interface"""
@@ -764,8 +928,7 @@ def show_sourcing_login_interface():
         st.rerun()
         
     # --- Display Uploaded Logo --- Start ---
-    if 'uploaded_logo_bytes' in st.session_state and st.session_state.uploaded_logo_bytes:
-        st.image(st.session_state.uploaded_logo_bytes, width=150) # Display the logo if it exists
+    if show_logo(): # Display the logo if it exists
         st.markdown("---") # Add a separator
     # --- Display Uploaded Logo --- End ---
 
@@ -854,6 +1017,14 @@ DUMMY_CUSTOMERS = [
     }
 ]
 
+# Number of customers shown per page in the customer selector
+CUSTOMER_PAGE_SIZE = 20
+
+@st.cache_resource
+def load_customer_directory():
+    """Create the customer directory once per process (SQLite if CUSTOMER_DIRECTORY_DB is set)"""
+    return get_customer_directory(DUMMY_CUSTOMERS)
+
 # Initialize sourcing data in session state if not already present
 def init_sourcing_data():
     if 'sourcing_data' not in st.session_state:
@@ -873,21 +1044,11 @@ def dict_to_sourcing_xml():
     customer = st.session_state.sourcing_data["customer"]
     agreement_type = st.session_state.sourcing_data["agreement_type"]
     
-    xml_template = """<?xml version="1.0" encoding="utf-16" standalone="yes"?>
-<TemplateFieldData displayName="" displayValue="">
-  <Agreement_Type>{agreement_type}</Agreement_Type>
-  <Account_Name>{customer[name]}</Account_Name>
-  <Billing_Address>{customer[billing][address]}</Billing_Address>
-  <Billing_City>{customer[billing][city]}</Billing_City>
-  <Billing_State>{customer[billing][state]}</Billing_State>
-  <Billing_Postal_Code>{customer[billing][postal_code]}</Billing_Postal_Code>
-  <Billing_Country>{customer[billing][country]}</Billing_Country>
-</TemplateFieldData>"""
-    
-    return xml_template.format(
-        agreement_type=agreement_type,
-        customer=customer
-    )
+    # The template is compiled once at import and escapes every value it renders
+    return SOURCING_TEMPLATE.render({
+        "agreement_type": agreement_type,
+        "customer": customer
+    })
 
 def show_sourcing_use_case_interface():
     """Show the agreement type selection interface"""
@@ -900,8 +1061,7 @@ def show_sourcing_use_case_interface():
         st.rerun()
         
     # --- Display Uploaded Logo --- Start ---
-    if 'uploaded_logo_bytes' in st.session_state and st.session_state.uploaded_logo_bytes:
-        st.image(st.session_state.uploaded_logo_bytes, width=150) # Display the logo if it exists
+    if show_logo(): # Display the logo if it exists
         st.markdown("---") # Add a separator
     # --- Display Uploaded Logo --- End ---
 
@@ -932,31 +1092,55 @@ def show_customer_selection_interface():
         st.rerun()
         
     # --- Display Uploaded Logo --- Start ---
-    if 'uploaded_logo_bytes' in st.session_state and st.session_state.uploaded_logo_bytes:
-        st.image(st.session_state.uploaded_logo_bytes, width=150) # Display the logo if it exists
+    if show_logo(): # Display the logo if it exists
         st.markdown("---") # Add a separator
     # --- Display Uploaded Logo --- End ---
 
     st.title("Select Customer")
     st.write("Please select a customer to proceed.")
     
-    # Create a list of customer names for the dropdown
-    customer_names = [customer["name"] for customer in DUMMY_CUSTOMERS]
+    directory = load_customer_directory()
+    
+    # Typeahead search, fetching one page of customers at a time
+    search_term = st.text_input("Search Customers", "", placeholder="Start typing a customer name")
+    if search_term != st.session_state.get('customer_search_term'):
+        st.session_state.customer_search_term = search_term
+        st.session_state.customer_page = 0
+    page = st.session_state.get('customer_page', 0)
+    
+    # Ask for one extra row to know whether a next page exists
+    results = directory.search(search_term, limit=CUSTOMER_PAGE_SIZE + 1, offset=page * CUSTOMER_PAGE_SIZE)
+    has_next_page = len(results) > CUSTOMER_PAGE_SIZE
+    customers_by_id = {customer_id(customer): customer for customer in results[:CUSTOMER_PAGE_SIZE]}
+    
+    if not customers_by_id:
+        st.info("No customers match your search.")
+        return
     
     # Customer selection
-    selected_customer = st.selectbox(
+    selected_customer_id = st.selectbox(
         "Select Customer",
-        customer_names,
-        index=0
+        list(customers_by_id.keys()),
+        index=0,
+        format_func=lambda key: customers_by_id[key]["name"]
     )
     
+    # Paging controls
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if page > 0 and st.button("← Previous"):
+            st.session_state.customer_page = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page + 1}")
+    with col3:
+        if has_next_page and st.button("Next →"):
+            st.session_state.customer_page = page + 1
+            st.rerun()
+    
     if st.button("Continue"):
-        # Find the selected customer in the DUMMY_CUSTOMERS list
-        for customer in DUMMY_CUSTOMERS:
-            if customer["name"] == selected_customer:
-                # Store the customer in session state
-                st.session_state.sourcing_data["customer"] = customer
-                break
+        # Look the customer up by id in the directory index
+        st.session_state.sourcing_data["customer"] = directory.get(selected_customer_id)
         
         # Generate XML from our session state data
         st.session_state.sourcing_xml_data = dict_to_sourcing_xml()
@@ -976,8 +1160,7 @@ def show_sourcing_form_interface():
     st.title("Pre-populated Form Data")
 
     # --- Display Uploaded Logo --- Start ---
-    if 'uploaded_logo_bytes' in st.session_state and st.session_state.uploaded_logo_bytes:
-        st.image(st.session_state.uploaded_logo_bytes, width=150) # Display the logo if it exists
+    if show_logo(): # Display the logo if it exists
         st.markdown("---") # Add a separator
     # --- Display Uploaded Logo --- End ---
 
@@ -1006,7 +1189,7 @@ def show_sourcing_form_interface():
     # Use the specific configuration for Purchase Agreement
     purchase_agreement_config = {
         "Name": "Purchase Agreement - Portal",
-        "Href": "https://apiuatna11.springcm.com/v2/26238559-d602-4e8a-801e-27ca5cfdb446/doclauncherconfigurations/a0b5cea8-8a5b-414f-a295-5014dd3428b4"
+        "Href": f"{get_region_resolver().base_url(SOURCING_ACCOUNT_ID)}/{SOURCING_ACCOUNT_ID}/doclauncherconfigurations/a0b5cea8-8a5b-414f-a295-5014dd3428b4"
     }
     
     # Submit button
@@ -1022,31 +1205,87 @@ def show_sourcing_form_interface():
         )
         
         if result:
+            # Start tracking the new contract's status in the background
+            st.session_state.status_watch_url = CONTRACT_STATUS_URL
+            get_status_tracker().poll_now(CONTRACT_STATUS_URL)
             # Add a button to return to catalog
             if st.button("Return to Catalog"):
                 st.session_state.current_view = 'catalog'
                 st.rerun()
     
-    # Get Status button
+    # Get Status button (also forces an immediate refresh once tracking has started)
     if st.button("Get Status"):
-        try:
-            # Call the middleware API to get contract status
-            status_url = "https://telemetry-service.onrender.com/services/getStatus/demo@example.com/Purchasing%20Agreement"
-            response = requests.get(status_url)
-            
-            if response.status_code == 200:
-                status_data = response.json()
-                
-                # Display the status information
-                st.success(f"Contract Status: {status_data.get('contract_status', 'Unknown')}")
-                
-                # Show full response details in an expander
-                with st.expander("View Status Details"):
-                    st.json(status_data)
-            else:
-                st.error(f"Failed to get status: HTTP {response.status_code}")
-        except Exception as e:
-            st.error(f"Error getting contract status: {str(e)}")
+        st.session_state.status_watch_url = CONTRACT_STATUS_URL
+        get_status_tracker().poll_now(CONTRACT_STATUS_URL)
+
+    if st.session_state.get('status_watch_url'):
+        show_contract_status(st.session_state.status_watch_url)
+
+# Status of the contract created by the sourcing flow
+CONTRACT_STATUS_URL = f"{TELEMETRY_SERVICE_URL}/services/getStatus/demo@example.com/Purchasing%20Agreement"
+
+# Seconds between refreshes of the live status panel (it only reads the tracker, never the network)
+STATUS_REFRESH_SECONDS = 3
+
+def fetch_contract_status(session, status_url):
+    """Get a contract status from the telemetry service"""
+    response = session.get(status_url, timeout=10)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return response.json()
+
+@st.cache_resource
+def get_status_tracker():
+    """One background status poller shared by every session, so each contract is polled once"""
+    # Polls run on worker threads, so they get the session up front rather than through Streamlit's cache
+    session = get_http_session()
+    return StatusTracker(lambda status_url: fetch_contract_status(session, status_url))
+
+@st.cache_resource
+def get_webhook_receiver():
+    """
+    Start the embedded webhook receiver once per process when WEBHOOK_SECRET is set.
+    Verified events update the task ledger and the status tracker, replacing polling.
+    """
+    secrets = secrets_from_environment()
+    if not secrets:
+        return None
+    ledger = get_task_ledger()
+    tracker = get_status_tracker()
+    receiver = WebhookReceiver(EventStore(), secrets, port=int(get_config('WEBHOOK_PORT') or DEFAULT_WEBHOOK_PORT))
+    receiver.subscribe(lambda event: update_ledger(ledger, event))
+    # Contract notifications use the watched status URL as their Href
+    receiver.subscribe(lambda event: event.subject and event.status and
+                       tracker.notify(event.subject, {'contract_status': event.status}))
+    try:
+        return receiver.start()
+    except OSError as e:
+        logger.error(f"Could not start the webhook receiver: {str(e)}")
+        return None
+
+def show_contract_status(status_url):
+    """Show the latest tracked status for a contract"""
+    snapshot = get_status_tracker().watch(status_url)
+    if snapshot.data is None and snapshot.error is None:
+        st.write("Checking contract status...")
+        return
+    if snapshot.error:
+        st.warning(f"Error getting contract status: {snapshot.error} (retrying in {snapshot.interval:.0f}s)")
+    if snapshot.data is not None:
+        st.markdown(f"**Contract Status:** {snapshot.status or 'Unknown'}")
+        checked = datetime.fromtimestamp(snapshot.checked_at).strftime('%H:%M:%S')
+        if snapshot.pushed:
+            st.caption(f"Last updated {checked} by notification")
+        else:
+            st.caption(f"Last checked {checked}" + ("" if snapshot.final else ", updating automatically"))
+        # Show full response details in an expander
+        with st.expander("View Status Details"):
+            st.json(snapshot.data)
+
+# Rerun just the status panel on a timer where Streamlit supports fragments; otherwise "Get Status" refreshes it
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+if _fragment:
+    show_contract_status = _fragment(run_every=STATUS_REFRESH_SECONDS)(show_contract_status)
 
 # --- Settings Interface --- Start ---
 def show_settings_interface():
@@ -1063,20 +1302,24 @@ def show_settings_interface():
     uploaded_logo = st.file_uploader("Choose a logo image", type=["png", "jpg", "jpeg"])
 
     if uploaded_logo is not None:
-        # Read the file content as bytes
-        logo_bytes = uploaded_logo.getvalue()
-        # Store bytes in session state
-        st.session_state.uploaded_logo_bytes = logo_bytes
-        st.success("Logo uploaded successfully!")
-        # Display the uploaded logo as confirmation
-        st.image(logo_bytes, width=100)
+        try:
+            # Downsample and store each upload once; the session keeps only the logo id
+            if st.session_state.get('logo_upload_id') != uploaded_logo.file_id:
+                st.session_state.logo_id = get_logo_store().put(uploaded_logo.getvalue())
+                st.session_state.logo_upload_id = uploaded_logo.file_id
+            st.success("Logo uploaded successfully!")
+            # Display the uploaded logo as confirmation
+            show_logo(width=100)
+        except LogoError as e:
+            st.error(str(e))
 
     # Optionally, display the currently stored logo
-    elif 'uploaded_logo_bytes' in st.session_state and st.session_state.uploaded_logo_bytes:
+    elif st.session_state.get('logo_id'):
         st.write("Current Logo:")
-        st.image(st.session_state.uploaded_logo_bytes, width=100)
+        show_logo(width=100)
         if st.button("Remove Logo"):
-            del st.session_state.uploaded_logo_bytes
+            st.session_state.pop('logo_id', None)
+            st.session_state.pop('logo_upload_id', None)
             st.rerun()
 
     st.markdown("---") # Separator
@@ -1101,81 +1344,22 @@ def show_settings_interface():
 
 def main():
     # Add JavaScript for auto-hiding messages
-    st.markdown("""
-        <script>
-            // Function to hide success and info messages after 5 seconds
-            function hideAllMessages() {
-                setTimeout(function() {
-                    const messages = document.querySelectorAll('.stSuccess, .stInfo');
-                    messages.forEach(function(message) {
-                        message.style.transition = 'opacity 1s ease-out';
-                        message.style.opacity = '0';
-                        setTimeout(function() {
-                            message.style.display = 'none';
-                        }, 1000);
-                    });
-                }, 5000); // Wait 5 seconds before starting to fade
-            }
-            
-            // Function to set up a mutation observer to watch for new messages
-            function setupMessageObserver() {
-                // Create an observer instance
-                const observer = new MutationObserver(function(mutations) {
-                    // Check if any new info or success elements were added
-                    let newMessageAdded = false;
-                    
-                    mutations.forEach(function(mutation) {
-                        if (mutation.type === 'childList' && mutation.addedNodes.length > 0) {
-                            mutation.addedNodes.forEach(function(node) {
-                                if (node.nodeType === 1) { // Element node
-                                    if (node.classList && 
-                                        (node.classList.contains('stSuccess') || 
-                                         node.classList.contains('stInfo'))) {
-                                        newMessageAdded = true;
-                                    }
-                                    
-                                    // Also check children of added nodes
-                                    const messages = node.querySelectorAll('.stSuccess, .stInfo');
-                                    if (messages.length > 0) {
-                                        newMessageAdded = true;
-                                    }
-                                }
-                            });
-                        }
-                    });
-                    
-                    // If new messages were added, hide them after delay
-                    if (newMessageAdded) {
-                        hideAllMessages();
-                    }
-                });
-                
-                // Start observing the document body
-                observer.observe(document.body, {
-                    childList: true,
-                    subtree: true
-                });
-            }
-            
-            // Run when DOM is fully loaded
-            if (document.readyState === 'loading') {
-                document.addEventListener('DOMContentLoaded', function() {
-                    hideAllMessages();
-                    setupMessageObserver();
-                });
-            } else {
-                // DOM already loaded
-                hideAllMessages();
-                setupMessageObserver();
-            }
-        </script>
-    """, unsafe_allow_html=True)
+    with stage("inject_assets"):
+        inject_assets('message_autohide')
+
+    # Status notifications, if configured; started once and shared by every session
+    with stage("webhook_receiver"):
+        get_webhook_receiver()
     
     # Initialize session state
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
     if 'configs' not in st.session_state:
         st.session_state.configs = None
+    if 'configs_next_url' not in st.session_state:
+        st.session_state.configs_next_url = None
+    if 'config_catalog' not in st.session_state:
+        st.session_state.config_catalog = None
     if 'selected_config' not in st.session_state:
         st.session_state.selected_config = None
     if 'current_view' not in st.session_state:
@@ -1185,8 +1369,9 @@ def main():
     is_sourcing_flow = st.session_state.current_view in ['sourcing_login', 'sourcing_use_case', 'customer_selection', 'sourcing_form']
     
     if not is_sourcing_flow:
-        st.image("https://cf-images.us-east-1.prod.boltdns.net/v1/static/6118377982001/f500d879-d469-4a49-851c-0337de041880/7c4ad13a-f83b-4e57-8cbc-7997519f8c96/1280x720/match/image.jpg?v=20250205.7")
-        st.title("DocuSign CLM Integration")
+        with stage("header"):
+            st.image("https://cf-images.us-east-1.prod.boltdns.net/v1/static/6118377982001/f500d879-d469-4a49-851c-0337de041880/7c4ad13a-f83b-4e57-8cbc-7997519f8c96/1280x720/match/image.jpg?v=20250205.7")
+            st.title("DocuSign CLM Integration")
 
     # Check for callback
     if not st.session_state.authenticated:
@@ -1227,6 +1412,7 @@ def main():
                     st.write(f"DEBUG: Redirect URI determined by get_actual_redirect_uri(): {redirect_uri}")
                     consent_url = auth_handler.get_consent_url(redirect_uri)
                     logger.info(f"Opening DocuSign consent URL: {consent_url}")
+                    import webbrowser
                     webbrowser.open_new_tab(consent_url)
                     st.info("Opening DocuSign authentication in a new tab...")
                     st.info("If the tab doesn't open automatically, click the link below:")
@@ -1263,23 +1449,30 @@ def main():
                         st.session_state.account_id = new_account_id
                         st.rerun()
             else:
-                # Show either catalog or specific interface
-                if st.session_state.current_view == 'catalog':
-                    show_catalog()
-                elif st.session_state.current_view == 'docgen':
-                    show_docgen_interface()
-                elif st.session_state.current_view == 'document_attributes':
-                    show_document_attributes_interface()
-                elif st.session_state.current_view == 'sourcing_login':
-                    show_sourcing_login_interface()
-                elif st.session_state.current_view == 'sourcing_use_case':
-                    show_sourcing_use_case_interface()
-                elif st.session_state.current_view == 'customer_selection':
-                    show_customer_selection_interface()
-                elif st.session_state.current_view == 'sourcing_form':
-                    show_sourcing_form_interface()
-                elif st.session_state.current_view == 'settings':
-                    show_settings_interface()
+                with stage(f"view:{st.session_state.current_view}"):
+                    # Show either catalog or specific interface
+                    if st.session_state.current_view == 'catalog':
+                        show_catalog()
+                    elif st.session_state.current_view == 'docgen':
+                        show_docgen_interface()
+                    elif st.session_state.current_view == 'document_attributes':
+                        show_document_attributes_interface()
+                    elif st.session_state.current_view == 'update_document':
+                        show_update_document_interface()
+                    elif st.session_state.current_view == 'kickoff_workflow':
+                        show_workflow_interface()
+                    elif st.session_state.current_view == 'xml_merge':
+                        show_xml_merge_interface()
+                    elif st.session_state.current_view == 'sourcing_login':
+                        show_sourcing_login_interface()
+                    elif st.session_state.current_view == 'sourcing_use_case':
+                        show_sourcing_use_case_interface()
+                    elif st.session_state.current_view == 'customer_selection':
+                        show_customer_selection_interface()
+                    elif st.session_state.current_view == 'sourcing_form':
+                        show_sourcing_form_interface()
+                    elif st.session_state.current_view == 'settings':
+                        show_settings_interface()
 
             # Only show disconnect button if not in sourcing flow
             if not is_sourcing_flow:
@@ -1290,9 +1483,52 @@ def main():
                     st.session_state.authenticated = False
                     st.session_state.token_data = None
                     st.session_state.configs = None
+                    st.session_state.configs_next_url = None
+                    st.session_state.config_catalog = None
                     st.session_state.selected_config = None
                     logger.info("User disconnected from DocuSign")
                     st.rerun()
 
+# Reruns kept in the profile panel's history
+PROFILE_HISTORY = 20
+
+def show_rerun_profile(profile):
+    """Debug panel with the stage breakdown of this rerun and the totals of recent ones"""
+    with st.expander(f"Rerun Profile ({profile.total_ms:.0f} ms)"):
+        st.dataframe([
+            {"Stage": timing.path, "Calls": timing.calls,
+             "Total ms": round(timing.total_ms, 1), "Self ms": round(timing.self_ms, 1)}
+            for timing in profile.stages()
+        ], hide_index=True)
+        st.caption(f"{profile.unaccounted_ms():.1f} ms outside the instrumented stages (Streamlit and other code)")
+        if profile.dump_path:
+            st.caption(f"cProfile data saved to {profile.dump_path}")
+        history = st.session_state.get('rerun_profiles', [])
+        if history:
+            st.write("Recent reruns (newest first)")
+            st.dataframe(history[::-1], hide_index=True)
+
+def run_profiled():
+    """Run main() with its stages timed, then show the breakdown (PROFILE_RERUNS=1)"""
+    profile = begin_rerun(st.session_state.get('current_view', 'catalog'))
+    try:
+        main()
+    finally:
+        # Also reached when st.rerun() cuts the run short, so every run is recorded
+        end_rerun()
+        slowest = max(profile.stages(), key=lambda timing: timing.self_ms, default=None)
+        history = st.session_state.setdefault('rerun_profiles', [])
+        history.append({
+            "At": datetime.now().strftime('%H:%M:%S'),
+            "View": profile.label,
+            "Total ms": round(profile.total_ms, 1),
+            "Slowest stage": slowest.path if slowest else None
+        })
+        del history[:-PROFILE_HISTORY]
+    show_rerun_profile(profile)
+
 if __name__ == "__main__":
-    main()
+    if PROFILING_ENABLED:
+        run_profiled()
+    else:
+        main()
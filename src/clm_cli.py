@@ -0,0 +1,385 @@
+import os
+import sys
+import json
+import time
+import logging
+import sqlite3
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from clm_client import CLMClient, CLMError
+from config_catalog import ConfigCatalog
+from payload_stream import detect_format, iter_payloads, open_record_file, parse_column_map, template_for_columns
+from task_ledger import TaskLedger, reconcile_pending
+from document_updates import UpdateJournal, apply_updates, iter_updates, summarize
+from document_download import download_documents
+from document_upload import UploadManifest, UploadProgress, iter_upload_files, upload_files
+from region_routing import REGIONS, RegionResolver, make_probe
+from workflow_launcher import DEFAULT_RATE_PER_SECOND, WorkflowLaunch, iter_workflow_launches, launch_workflows, limiter_for
+
+def load_access_token(token=None):
+    """Find an access token: --token, then CLM_ACCESS_TOKEN, then the token file the app saves"""
+    if token:
+        return token
+    if os.getenv('CLM_ACCESS_TOKEN'):
+        return os.getenv('CLM_ACCESS_TOKEN')
+    token_path = os.getenv('TOKEN_PATH', os.path.join('.tokens', 'token.json'))
+    try:
+        with open(token_path, 'r') as f:
+            return json.load(f).get('access_token')
+    except (OSError, ValueError):
+        return None
+
+def write_json(data, output=sys.stdout):
+    output.write(json.dumps(data, indent=2) + '\n')
+
+def write_json_line(data, output=sys.stdout):
+    output.write(json.dumps(data) + '\n')
+    output.flush()
+
+def cmd_configurations(client, args):
+    """List DocLauncher configurations, optionally ranked against a search term"""
+    if args.search:
+        catalog = ConfigCatalog()
+        for page in client.iter_configuration_pages(args.account_id):
+            catalog.add_items(page['Items'])
+        matches = catalog.search(args.search, limit=args.limit)
+        write_json([{'Name': name, 'Href': catalog.href_for(name)} for name in matches])
+        return 0
+
+    if args.jsonl:
+        # Stream each configuration as soon as its page arrives
+        for page in client.iter_configuration_pages(args.account_id):
+            for item in page['Items']:
+                write_json_line(item)
+        return 0
+
+    write_json(client.get_configurations(args.account_id))
+    return 0
+
+def cmd_attributes(client, args):
+    """Print a document with its attribute groups"""
+    write_json(client.get_document_attributes(args.account_id, args.doc_id))
+    return 0
+
+def cmd_launch(client, args):
+    """Create one DocLauncher task"""
+    if args.xml_file:
+        with open(args.xml_file, 'r', encoding='utf-8') as f:
+            xml_payload = f.read()
+    else:
+        xml_payload = args.xml
+    response_data = client.create_doc_launcher_task(args.account_id, args.config, xml_payload)
+    TaskLedger(args.ledger).record_submission(args.account_id, args.config, xml_payload, response_data)
+    write_json(response_data)
+    return 0
+
+def cmd_launch_batch(client, args):
+    """Create one DocLauncher task per record in a CSV/JSONL file, several at a time"""
+    template = template_for_columns(parse_column_map(args.column_map))
+    record_format = args.format or detect_format(args.records)
+    ledger = TaskLedger(args.ledger)
+
+    def launch(result):
+        try:
+            response_data = client.create_doc_launcher_task(args.account_id, args.config, result.payload)
+        except CLMError as e:
+            return {'record': result.record_number, 'ok': False, 'error': str(e)}
+        outcome = {'record': result.record_number, 'ok': True,
+                   'href': response_data.get('Href'), 'status': response_data.get('Status')}
+        try:
+            ledger.record_submission(args.account_id, args.config, result.payload, response_data)
+        except sqlite3.Error as e:
+            # The task exists in CLM either way; report it so it isn't created again
+            outcome['error'] = f"Task created but not recorded in the ledger: {str(e)}"
+        return outcome
+
+    counts = {'ok': 0, 'failed': 0}
+
+    def report(outcome):
+        counts['ok' if outcome['ok'] else 'failed'] += 1
+        write_json_line(outcome)
+
+    with open_record_file(args.records) as records, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        pending = set()
+        for result in iter_payloads(records, record_format, template):
+            if result.error:
+                report({'record': result.record_number, 'ok': False, 'error': result.error})
+                continue
+            pending.add(executor.submit(launch, result))
+            # Keep a bounded number of payloads in flight so huge files stay out of memory
+            if len(pending) >= args.workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(future.result())
+        for future in pending:
+            report(future.result())
+
+    print(f"Launched {counts['ok']} tasks, {counts['failed']} failed", file=sys.stderr)
+    return 0 if not counts['failed'] else 1
+
+def cmd_start_workflow(client, args):
+    """Start one workflow"""
+    if args.xml_file:
+        with open(args.xml_file, 'r', encoding='utf-8') as f:
+            params = f.read()
+    else:
+        params = args.xml
+    result = list(launch_workflows(client, args.account_id, [WorkflowLaunch(1, args.name, params)],
+                                   workers=1, ledger=TaskLedger(args.ledger), limiter=limiter_for(args.account_id)))[0]
+    if result.error:
+        print(result.error, file=sys.stderr)
+        return 1
+    write_json(result._asdict())
+    return 0
+
+def cmd_launch_workflows(client, args):
+    """Start one workflow per record in a CSV/JSONL file, concurrently and under a rate limit"""
+    record_format = args.format or detect_format(args.records)
+    template = template_for_columns(parse_column_map(args.column_map)) if args.column_map else None
+    counts = {'ok': 0, 'failed': 0}
+    with open_record_file(args.records) as records:
+        launches = iter_workflow_launches(records, record_format, default_name=args.name, template=template)
+        for result in launch_workflows(client, args.account_id, launches, workers=args.workers,
+                                       rate_per_second=args.rate, ledger=TaskLedger(args.ledger)):
+            counts['failed' if result.error else 'ok'] += 1
+            write_json_line(result._asdict())
+
+    print(f"Started {counts['ok']} workflows, {counts['failed']} failed", file=sys.stderr)
+    return 0 if not counts['failed'] else 1
+
+def cmd_update_attributes(client, args):
+    """Set document attributes from a CSV/JSONL file, writing only values that differ"""
+    record_format = args.format or detect_format(args.updates)
+    journal = UpdateJournal(args.journal) if args.journal else None
+    try:
+        with open_record_file(args.updates) as records:
+            results = apply_updates(client, args.account_id, iter_updates(records, record_format),
+                                    workers=args.workers, journal=journal, dry_run=args.dry_run)
+            counts = summarize(results, on_result=lambda result: write_json_line(result._asdict()))
+    finally:
+        if journal:
+            journal.close()
+
+    print(", ".join(f"{outcome}: {count}" for outcome, count in sorted(counts.items())) or "No updates",
+          file=sys.stderr)
+    return 0 if not counts.get('failed') else 1
+
+def iter_doc_ids(doc_ids, ids_file=None):
+    """Document ids from the command line, then one per line from ids_file"""
+    yield from doc_ids
+    if ids_file:
+        with open(ids_file, 'r', encoding='utf-8-sig') as f:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+def cmd_download(client, args):
+    """Download document content to a directory, resuming partial files"""
+    bytes_per_second = int(args.max_mbps * 1024 * 1024) if args.max_mbps else None
+    counts = summarize(
+        download_documents(client, args.account_id, iter_doc_ids(args.doc_ids, args.ids_file), args.dest,
+                           workers=args.workers, bytes_per_second=bytes_per_second),
+        on_result=lambda result: write_json_line(result._asdict())
+    )
+    print(", ".join(f"{outcome}: {count}" for outcome, count in sorted(counts.items())) or "No documents",
+          file=sys.stderr)
+    return 0 if not counts.get('failed') else 1
+
+def cmd_upload(client, args):
+    """Upload files and directory trees into a folder, skipping files the manifest has seen"""
+    manifest = UploadManifest(args.manifest) if args.manifest else None
+    progress = UploadProgress()
+    last_report = [time.monotonic()]
+
+    def on_result(result):
+        write_json_line(result._asdict())
+        if time.monotonic() - last_report[0] >= args.progress_seconds:
+            last_report[0] = time.monotonic()
+            print(json.dumps(progress.snapshot()), file=sys.stderr)
+
+    try:
+        summarize(upload_files(client, args.account_id, args.folder_id, iter_upload_files(args.paths),
+                               workers=args.workers, manifest=manifest, progress=progress),
+                  on_result=on_result)
+    finally:
+        if manifest:
+            manifest.close()
+    totals = progress.snapshot()
+    print(json.dumps(totals), file=sys.stderr)
+    return 0 if not totals['failed'] else 1
+
+def cmd_tasks(client, args):
+    """List tasks from the local ledger"""
+    ledger = TaskLedger(args.ledger)
+    if args.counts:
+        write_json(ledger.status_counts(args.account_id, kind=args.kind))
+        return 0
+    if args.pending:
+        tasks = ledger.pending(limit=args.limit, account_id=args.account_id, kind=args.kind)
+    else:
+        tasks = ledger.recent(limit=args.limit, account_id=args.account_id, status=args.status, kind=args.kind)
+    for task in tasks:
+        task['submitted_at'] = datetime.fromtimestamp(task['submitted_at']).isoformat()
+        if task['checked_at']:
+            task['checked_at'] = datetime.fromtimestamp(task['checked_at']).isoformat()
+        write_json_line(task)
+    return 0
+
+def cmd_reconcile(client, args):
+    """Refresh the status of every pending task in the ledger"""
+    totals = reconcile_pending(
+        TaskLedger(args.ledger),
+        client,
+        account_id=args.account_id,
+        kind=args.kind,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        on_batch=lambda totals: print(f"Checked {totals['checked']} tasks", file=sys.stderr)
+    )
+    write_json(totals)
+    return 0 if not totals['failed'] else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless access to the CLM API examples (no Streamlit needed)")
+    parser.add_argument('--token', help="Access token (default: $CLM_ACCESS_TOKEN or the app's saved token file)")
+    parser.add_argument('--account-id', default=os.getenv('DOCUSIGN_ACCOUNT_ID'),
+                        help="CLM account ID (default: $DOCUSIGN_ACCOUNT_ID)")
+    parser.add_argument('--base-url', help="CLM API base URL, bypassing region routing")
+    parser.add_argument('--region', choices=sorted(REGIONS),
+                        help="Region for accounts not in $CLM_ACCOUNT_REGIONS (default: $CLM_REGION or uatna11)")
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--verbose', '-v', action='store_true', help="Log every API call to stderr")
+    parser.add_argument('--ledger', help="Task ledger database (default: $TASK_LEDGER_DB or .tasks/ledger.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    configurations = commands.add_parser('configurations', help="List DocLauncher configurations")
+    configurations.add_argument('--search', help="Return the best matches for this name or ID")
+    configurations.add_argument('--limit', type=int, default=20, help="Matches returned with --search")
+    configurations.add_argument('--jsonl', action='store_true', help="Stream one configuration per line")
+    configurations.set_defaults(handler=cmd_configurations)
+
+    attributes = commands.add_parser('attributes', help="Fetch a document's attributes")
+    attributes.add_argument('doc_id')
+    attributes.set_defaults(handler=cmd_attributes)
+
+    launch = commands.add_parser('launch', help="Create a single DocLauncher task")
+    launch.add_argument('--config', required=True, help="DocLauncher configuration Href")
+    payload = launch.add_mutually_exclusive_group(required=True)
+    payload.add_argument('--xml', help="XML payload")
+    payload.add_argument('--xml-file', help="File containing the XML payload")
+    launch.set_defaults(handler=cmd_launch)
+
+    batch = commands.add_parser('launch-batch', help="Create DocLauncher tasks from a CSV/JSONL record file")
+    batch.add_argument('--config', required=True, help="DocLauncher configuration Href")
+    batch.add_argument('--records', required=True, help="CSV or JSONL record file")
+    batch.add_argument('--map', dest='column_map', action='append', metavar='ELEMENT=COLUMN',
+                       help="Map an XML element to a record column (repeatable)")
+    batch.add_argument('--format', choices=['csv', 'jsonl'], help="Record format, detected from the extension if omitted")
+    batch.add_argument('--workers', type=int, default=4, help="Tasks submitted concurrently")
+    batch.set_defaults(handler=cmd_launch_batch)
+
+    workflow = commands.add_parser('start-workflow', help="Start a single CLM workflow")
+    workflow.add_argument('--name', required=True, help="Workflow name")
+    params = workflow.add_mutually_exclusive_group(required=True)
+    params.add_argument('--xml', help="XML parameters")
+    params.add_argument('--xml-file', help="File containing the XML parameters")
+    workflow.set_defaults(handler=cmd_start_workflow)
+
+    workflows = commands.add_parser('launch-workflows', help="Start CLM workflows from a CSV/JSONL record file")
+    workflows.add_argument('--records', required=True,
+                           help="Records with a workflow column and params XML (or fields for --map)")
+    workflows.add_argument('--name', help="Workflow name for records without a workflow column")
+    workflows.add_argument('--map', dest='column_map', action='append', metavar='ELEMENT=COLUMN',
+                           help="Build the params XML from record columns instead of a params column (repeatable)")
+    workflows.add_argument('--format', choices=['csv', 'jsonl'], help="Record format, detected from the extension if omitted")
+    workflows.add_argument('--workers', type=int, default=8, help="Workflows started concurrently")
+    workflows.add_argument('--rate', type=float, default=DEFAULT_RATE_PER_SECOND,
+                           help="Maximum workflow starts per second, to stay under the account rate limit")
+    workflows.set_defaults(handler=cmd_launch_workflows)
+
+    updates = commands.add_parser('update-attributes', help="Set document attributes in bulk from a CSV/JSONL file")
+    updates.add_argument('--updates', required=True,
+                         help="CSV with doc_id,group,attribute,value columns, or JSONL with doc_id and AttributeGroups")
+    updates.add_argument('--format', choices=['csv', 'jsonl'], help="Record format, detected from the extension if omitted")
+    updates.add_argument('--workers', type=int, default=8, help="Documents updated concurrently")
+    updates.add_argument('--journal', help="Record outcomes here and skip documents it lists as done (resume)")
+    updates.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+    updates.set_defaults(handler=cmd_update_attributes)
+
+    download = commands.add_parser('download', help="Download document content, resuming interrupted transfers")
+    download.add_argument('doc_ids', nargs='*', help="Document IDs")
+    download.add_argument('--ids-file', help="File with one document ID per line")
+    download.add_argument('--dest', required=True, help="Directory to save documents in")
+    download.add_argument('--workers', type=int, default=4, help="Documents downloaded concurrently")
+    download.add_argument('--max-mbps', type=float, help="Combined bandwidth cap in MiB per second")
+    download.set_defaults(handler=cmd_download)
+
+    upload = commands.add_parser('upload', help="Upload files or whole directories into a CLM folder")
+    upload.add_argument('paths', nargs='+', help="Files and directories to upload (directories are walked)")
+    upload.add_argument('--folder-id', required=True, help="Folder to upload into")
+    upload.add_argument('--manifest', help="Record uploads here and skip files already uploaded to the folder")
+    upload.add_argument('--workers', type=int, default=8, help="Files uploaded concurrently")
+    upload.add_argument('--progress-seconds', type=float, default=5, help="How often to print running totals")
+    upload.set_defaults(handler=cmd_upload)
+
+    tasks = commands.add_parser('tasks', help="List submitted tasks from the local ledger")
+    tasks.add_argument('--status', help="Only tasks with this status")
+    tasks.add_argument('--pending', action='store_true', help="Only tasks without a final status")
+    tasks.add_argument('--counts', action='store_true', help="Print the number of tasks per status instead")
+    tasks.add_argument('--kind', choices=['doclauncher', 'workflow'], help="Only DocLauncher tasks or workflows")
+    tasks.add_argument('--limit', type=int, default=100)
+    tasks.set_defaults(handler=cmd_tasks, offline=True)
+
+    reconcile = commands.add_parser('reconcile', help="Refresh the status of every pending task in the ledger")
+    reconcile.add_argument('--batch-size', type=int, default=200, help="Tasks checked per batch")
+    reconcile.add_argument('--workers', type=int, default=8, help="Concurrent status requests")
+    reconcile.add_argument('--kind', choices=['doclauncher', 'workflow'], help="Only DocLauncher tasks or workflows")
+    reconcile.set_defaults(handler=cmd_reconcile)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+
+    if getattr(args, 'offline', False):
+        # Reads only the local ledger, so no token is needed (--account-id just filters)
+        return args.handler(None, args)
+
+    access_token = load_access_token(args.token)
+    if not access_token:
+        print("No access token: pass --token, set CLM_ACCESS_TOKEN or sign in through the app first", file=sys.stderr)
+        return 2
+    if not args.account_id:
+        print("No account ID: pass --account-id or set DOCUSIGN_ACCOUNT_ID", file=sys.stderr)
+        return 2
+
+    endpoints = None
+    if not args.base_url:
+        try:
+            resolver = RegionResolver.from_environment(probe=make_probe(), default_region=args.region)
+            endpoints = resolver.pool_for(args.account_id)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 2
+
+    client = CLMClient(
+        access_token,
+        base_url=args.base_url,
+        endpoints=endpoints,
+        max_retries=args.max_retries,
+        on_retry=lambda message: print(message, file=sys.stderr)
+    )
+    try:
+        return args.handler(client, args)
+    except CLMError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+import os
+import json
+import hashlib
+import time
+import logging
+import http.cookiejar
+from datetime import datetime
+from urllib.parse import urljoin
+
+import requests
+import urllib3
+
+from clm_errors import CLMError
+from rerun_profiler import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://apiuatna11.springcm.com/v2"
+
+# Seconds to wait for CLM before giving up on a request
+DEFAULT_TIMEOUT = 60
+
+# Upper bound on how long a 429 Retry-After is honoured before retrying
+MAX_RETRY_AFTER_SECONDS = 30
+
+# Connections kept open per host; sized for the CLI's concurrent batch commands
+DEFAULT_POOL_SIZE = 32
+
+# Redirect hops followed when resolving a DocLauncher result URL
+MAX_REDIRECTS = 5
+
+def serialize_for_logging(obj):
+    """Convert objects to JSON-serializable format"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    elif hasattr(obj, '__dict__'):
+        return obj.__dict__
+    elif isinstance(obj, (list, tuple)):
+        return [serialize_for_logging(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {k: serialize_for_logging(v) for k, v in obj.items()}
+    return str(obj)
+
+@timed()
+def log_api_call(method, endpoint, request_data=None, response_data=None, error=None):
+    """Log API call details"""
+    # Skip the serialization work entirely when nobody is listening
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    try:
+        log_entry = {
+            "timestamp": datetime.now().isoformat(),
+            "method": method,
+            "endpoint": endpoint,
+            "request": serialize_for_logging(request_data) if request_data else None,
+            "response": serialize_for_logging(response_data) if response_data else None,
+            "error": str(error) if error else None
+        }
+        logger.info(f"API Call: {json.dumps(log_entry, indent=2)}")
+    except Exception as e:
+        logger.error(f"Failed to log API call: {str(e)}")
+
+def make_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    A requests session whose connection pool can serve pool_size concurrent calls. It keeps no
+    cookies: one session is shared by every user's client, and CLM authenticates by bearer token.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def _never_connected(error):
+    """True if a request failed before a connection was made, so the server never saw any of it"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    # requests wraps urllib3's MaxRetryError, whose reason says how the connection failed
+    return isinstance(getattr(error.args[0], 'reason', None), urllib3.exceptions.NewConnectionError)
+
+def _error_message(response):
+    """Pull the CLM error message out of a failed response"""
+    try:
+        return response.json().get('Message', response.text)
+    except Exception:
+        return response.text
+
+class CLMClient:
+    """UI-independent client for the CLM v2 REST API"""
+
+    def __init__(self, access_token, base_url=None, max_retries=3, timeout=DEFAULT_TIMEOUT,
+                 on_retry=None, session=None, coalescer=None, endpoints=None):
+        """
+        on_retry, if given, is called with a short message before each retry so a UI
+        can surface it (the Streamlit app passes st.warning). A RequestCoalescer shared
+        between clients lets identical concurrent GETs make one call to CLM. With an
+        EndpointPool (see region_routing) instead of a base_url, each call goes to the
+        pool's best endpoint and connection failures fail over to the next one.
+        """
+        self.access_token = access_token
+        self.endpoints = endpoints
+        # CLM_API_BASE_URL may list failover hosts; without an endpoint pool only the first is used
+        self._base_url = (base_url or os.getenv('CLM_API_BASE_URL', '').split(',')[0].strip() or DEFAULT_BASE_URL).rstrip('/')
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.on_retry = on_retry
+        # A shared session keeps connections to CLM alive between calls
+        self.session = session or make_session()
+        self.coalescer = coalescer
+
+    @property
+    def base_url(self):
+        return self.endpoints.base_url if self.endpoints else self._base_url
+
+    def _fail_over(self, url):
+        """Mark the endpoint serving url as down; return url moved to the next best endpoint, or None"""
+        if not self.endpoints:
+            return None
+        failed_base = self.endpoints.base_url
+        if not url.startswith(failed_base):
+            return None
+        self.endpoints.mark_down(failed_base)
+        next_base = self.endpoints.base_url
+        if next_base == failed_base:
+            return None
+        logger.warning(f"Failing over from {failed_base} to {next_base}")
+        return next_base + url[len(failed_base):]
+
+    @property
+    def headers(self):
+        return {
+            'Authorization': f"Bearer {self.access_token}",
+            'Content-Type': 'application/json'
+        }
+
+    def _retry(self, message, retry_count):
+        if self.on_retry:
+            self.on_retry(f"{message}, retrying... (Attempt {retry_count + 1}/{self.max_retries})")
+
+    @timed('clm_request')
+    def request(self, method, url, ok_statuses=(200,), max_retries=None, pace=None, **kwargs):
+        """
+        Send a request with retries on server errors, throttling and connection failures.
+        Pass max_retries=1 for bodies that can't be sent twice, such as a streamed file.
+        pace, if given, is called before every attempt, retries included, e.g. a rate limiter.
+        """
+        kwargs.setdefault('headers', self.headers)
+        kwargs.setdefault('timeout', self.timeout)
+        max_retries = self.max_retries if max_retries is None else max_retries
+
+        retry_count = 0
+        while True:
+            if pace:
+                pace()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if _never_connected(e):
+                    # Nothing reached the server, so another endpoint can take the request without
+                    # using up a retry; bodies that can't be sent twice are still only sent once
+                    moved_url = self._fail_over(url)
+                    if moved_url and max_retries > 1:
+                        url = moved_url
+                        continue
+                retry_count += 1
+                if retry_count < max_retries:
+                    self._retry("Connection error", retry_count)
+                    continue
+                raise CLMError(f"Failed to connect after {max_retries} attempts: {str(e)}") from e
+
+            if response.status_code == 500:
+                retry_count += 1
+                if retry_count < max_retries:
+                    self._retry("Server error", retry_count)
+                    continue
+                raise CLMError("Maximum retries reached. Please try again later.", status_code=500)
+
+            if response.status_code == 429:
+                retry_count += 1
+                if retry_count < max_retries:
+                    self._retry("Rate limited", retry_count)
+                    try:
+                        delay = float(response.headers.get('Retry-After', 1))
+                    except ValueError:
+                        delay = 1
+                    time.sleep(min(max(delay, 0), MAX_RETRY_AFTER_SECONDS))
+                    continue
+                raise CLMError("Rate limit exceeded. Please try again later.", status_code=429)
+
+            if response.status_code not in ok_statuses:
+                error_msg = f"API Error ({response.status_code}): {_error_message(response)}"
+                logger.error(error_msg)
+                raise CLMError(error_msg, status_code=response.status_code)
+
+            return response
+
+    def request_json(self, method, url, ok_statuses=(200,), max_retries=None, pace=None, **kwargs):
+        """Send a request and return the decoded JSON body, logging both sides of the call"""
+        log_api_call(method, url, request_data=kwargs.get('json'))
+        send = lambda: self.request(method, url, ok_statuses=ok_statuses, max_retries=max_retries, pace=pace, **kwargs)
+        if self.coalescer and method == "GET":
+            # Callers share the response, but each decodes its own copy of the JSON below.
+            # The token is part of the key so users with different permissions never share data.
+            key = (method, url, json.dumps(kwargs.get('params'), sort_keys=True),
+                   hashlib.sha256(self.access_token.encode('utf-8')).hexdigest())
+            response = self.coalescer.do(key, send)
+        else:
+            response = send()
+        try:
+            response_data = response.json()
+        except ValueError:
+            raise CLMError(f"API Error ({response.status_code}): {response.text}",
+                           status_code=response.status_code) from None
+        log_api_call(method, url, response_data=response_data)
+        return response_data
+
+    def iter_configuration_pages(self, account_id, start_url=None):
+        """Yield pages of DocLauncher configurations as they arrive, following the Next links"""
+        next_url = start_url or f"{self.base_url}/{account_id}/doclauncherconfigurations?limit=100"
+        while next_url:
+            response_data = self.request_json("GET", next_url)
+            next_url = response_data.get('Next')
+            yield {
+                'Items': response_data.get('Items', []),
+                'Next': next_url
+            }
+
+    def get_configurations(self, account_id):
+        """Fetch every DocLauncher configuration"""
+        all_items = []
+        for page in self.iter_configuration_pages(account_id):
+            all_items.extend(page['Items'])
+        return {
+            'Items': all_items,
+            'Total': len(all_items)
+        }
+
+    def create_doc_launcher_task(self, account_id, config_href, xml_payload):
+        """Create a DocLauncher task from an XML payload"""
+        data = {
+            "Data": xml_payload,
+            "DataType": "XML",
+            "DocLauncherConfiguration": {
+                "Href": config_href
+            }
+        }
+        endpoint = f"{self.base_url}/{account_id}/doclaunchertasks"
+        response_data = self.request_json("POST", endpoint, ok_statuses=(200, 202), json=data)
+        logger.info(f"DocLauncher task created successfully: {response_data}")
+        return response_data
+
+    def start_workflow(self, account_id, name, params_xml, pace=None):
+        """Start a CLM workflow by name with XML parameters; pace is called before each attempt"""
+        data = {
+            "Name": name,
+            "Params": params_xml
+        }
+        endpoint = f"{self.base_url}/{account_id}/workflows"
+        response_data = self.request_json("POST", endpoint, ok_statuses=(200, 201, 202), pace=pace, json=data)
+        logger.info(f"Workflow started successfully: {response_data}")
+        return response_data
+
+    def get_document_attributes(self, account_id, doc_id):
+        """Fetch a document with its attribute groups expanded"""
+        endpoint = f"{self.base_url}/{account_id}/documents/{doc_id}?expand=AttributeGroups"
+        return self.request_json("GET", endpoint)
+
+    def get_document(self, account_id, doc_id):
+        """Fetch a document's metadata (name, size, download link) without its attributes"""
+        return self.request_json("GET", f"{self.base_url}/{account_id}/documents/{doc_id}")
+
+    def document_content_url(self, account_id, doc_id, document=None):
+        """Where a document's content is downloaded from, preferring the link CLM gives"""
+        return (document or {}).get('DownloadDocumentHref') or f"{self.base_url}/{account_id}/documents/{doc_id}/content"
+
+    def open_document_content(self, content_url, offset=0, etag=None):
+        """
+        Start streaming document content, optionally from a byte offset. The caller reads
+        the returned response in chunks and must close it. With an etag, CLM answers 200
+        with the whole file instead of 206 if the document changed since it was started.
+        """
+        headers = {'Authorization': f"Bearer {self.access_token}", 'Accept': '*/*'}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            if etag:
+                headers['If-Range'] = etag
+        return self.request("GET", content_url, ok_statuses=(200, 206), headers=headers, stream=True)
+
+    def upload_document(self, account_id, folder_id, name, body, size, content_type='application/octet-stream'):
+        """
+        Upload a document into a folder, streaming `body` (a file-like object of `size` bytes)
+        rather than reading it into memory. Sent once: a file body can't be replayed, so
+        retrying is left to the caller, who can reopen the file.
+        """
+        upload_base_url = (os.getenv('CLM_UPLOAD_BASE_URL') or
+                           (self.endpoints and self.endpoints.upload_url) or self.base_url).rstrip('/')
+        headers = {
+            'Authorization': f"Bearer {self.access_token}",
+            'Content-Type': content_type,
+            'Content-Length': str(size)
+        }
+        endpoint = f"{upload_base_url}/{account_id}/folders/{folder_id}/documents"
+        return self.request_json("POST", endpoint, ok_statuses=(200, 201), max_retries=1,
+                                 params={'name': name}, headers=headers, data=body)
+
+    def update_document_attributes(self, account_id, doc_id, attribute_groups):
+        """PATCH the given attribute groups onto a document"""
+        endpoint = f"{self.base_url}/{account_id}/documents/{doc_id}"
+        return self.request_json("PATCH", endpoint, json={"AttributeGroups": attribute_groups})
+
+    def resolve_result_url(self, result_url):
+        """
+        Find the page a DocLauncher result URL redirects to without downloading it:
+        each hop is a HEAD request (GET without reading the body if HEAD isn't allowed)
+        and only the Location header is read.
+        """
+        headers = {'Authorization': f"Bearer {self.access_token}", 'Accept': 'text/html'}
+        url = result_url
+        for _ in range(MAX_REDIRECTS):
+            try:
+                response = self.session.head(url, headers=headers, allow_redirects=False, timeout=self.timeout)
+                if response.status_code in (405, 501):
+                    response = self.session.get(url, headers=headers, allow_redirects=False,
+                                                stream=True, timeout=self.timeout)
+                    response.close()
+            except requests.exceptions.RequestException as e:
+                raise CLMError(f"Failed to resolve DocLauncher URL: {str(e)}") from e
+            if response.is_redirect:
+                next_url = urljoin(url, response.headers['Location'])
+                # As requests does when following redirects: the token never goes to another host
+                if 'Authorization' in headers and self.session.should_strip_auth(url, next_url):
+                    headers = {'Accept': 'text/html'}
+                url = next_url
+                continue
+            if response.status_code == 200:
+                return url
+            raise CLMError(f"Failed to get DocLauncher URL: {response.status_code}", status_code=response.status_code)
+        raise CLMError(f"Failed to get DocLauncher URL: more than {MAX_REDIRECTS} redirects")
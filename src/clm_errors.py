@@ -0,0 +1,9 @@
+# Kept apart from clm_client so modules that only handle errors don't import requests
+
+class CLMError(Exception):
+    """Raised when a CLM API call fails; the message is ready to show to a user"""
+
+    def __init__(self, message, status_code=None, response_data=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_data = response_data
@@ -0,0 +1,489 @@
+import os
+import sys
+import json
+import base64
+import hashlib
+import time
+import uuid
+import random
+import re
+import argparse
+import threading
+import urllib.request
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from webhook_receiver import SIGNATURE_HEADER_PREFIX, sign_payload
+
+class SimulatorConfig:
+    """Behaviour knobs for the simulator"""
+
+    def __init__(self, latency_ms=0, latency_jitter_ms=0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after_seconds=1, configuration_count=250, attribute_groups=5,
+                 attributes_per_group=20, payload_padding_bytes=0, result_urls=True, task_seconds=0,
+                 rate_limit=0, document_bytes=256 * 1024, interrupt_rate=0.0, webhook_url=None, webhook_secret=None, seed=None):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.configuration_count = configuration_count
+        self.attribute_groups = attribute_groups
+        self.attributes_per_group = attributes_per_group
+        self.payload_padding_bytes = payload_padding_bytes
+        self.result_urls = result_urls
+        # Tasks and workflows stay in progress for this long before completing
+        self.task_seconds = task_seconds
+        # Requests per second answered before 429s start (0 disables), like a CLM account limit
+        self.rate_limit = rate_limit
+        # Size of each document's content, and the fraction of downloads cut off halfway
+        self.document_bytes = document_bytes
+        self.interrupt_rate = interrupt_rate
+        # Completion notifications are POSTed here, signed with webhook_secret
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.seed = seed
+
+class SimulatorState:
+    """In-memory data shared by all request handler threads"""
+
+    def __init__(self, config):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.workflows = {}
+        self.document_attributes = {}
+        self.uploads = {}
+        self.request_count = 0
+        self.window_start = 0
+        self.window_count = 0
+
+    def over_rate_limit(self):
+        """Count a request against the current one-second window"""
+        if not self.config.rate_limit:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            return self.window_count > self.config.rate_limit
+
+    def notify_completion(self, event_type, resource):
+        """Send a completion event to the webhook URL once the resource finishes"""
+        if not self.config.webhook_url:
+            return
+        body = json.dumps(dict(resource, EventId=str(uuid.uuid4()), EventType=event_type)).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.config.webhook_secret:
+            headers[f"{SIGNATURE_HEADER_PREFIX}1"] = sign_payload(body, self.config.webhook_secret)
+
+        def send():
+            request = urllib.request.Request(self.config.webhook_url, data=body, headers=headers, method='POST')
+            try:
+                urllib.request.urlopen(request, timeout=10).close()
+            except OSError as e:
+                print(f"Webhook delivery failed: {e}", file=sys.stderr)
+
+        timer = threading.Timer(self.config.task_seconds, send)
+        timer.daemon = True
+        timer.start()
+
+    def count_request(self):
+        with self.lock:
+            self.request_count += 1
+
+    def roll(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """Routes requests to the emulated endpoints"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CLMSimulator/1.0"
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def log_message(self, format, *args):
+        # Keep benchmark and load-test output readable
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        self._send_body(status, json.dumps(body).encode('utf-8'), 'application/json', headers)
+
+    def _send_body(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _padding(self):
+        size = self.state.config.payload_padding_bytes
+        return 'x' * size if size else None
+
+    def _simulate_conditions(self):
+        """Apply latency, throttling and server errors; return True if a response was already sent"""
+        config = self.state.config
+        if config.latency_ms or config.latency_jitter_ms:
+            jitter = self.state.random.uniform(0, config.latency_jitter_ms) if config.latency_jitter_ms else 0
+            time.sleep((config.latency_ms + jitter) / 1000.0)
+        if self.state.over_rate_limit() or self.state.roll(config.throttle_rate):
+            self._send_json(429, {"Message": "Too many requests"},
+                            headers={'Retry-After': str(config.retry_after_seconds)})
+            return True
+        if self.state.roll(config.error_rate):
+            self._send_json(500, {"Message": "Simulated server error"})
+            return True
+        return False
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.request_body = self._read_body() if self.command in ('POST', 'PATCH', 'PUT') else b''
+        self.state.count_request()
+
+        if self._simulate_conditions():
+            return
+
+        if parts[:2] == ['oauth', 'token'] and self.command == 'POST':
+            return self._oauth_token()
+        if parts[:2] == ['services', 'getStatus']:
+            return self._contract_status(parts[2:])
+        if parts[:2] == ['doclauncher', 'result'] and len(parts) == 3:
+            return self._doclauncher_result(parts[2])
+        if parts[:2] == ['doclauncher', 'form'] and len(parts) == 3:
+            return self._send_body(200, b"<html><body>DocLauncher form</body></html>", 'text/html')
+        if len(parts) >= 3 and parts[0] == 'v2':
+            account_id, resource, rest = parts[1], parts[2], parts[3:]
+            if resource == 'doclauncherconfigurations' and not rest and self.command == 'GET':
+                return self._configurations(account_id, query)
+            if resource == 'doclaunchertasks' and not rest and self.command == 'POST':
+                return self._create_task(account_id)
+            if resource == 'doclaunchertasks' and len(rest) == 1 and self.command == 'GET':
+                return self._get_task(account_id, rest[0])
+            if resource == 'workflows' and not rest and self.command == 'POST':
+                return self._start_workflow(account_id)
+            if resource == 'workflows' and len(rest) == 1 and self.command == 'GET':
+                return self._get_workflow(account_id, rest[0])
+            if resource == 'documents' and len(rest) == 1 and self.command == 'GET':
+                return self._document(account_id, rest[0])
+            if resource == 'documents' and len(rest) == 2 and rest[1] == 'content' and self.command == 'GET':
+                return self._document_content(rest[0])
+            if resource == 'folders' and len(rest) == 2 and rest[1] == 'documents' and self.command == 'POST':
+                return self._upload_document(account_id, rest[0], query)
+            if resource == 'documents' and len(rest) == 1 and self.command == 'PATCH':
+                return self._update_document(account_id, rest[0])
+        self._send_json(404, {"Message": f"No simulated endpoint for {self.command} {url.path}"})
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_HEAD(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PATCH(self):
+        self._dispatch()
+
+    def _oauth_token(self):
+        self._send_json(200, {
+            "access_token": f"sim-{uuid.uuid4().hex}",
+            "refresh_token": f"sim-refresh-{uuid.uuid4().hex}",
+            "token_type": "Bearer",
+            "expires_in": 28800
+        })
+
+    def _contract_status(self, parts):
+        self._send_json(200, {
+            "user": parts[0] if parts else None,
+            "agreement_type": parts[1] if len(parts) > 1 else None,
+            "contract_status": self.state.random.choice(["Draft", "In Review", "Approved", "Signed"]),
+            "padding": self._padding()
+        })
+
+    def _configurations(self, account_id, query):
+        config = self.state.config
+        limit = max(1, min(int(query.get('limit', 100)), 1000))
+        offset = max(0, int(query.get('offset', 0)))
+        collection_url = f"{self.base_url}/v2/{account_id}/doclauncherconfigurations"
+        items = []
+        for index in range(offset, min(offset + limit, config.configuration_count)):
+            config_id = str(uuid.UUID(int=index + 1))
+            items.append({
+                "Name": f"Simulated Configuration {index + 1}",
+                "Id": config_id,
+                "Href": f"{collection_url}/{config_id}",
+                "Description": self._padding()
+            })
+        body = {"Items": items, "Total": config.configuration_count, "Offset": offset, "Limit": limit}
+        if offset + limit < config.configuration_count:
+            body["Next"] = f"{collection_url}?limit={limit}&offset={offset + limit}"
+        self._send_json(200, body)
+
+    def _create_task(self, account_id):
+        try:
+            data = json.loads(self.request_body or b'{}')
+        except ValueError:
+            return self._send_json(400, {"Message": "Request body is not valid JSON"})
+        if not data.get("Data") or not (data.get("DocLauncherConfiguration") or {}).get("Href"):
+            return self._send_json(400, {"Message": "Data and DocLauncherConfiguration.Href are required"})
+
+        task_id = str(uuid.uuid4())
+        task = {
+            "Href": f"{self.base_url}/v2/{account_id}/doclaunchertasks/{task_id}",
+            "Status": "Processing" if self.state.config.task_seconds else "Success",
+            "DocLauncherConfiguration": data["DocLauncherConfiguration"],
+            "CreatedDate": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        if self.state.config.result_urls:
+            task["DocLauncherResultUrl"] = f"{self.base_url}/doclauncher/result/{task_id}"
+        with self.state.lock:
+            self.state.tasks[task_id] = (task, time.monotonic())
+        self.state.notify_completion("DocLauncherTask.Completed", dict(task, Status="Success"))
+        self._send_json(202, task)
+
+    def _get_task(self, account_id, task_id):
+        with self.state.lock:
+            task, created = self.state.tasks.get(task_id, (None, None))
+        if not task:
+            return self._send_json(404, {"Message": "Task not found"})
+        if task["Status"] == "Processing" and time.monotonic() - created >= self.state.config.task_seconds:
+            task = dict(task, Status="Success")
+        self._send_json(200, task)
+
+    def _start_workflow(self, account_id):
+        try:
+            data = json.loads(self.request_body or b'{}')
+        except ValueError:
+            return self._send_json(400, {"Message": "Request body is not valid JSON"})
+        if not data.get("Name") or not data.get("Params"):
+            return self._send_json(400, {"Message": "Name and Params are required"})
+
+        workflow_id = str(uuid.uuid4())
+        workflow = {
+            "Href": f"{self.base_url}/v2/{account_id}/workflows/{workflow_id}",
+            "Name": data["Name"],
+            "Status": "Running" if self.state.config.task_seconds else "Completed",
+            "StartDate": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        with self.state.lock:
+            self.state.workflows[workflow_id] = (workflow, time.monotonic())
+        self.state.notify_completion("Workflow.Completed", dict(workflow, Status="Completed"))
+        self._send_json(201, workflow)
+
+    def _get_workflow(self, account_id, workflow_id):
+        with self.state.lock:
+            workflow, started = self.state.workflows.get(workflow_id, (None, None))
+        if not workflow:
+            return self._send_json(404, {"Message": "Workflow not found"})
+        if workflow["Status"] == "Running" and time.monotonic() - started >= self.state.config.task_seconds:
+            workflow = dict(workflow, Status="Completed")
+        self._send_json(200, workflow)
+
+    def _doclauncher_result(self, task_id):
+        self._send_body(302, b'', 'text/html', headers={
+            'Location': f"{self.base_url}/doclauncher/form/{task_id}"
+        })
+
+    def _document_body(self, account_id, doc_id):
+        config = self.state.config
+        groups = {}
+        for group_index in range(config.attribute_groups):
+            groups[f"Group {group_index + 1}"] = {
+                f"Attribute {attribute_index + 1}": {
+                    "AttributeType": "Text",
+                    "Value": f"Value {group_index + 1}.{attribute_index + 1}"
+                }
+                for attribute_index in range(config.attributes_per_group)
+            }
+        # Apply anything PATCHed earlier
+        with self.state.lock:
+            for group, attributes in self.state.document_attributes.get(doc_id, {}).items():
+                groups.setdefault(group, {}).update(attributes)
+        return {
+            "Name": f"Document {doc_id}.pdf",
+            "Href": f"{self.base_url}/v2/{account_id}/documents/{doc_id}",
+            "DownloadDocumentHref": f"{self.base_url}/v2/{account_id}/documents/{doc_id}/content",
+            "NativeFileSize": self.state.config.document_bytes,
+            "AttributeGroups": groups,
+            "Description": self._padding()
+        }
+
+    def _document(self, account_id, doc_id):
+        self._send_json(200, self._document_body(account_id, doc_id))
+
+    def _document_content(self, doc_id):
+        """Deterministic content per document, with Range/If-Range support and a Digest header"""
+        block = hashlib.sha256(doc_id.encode('utf-8')).digest() * 1024
+        size = self.state.config.document_bytes
+        content = (block * (size // len(block) + 1))[:size]
+        etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+        headers = {
+            'ETag': etag,
+            'Accept-Ranges': 'bytes',
+            'Digest': f"sha-256={base64.b64encode(hashlib.sha256(content).digest()).decode('ascii')}"
+        }
+        status, start = 200, 0
+        match = re.match(r'^bytes=(\d+)-$', self.headers.get('Range') or '')
+        if match and self.headers.get('If-Range', etag) == etag and int(match.group(1)) < size:
+            status, start = 206, int(match.group(1))
+            headers['Content-Range'] = f"bytes {start}-{size - 1}/{size}"
+        body = content[start:]
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.state.roll(self.state.config.interrupt_rate):
+            # Drop the connection halfway through, like a flaky network
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def _upload_document(self, account_id, folder_id, query):
+        if not query.get('name'):
+            return self._send_json(400, {"Message": "name is required"})
+        doc_id = str(uuid.uuid4())
+        with self.state.lock:
+            self.state.uploads[doc_id] = (folder_id, query['name'], len(self.request_body))
+        self._send_json(201, {
+            "Name": query['name'],
+            "Href": f"{self.base_url}/v2/{account_id}/documents/{doc_id}",
+            "NativeFileSize": len(self.request_body),
+            "ParentFolder": {"Href": f"{self.base_url}/v2/{account_id}/folders/{folder_id}"}
+        })
+
+    def _update_document(self, account_id, doc_id):
+        try:
+            groups = json.loads(self.request_body or b'{}').get("AttributeGroups")
+        except ValueError:
+            return self._send_json(400, {"Message": "Request body is not valid JSON"})
+        if not isinstance(groups, dict):
+            return self._send_json(400, {"Message": "AttributeGroups is required"})
+        with self.state.lock:
+            stored = self.state.document_attributes.setdefault(doc_id, {})
+            for group, attributes in groups.items():
+                stored.setdefault(group, {}).update(attributes)
+        self._send_json(200, self._document_body(account_id, doc_id))
+
+class CLMSimulator:
+    """Runs the simulator on a background thread (used by benchmarks and load tests)"""
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), SimulatorHandler)
+        self.server.daemon_threads = True
+        self.server.state = SimulatorState(config or SimulatorConfig())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def environment(self):
+        """Environment variables that point the app at this simulator"""
+        return {
+            'CLM_API_BASE_URL': f"{self.base_url}/v2",
+            'DOCUSIGN_OAUTH_BASE_URL': f"{self.base_url}/oauth",
+            'TELEMETRY_SERVICE_URL': self.base_url
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local CLM API simulator for load and latency testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help="Fixed latency added to every response")
+    parser.add_argument('--latency-jitter-ms', type=float, default=0, help="Random extra latency, up to this many ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument('--configurations', type=int, default=250, help="Number of DocLauncher configurations")
+    parser.add_argument('--attribute-groups', type=int, default=5, help="Attribute groups per document")
+    parser.add_argument('--attributes-per-group', type=int, default=20, help="Attributes in each group")
+    parser.add_argument('--padding-bytes', type=int, default=0, help="Extra bytes added to each item to grow payloads")
+    parser.add_argument('--no-result-urls', action='store_true', help="Leave DocLauncherResultUrl out of task responses")
+    parser.add_argument('--task-seconds', type=float, default=0, help="Seconds a new task or workflow stays in progress")
+    parser.add_argument('--rate-limit', type=int, default=0, help="Requests per second before answering 429 (0: no limit)")
+    parser.add_argument('--document-bytes', type=int, default=256 * 1024, help="Size of each document's content")
+    parser.add_argument('--interrupt-rate', type=float, default=0.0,
+                        help="Fraction of content downloads cut off halfway, to exercise resume")
+    parser.add_argument('--webhook-url', help="POST signed completion events for tasks and workflows here")
+    parser.add_argument('--webhook-secret', help="HMAC key for webhook signatures (default: WEBHOOK_SECRET)")
+    parser.add_argument('--seed', type=int, help="Random seed for reproducible error and latency patterns")
+    args = parser.parse_args(argv)
+
+    config = SimulatorConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_seconds=args.retry_after,
+        configuration_count=args.configurations,
+        attribute_groups=args.attribute_groups,
+        attributes_per_group=args.attributes_per_group,
+        payload_padding_bytes=args.padding_bytes,
+        result_urls=not args.no_result_urls,
+        task_seconds=args.task_seconds,
+        rate_limit=args.rate_limit,
+        document_bytes=args.document_bytes,
+        interrupt_rate=args.interrupt_rate,
+        webhook_url=args.webhook_url,
+        webhook_secret=args.webhook_secret or os.getenv('WEBHOOK_SECRET'),
+        seed=args.seed
+    )
+    simulator = CLMSimulator(config, host=args.host, port=args.port)
+    print(f"CLM simulator listening on {simulator.base_url}")
+    print("Point the app at it with:")
+    for key, value in simulator.environment.items():
+        print(f"  {key}={value}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import re
+import heapq
+from difflib import SequenceMatcher
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def config_display_name(config):
+    """Build the label shown for a DocGen configuration in the selector"""
+    name = config.get('Name', '')
+    config_id = config.get('Id', '')
+    return f"{name} ({config_id})" if name and config_id else name or 'Unnamed'
+
+def _trigrams(text):
+    """Return the set of character trigrams of a string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class ConfigCatalog:
+    """Searchable index over DocGen configurations, built once per fetch and extended page by page"""
+
+    # Rank buckets, lower is better
+    RANK_EXACT = 0
+    RANK_NAME_PREFIX = 1
+    RANK_TOKEN_PREFIX = 2
+    RANK_SUBSTRING = 3
+    RANK_FUZZY = 4
+
+    def __init__(self, items=None):
+        self.names = []            # display names in fetch order
+        self.hrefs = {}            # display name -> configuration Href
+        self._positions = {}       # display name -> position in self.names
+        self._search_text = []     # lower-cased display name per position
+        self._trie = {}            # token prefix trie, each node keeps the positions below it
+        self._trigram_index = defaultdict(set)
+        if items:
+            self.add_items(items)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_items(self, items):
+        """Index a page of configuration items"""
+        for config in items:
+            display_name = config_display_name(config)
+            if display_name in self._positions:
+                # Same label seen again, the latest Href wins as it did with the plain dict
+                self.hrefs[display_name] = config.get('Href')
+                continue
+
+            position = len(self.names)
+            search_text = display_name.lower()
+            self.names.append(display_name)
+            self.hrefs[display_name] = config.get('Href')
+            self._positions[display_name] = position
+            self._search_text.append(search_text)
+
+            for token in set(TOKEN_PATTERN.findall(search_text)):
+                node = self._trie
+                for char in token:
+                    node = node.setdefault(char, {'': set()})
+                    node[''].add(position)
+
+            for trigram in _trigrams(search_text):
+                self._trigram_index[trigram].add(position)
+
+    def href_for(self, display_name):
+        """Return the Href for a display name, or None"""
+        return self.hrefs.get(display_name)
+
+    def _prefix_positions(self, token):
+        """Return positions of entries with a token starting with the given prefix"""
+        node = self._trie
+        for char in token:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node['']
+
+    def search(self, query, limit=20):
+        """Return up to limit display names ranked by how well they match the query"""
+        query = (query or '').strip().lower()
+        if not query:
+            return self.names[:limit]
+
+        ranked = {}
+
+        def consider(position, rank):
+            if rank < ranked.get(position, rank + 1):
+                ranked[position] = rank
+
+        # Every query token has to prefix-match some token of the entry
+        query_tokens = TOKEN_PATTERN.findall(query)
+        if query_tokens:
+            candidates = None
+            for token in query_tokens:
+                positions = self._prefix_positions(token)
+                candidates = set(positions) if candidates is None else candidates & positions
+                if not candidates:
+                    break
+            for position in candidates or ():
+                text = self._search_text[position]
+                if text == query:
+                    consider(position, self.RANK_EXACT)
+                elif text.startswith(query):
+                    consider(position, self.RANK_NAME_PREFIX)
+                else:
+                    consider(position, self.RANK_TOKEN_PREFIX)
+
+        # Substring matches, narrowed through the trigram index first
+        query_trigrams = _trigrams(query)
+        if query_trigrams:
+            postings = sorted((self._trigram_index.get(t, set()) for t in query_trigrams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:]) if postings[0] else set()
+            for position in candidates:
+                if query in self._search_text[position]:
+                    consider(position, self.RANK_SUBSTRING)
+        else:
+            # Too short for trigrams, fall back to a direct scan of the lower-cased names
+            for position, text in enumerate(self._search_text):
+                if query in text:
+                    consider(position, self.RANK_SUBSTRING)
+
+        # Only reach for fuzzy matches when the exact passes did not fill the list
+        if len(ranked) < limit and len(query_trigrams) >= 2:
+            shared = Counter()
+            for trigram in query_trigrams:
+                for position in self._trigram_index.get(trigram, ()):
+                    if position not in ranked:
+                        shared[position] += 1
+            threshold = max(1, len(query_trigrams) // 2)
+            fuzzy = []
+            for position, count in shared.most_common(limit * 5):
+                if count < threshold:
+                    break
+                ratio = SequenceMatcher(None, query, self._search_text[position]).ratio()
+                fuzzy.append((-count, -ratio, position))
+            for _, _, position in heapq.nsmallest(limit - len(ranked), fuzzy):
+                consider(position, self.RANK_FUZZY)
+
+        best = heapq.nsmallest(limit, ranked.items(), key=lambda item: (item[1], item[0]))
+        return [self.names[position] for position, _ in best]
@@ -0,0 +1,261 @@
+import os
+import re
+import sys
+import json
+import bisect
+import sqlite3
+import argparse
+import threading
+
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def customer_id(customer):
+    """Return the identifier of a customer record, falling back to its name"""
+    return str(customer.get("id") or customer["name"])
+
+class CustomerDirectory:
+    """Interface for customer lookups used by the sourcing flow"""
+
+    def get(self, customer_id):
+        """Return the customer with the given id, or None"""
+        raise NotImplementedError
+
+    def get_by_name(self, name):
+        """Return the customer with the given name (case-insensitive), or None"""
+        raise NotImplementedError
+
+    def search(self, query="", limit=20, offset=0):
+        """Return one page of customers matching a typeahead query, ordered for display"""
+        raise NotImplementedError
+
+class InMemoryCustomerDirectory(CustomerDirectory):
+    """Dictionary-backed directory for small customer lists such as the demo data"""
+
+    def __init__(self, customers=()):
+        self._by_id = {}
+        self._by_name = {}
+        self._sorted_names = []   # (lower-cased name, id), kept sorted for prefix search
+        for customer in customers:
+            self.add(customer)
+
+    def add(self, customer):
+        """Add or replace a customer"""
+        key = customer_id(customer)
+        if key in self._by_id:
+            old = self._by_id[key]
+            old_name = old["name"].lower()
+            self._sorted_names.pop(bisect.bisect_left(self._sorted_names, (old_name, key)))
+            if self._by_name.get(old_name) is old:
+                # A renamed customer gives up its old name, to another customer called that if any
+                index = bisect.bisect_left(self._sorted_names, (old_name,))
+                if index < len(self._sorted_names) and self._sorted_names[index][0] == old_name:
+                    self._by_name[old_name] = self._by_id[self._sorted_names[index][1]]
+                else:
+                    del self._by_name[old_name]
+        self._by_id[key] = customer
+        self._by_name[customer["name"].lower()] = customer
+        bisect.insort(self._sorted_names, (customer["name"].lower(), key))
+
+    def get(self, customer_id):
+        return self._by_id.get(str(customer_id))
+
+    def get_by_name(self, name):
+        return self._by_name.get((name or "").lower())
+
+    def search(self, query="", limit=20, offset=0):
+        query = (query or "").strip().lower()
+        if not query:
+            matches = self._sorted_names[offset:offset + limit]
+            return [self._by_id[key] for _, key in matches]
+
+        # Name prefix matches come straight from the sorted list, then other word matches
+        start = bisect.bisect_left(self._sorted_names, (query,))
+        results = []
+        seen = set()
+        for name, key in self._sorted_names[start:]:
+            if not name.startswith(query):
+                break
+            results.append(key)
+            seen.add(key)
+        tokens = SEARCH_TOKEN_PATTERN.findall(query)
+        for name, key in self._sorted_names:
+            if key in seen:
+                continue
+            words = SEARCH_TOKEN_PATTERN.findall(name)
+            if all(any(word.startswith(token) for word in words) for token in tokens):
+                results.append(key)
+        return [self._by_id[key] for key in results[offset:offset + limit]]
+
+class SQLiteCustomerDirectory(CustomerDirectory):
+    """SQLite-backed directory with an FTS5 index for typeahead over large customer masters"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS customers (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            city TEXT,
+            country TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS customers_name ON customers (name COLLATE NOCASE);
+    """
+
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+            name, city, country, content='customers', content_rowid='rowid'
+        );
+        CREATE TRIGGER IF NOT EXISTS customers_ai AFTER INSERT ON customers BEGIN
+            INSERT INTO customers_fts (rowid, name, city, country)
+            VALUES (new.rowid, new.name, new.city, new.country);
+        END;
+        CREATE TRIGGER IF NOT EXISTS customers_ad AFTER DELETE ON customers BEGIN
+            INSERT INTO customers_fts (customers_fts, rowid, name, city, country)
+            VALUES ('delete', old.rowid, old.name, old.city, old.country);
+        END;
+        CREATE TRIGGER IF NOT EXISTS customers_au AFTER UPDATE ON customers BEGIN
+            INSERT INTO customers_fts (customers_fts, rowid, name, city, country)
+            VALUES ('delete', old.rowid, old.name, old.city, old.country);
+            INSERT INTO customers_fts (rowid, name, city, country)
+            VALUES (new.rowid, new.name, new.city, new.country);
+        END;
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Streamlit reruns happen on different threads, so share one connection behind a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+            try:
+                self._conn.executescript(self.FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite builds without FTS5 fall back to indexed name prefix search
+                self.has_fts = False
+
+    def close(self):
+        self._conn.close()
+
+    def import_customers(self, customers, batch_size=5000):
+        """Insert or update customers in batches, returning the number written"""
+        sql = """
+            INSERT INTO customers (id, name, city, country, data) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                name = excluded.name, city = excluded.city,
+                country = excluded.country, data = excluded.data
+        """
+        written = 0
+        batch = []
+        for customer in customers:
+            billing = customer.get("billing") or {}
+            batch.append((
+                customer_id(customer),
+                customer["name"],
+                billing.get("city"),
+                billing.get("country"),
+                json.dumps(customer)
+            ))
+            if len(batch) >= batch_size:
+                written += self._write_batch(sql, batch)
+                batch = []
+        if batch:
+            written += self._write_batch(sql, batch)
+        return written
+
+    def _write_batch(self, sql, batch):
+        with self._lock, self._conn:
+            self._conn.executemany(sql, batch)
+        return len(batch)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, customer_id):
+        rows = self._query("SELECT data FROM customers WHERE id = ?", (str(customer_id),))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_by_name(self, name):
+        rows = self._query(
+            "SELECT data FROM customers WHERE name = ? COLLATE NOCASE LIMIT 1", (name or "",)
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def search(self, query="", limit=20, offset=0):
+        tokens = SEARCH_TOKEN_PATTERN.findall(query or "")
+        if not tokens:
+            rows = self._query(
+                "SELECT data FROM customers ORDER BY name COLLATE NOCASE LIMIT ? OFFSET ?",
+                (limit, offset)
+            )
+        elif self.has_fts:
+            # Every token is a prefix query, e.g. "acm ind" -> "acm"* "ind"*
+            match = " ".join(f'"{token}"*' for token in tokens)
+            rows = self._query(
+                """
+                SELECT customers.data FROM customers_fts
+                JOIN customers ON customers.rowid = customers_fts.rowid
+                WHERE customers_fts MATCH ?
+                ORDER BY customers_fts.rank, customers.name COLLATE NOCASE
+                LIMIT ? OFFSET ?
+                """,
+                (match, limit, offset)
+            )
+        else:
+            prefix = (query or "").strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = self._query(
+                """
+                SELECT data FROM customers WHERE name LIKE ? ESCAPE '\\' COLLATE NOCASE
+                ORDER BY name COLLATE NOCASE LIMIT ? OFFSET ?
+                """,
+                (prefix + "%", limit, offset)
+            )
+        return [json.loads(row[0]) for row in rows]
+
+def customers_from_records(records):
+    """Map flat CSV/JSONL rows (id, name, address, city, state, postal_code, country) to customers"""
+    for record in records:
+        if isinstance(record, Exception) or not record.get("name"):
+            continue
+        yield {
+            "id": record.get("id") or record["name"],
+            "name": record["name"],
+            "billing": {
+                "address": record.get("address", ""),
+                "city": record.get("city", ""),
+                "state": record.get("state", ""),
+                "postal_code": record.get("postal_code", ""),
+                "country": record.get("country", "")
+            }
+        }
+
+def get_customer_directory(default_customers=()):
+    """Return the configured directory: SQLite when CUSTOMER_DIRECTORY_DB is set, in-memory otherwise"""
+    db_path = os.getenv('CUSTOMER_DIRECTORY_DB')
+    if db_path:
+        return SQLiteCustomerDirectory(db_path)
+    return InMemoryCustomerDirectory(default_customers)
+
+def main(argv=None):
+    from payload_stream import detect_format, iter_records, open_record_file
+
+    parser = argparse.ArgumentParser(description="Load a customer master into a SQLite customer directory")
+    parser.add_argument('records', help="CSV or JSONL file with id, name, address, city, state, postal_code, country")
+    parser.add_argument('--db', default=os.getenv('CUSTOMER_DIRECTORY_DB', 'customers.db'),
+                        help="SQLite database to create or update (default: $CUSTOMER_DIRECTORY_DB or customers.db)")
+    args = parser.parse_args(argv)
+
+    directory = SQLiteCustomerDirectory(args.db)
+    try:
+        with open_record_file(args.records) as records:
+            written = directory.import_customers(
+                customers_from_records(iter_records(records, detect_format(args.records)))
+            )
+    finally:
+        directory.close()
+    print(f"Imported {written} customers into {args.db}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import os
+import re
+import json
+import base64
+import hashlib
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from clm_errors import CLMError
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the network and written to disk at a time; memory use per download stays at this
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Times one download picks up where a dropped connection left it before giving up
+MAX_RESUMES = 5
+
+# What happened to one document; outcome is downloaded, resumed, skipped or failed
+DownloadResult = namedtuple('DownloadResult', ['doc_id', 'path', 'bytes', 'sha256', 'outcome', 'error'])
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-\d+/(\d+|\*)$')
+
+UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9._ -]+')
+
+def safe_filename(doc_id, name=None):
+    """A file name for a document that is unique per id and safe on any filesystem"""
+    name = UNSAFE_FILENAME_CHARS.sub('_', os.path.basename(name or '')).strip(' .')
+    return f"{doc_id}_{name}" if name else str(doc_id)
+
+def parse_digest(headers):
+    """The SHA-256 announced in a `Digest: sha-256=<base64>` header, as hex, or None"""
+    for item in (headers.get('Digest') or '').split(','):
+        algorithm, _, value = item.strip().partition('=')
+        if algorithm.lower() == 'sha-256' and value:
+            try:
+                return base64.b64decode(value).hex()
+            except ValueError:
+                return None
+    return None
+
+def parse_content_range(header):
+    """(first byte, total size or None) from a `Content-Range: bytes a-b/total` header, or None"""
+    match = CONTENT_RANGE_PATTERN.match((header or '').strip())
+    if not match:
+        return None
+    return int(match.group(1)), None if match.group(2) == '*' else int(match.group(2))
+
+def full_content_size(headers):
+    """Size of a whole-file (200) response, or None if Content-Length is missing or the body is encoded"""
+    if (headers.get('Content-Encoding') or 'identity').lower() != 'identity':
+        return None
+    try:
+        return int(headers['Content-Length'])
+    except (KeyError, ValueError):
+        return None
+
+def hash_file(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """SHA-256 of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher
+
+def _load_state(state_path):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state_path, state):
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+def download_document(client, account_id, doc_id, directory, limiter=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream one document's content to `directory`, chunk by chunk.
+
+    Content goes to a .part file next to the target, with the ETag, size and announced
+    checksum in a small .part.json file, so a dropped connection (or an interrupted run)
+    resumes with a Range request; a 206 is only appended if its Content-Range starts where
+    the file ends. The file only gets its final name once its size, and its SHA-256 when
+    the server sends a Digest, check out; a document whose final file already exists is skipped.
+    """
+    try:
+        document = client.get_document(account_id, doc_id)
+    except CLMError as e:
+        return DownloadResult(doc_id, None, 0, None, 'failed', str(e))
+
+    path = os.path.join(directory, safe_filename(doc_id, document.get('Name')))
+    if os.path.exists(path):
+        return DownloadResult(doc_id, path, os.path.getsize(path), None, 'skipped', None)
+
+    part_path = f"{path}.part"
+    state_path = f"{part_path}.json"
+    state = _load_state(state_path)
+    # Without the ETag we can't be sure the partial content is of the same version
+    offset = os.path.getsize(part_path) if state.get('etag') and os.path.exists(part_path) else 0
+    hasher = hash_file(part_path, chunk_size) if offset else hashlib.sha256()
+    resumed = False
+
+    content_url = client.document_content_url(account_id, doc_id, document)
+    for _ in range(MAX_RESUMES + 1):
+        try:
+            response = client.open_document_content(content_url, offset, state.get('etag'))
+        except CLMError as e:
+            # The partial file is kept for the next run
+            return DownloadResult(doc_id, path, offset, None, 'failed', str(e))
+        try:
+            if response.status_code == 206:
+                content_range = parse_content_range(response.headers.get('Content-Range'))
+                if (not content_range or content_range[0] != offset or
+                        (state.get('size') is not None and content_range[1] not in (None, state['size']))):
+                    # Appending this would put content in the wrong place; fetch the whole file instead
+                    logger.warning(f"Document {doc_id} answered a resume at {offset} bytes with "
+                                   f"Content-Range {response.headers.get('Content-Range')!r}, starting over")
+                    offset = 0
+                    state = {}
+                    continue
+                resumed = True
+                if state.get('size') is None and content_range[1] is not None:
+                    state['size'] = content_range[1]
+                    _save_state(state_path, state)
+            else:
+                # A fresh copy: first request, the document changed, or ranges aren't supported
+                offset = 0
+                hasher = hashlib.sha256()
+                state = {'etag': response.headers.get('ETag'), 'sha256': parse_digest(response.headers),
+                         'size': full_content_size(response.headers)}
+                _save_state(state_path, state)
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(chunk_size):
+                    if limiter:
+                        limiter.acquire(len(chunk))
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    offset += len(chunk)
+            if state.get('size') is not None and offset < state['size']:
+                # The connection closed cleanly but early; pick up from here
+                logger.warning(f"Download of document {doc_id} ended at {offset} of {state['size']} bytes")
+                continue
+            break
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Download of document {doc_id} interrupted at {offset} bytes: {str(e)}")
+        finally:
+            response.close()
+    else:
+        return DownloadResult(doc_id, path, offset, None, 'failed',
+                              f"Connection dropped {MAX_RESUMES + 1} times, run again to resume")
+
+    sha256 = hasher.hexdigest()
+    problem = None
+    if state.get('size') is not None and offset != state['size']:
+        problem = f"Size mismatch: expected {state['size']} bytes, got {offset}"
+    elif state.get('sha256') and state['sha256'] != sha256:
+        problem = f"Checksum mismatch: expected {state['sha256']}, got {sha256}"
+    if problem:
+        # Start over next time rather than resume from corrupt content
+        os.remove(part_path)
+        os.remove(state_path)
+        return DownloadResult(doc_id, path, offset, sha256, 'failed', problem)
+    os.replace(part_path, path)
+    os.remove(state_path)
+    return DownloadResult(doc_id, path, offset, sha256, 'resumed' if resumed else 'downloaded', None)
+
+def download_documents(client, account_id, doc_ids, directory, workers=4, bytes_per_second=None,
+                       chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Download a stream of documents with at most `workers` transfers at once and, if
+    bytes_per_second is set, a combined bandwidth cap. Yields a DownloadResult as each
+    one finishes; memory use depends on workers and chunk_size, not on file sizes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    limiter = RateLimiter(bytes_per_second, burst=chunk_size) if bytes_per_second else None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for doc_id in doc_ids:
+            pending.add(executor.submit(download_document, client, account_id, doc_id, directory, limiter, chunk_size))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
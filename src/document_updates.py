@@ -0,0 +1,188 @@
+import os
+import json
+import threading
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from clm_errors import CLMError
+from payload_stream import iter_records
+
+# The attributes to set on one document: {group: {attribute: value or {"Value": ..., ...}}}
+DocumentUpdate = namedtuple('DocumentUpdate', ['doc_id', 'attribute_groups'])
+
+# What happened to one document; outcome is updated, unchanged, skipped, dry_run or failed
+UpdateResult = namedtuple('UpdateResult', ['doc_id', 'outcome', 'changes', 'error'])
+
+# Outcomes a resumed run does not need to repeat
+COMPLETED_OUTCOMES = ('updated', 'unchanged')
+
+def attribute_value(attribute):
+    """The plain value of an attribute given either as a value or as a CLM attribute object"""
+    return attribute.get('Value') if isinstance(attribute, dict) else attribute
+
+def _same_value(current, desired):
+    # CSV values arrive as text while CLM may return numbers or booleans
+    normalise = lambda value: '' if value is None else str(value)
+    return normalise(current) == normalise(desired)
+
+def diff_attribute_groups(current_groups, desired_groups):
+    """Return only the attributes whose desired value differs from the current one, ready to PATCH"""
+    patch = {}
+    current_groups = current_groups or {}
+    for group, attributes in desired_groups.items():
+        current_group = current_groups.get(group) or {}
+        for name, desired in attributes.items():
+            current = current_group.get(name)
+            if current is not None and _same_value(attribute_value(current), attribute_value(desired)):
+                continue
+            # Keep the attribute's type and other metadata, replacing just what was asked for
+            entry = dict(current) if isinstance(current, dict) else {}
+            entry.update(desired if isinstance(desired, dict) else {'Value': desired})
+            patch.setdefault(group, {})[name] = entry
+    return patch
+
+def count_attributes(attribute_groups):
+    return sum(len(attributes) for attributes in attribute_groups.values())
+
+def iter_updates(text_file, record_format):
+    """
+    Stream DocumentUpdates from a record file.
+
+    JSONL lines look like {"doc_id": ..., "AttributeGroups": {group: {attribute: value}}}.
+    CSV files have doc_id, group, attribute and value columns, one attribute per row;
+    consecutive rows for the same document are combined into one update (apply_updates
+    rejects a document whose rows are split up).
+    Unusable records are yielded as failed UpdateResults.
+    """
+    pending = None
+    for record_number, record in enumerate(iter_records(text_file, record_format), start=1):
+        if isinstance(record, Exception):
+            yield UpdateResult(None, 'failed', 0, str(record))
+            continue
+        doc_id = str(record.get('doc_id') or '').strip()
+        if not doc_id:
+            yield UpdateResult(None, 'failed', 0, f"Record {record_number} has no doc_id")
+            continue
+
+        if record_format == 'jsonl':
+            groups = record.get('AttributeGroups')
+            if not isinstance(groups, dict):
+                yield UpdateResult(doc_id, 'failed', 0, f"Record {record_number} has no AttributeGroups object")
+                continue
+            yield DocumentUpdate(doc_id, groups)
+            continue
+
+        group, name = record.get('group'), record.get('attribute')
+        if not group or not name:
+            yield UpdateResult(doc_id, 'failed', 0, f"Record {record_number} needs group and attribute columns")
+            continue
+        if pending and pending.doc_id != doc_id:
+            yield pending
+            pending = None
+        if pending is None:
+            pending = DocumentUpdate(doc_id, {})
+        pending.attribute_groups.setdefault(group, {})[name] = record.get('value')
+    if pending:
+        yield pending
+
+class UpdateJournal:
+    """Append-only JSONL log of update outcomes, so an interrupted run can pick up where it stopped"""
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A run killed mid-write leaves a partial last line
+                        continue
+                    if entry.get('outcome') in COMPLETED_OUTCOMES:
+                        self.completed.add(entry.get('doc_id'))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def record(self, result):
+        entry = dict(result._asdict(), at=datetime.now().isoformat())
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+        if result.outcome in COMPLETED_OUTCOMES:
+            self.completed.add(result.doc_id)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def update_document(client, account_id, update, dry_run=False):
+    """Fetch one document, diff its attributes and PATCH only what changed"""
+    try:
+        document = client.get_document_attributes(account_id, update.doc_id)
+        patch = diff_attribute_groups(document.get('AttributeGroups'), update.attribute_groups)
+        if not patch:
+            return UpdateResult(update.doc_id, 'unchanged', 0, None)
+        if dry_run:
+            return UpdateResult(update.doc_id, 'dry_run', count_attributes(patch), None)
+        client.update_document_attributes(account_id, update.doc_id, patch)
+        return UpdateResult(update.doc_id, 'updated', count_attributes(patch), None)
+    except CLMError as e:
+        return UpdateResult(update.doc_id, 'failed', 0, str(e))
+
+def apply_updates(client, account_id, updates, workers=8, journal=None, dry_run=False):
+    """
+    Apply a stream of DocumentUpdates with at most `workers` documents in progress,
+    yielding an UpdateResult for each as it finishes. Documents the journal already
+    lists as done are skipped. A document may appear only once per stream (in CSV,
+    its rows must be consecutive); later updates for it fail rather than race the first.
+    """
+    seen = set()
+    def finish(result):
+        if journal and result.outcome != 'dry_run':
+            journal.record(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for update in updates:
+            if isinstance(update, UpdateResult):
+                yield finish(update)
+                continue
+            if update.doc_id in seen:
+                yield finish(UpdateResult(update.doc_id, 'failed', 0,
+                                          "Document appears more than once in the updates; "
+                                          "combine its rows into one update"))
+                continue
+            seen.add(update.doc_id)
+            if journal and update.doc_id in journal.completed:
+                yield UpdateResult(update.doc_id, 'skipped', 0, None)
+                continue
+            pending.add(executor.submit(update_document, client, account_id, update, dry_run))
+            # Keep a bounded number of documents in flight so huge files stay out of memory
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield finish(future.result())
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield finish(future.result())
+
+def summarize(results, on_result=None):
+    """Count outcomes over a result stream, calling on_result(result) for each one"""
+    counts = {}
+    for result in results:
+        counts[result.outcome] = counts.get(result.outcome, 0) + 1
+        if on_result:
+            on_result(result)
+    return counts
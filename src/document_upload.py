@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import random
+import logging
+import mimetypes
+import threading
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from clm_errors import CLMError
+from document_download import hash_file
+
+logger = logging.getLogger(__name__)
+
+# Attempts per file, with exponential backoff (plus jitter) between them
+UPLOAD_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 30
+
+# Failures worth another attempt; anything else (bad request, auth, conflict) fails the file at once
+RETRYABLE_STATUS_CODES = (None, 408, 429, 500, 502, 503, 504)
+
+# What happened to one file; outcome is uploaded, skipped or failed
+UploadResult = namedtuple('UploadResult', ['path', 'sha256', 'bytes', 'outcome', 'href', 'attempts', 'error'])
+
+def iter_upload_files(paths):
+    """Stream file paths from a mix of files and directories, walking directories in a stable order"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, filenames in os.walk(path):
+            subdirectories.sort()
+            for filename in sorted(filenames):
+                # Hidden files and partial downloads are never worth uploading
+                if not filename.startswith('.') and not filename.endswith('.part'):
+                    yield os.path.join(directory, filename)
+
+class UploadManifest:
+    """
+    Append-only JSONL record of uploaded files keyed by content hash and folder, so a rerun
+    (or the same file under another name) is skipped. Size and mtime are kept per path
+    so unchanged files are not read again just to hash them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.uploaded = {}
+        self._hashes = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A run killed mid-write leaves a partial last line
+                        continue
+                    self.uploaded[(entry['folder_id'], entry['sha256'])] = entry['href']
+                    self._hashes[entry['path']] = (entry['size'], entry['mtime_ns'], entry['sha256'])
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def known_hash(self, path, stat):
+        """The recorded hash of a file, if it hasn't changed since it was uploaded"""
+        size, mtime_ns, sha256 = self._hashes.get(os.path.abspath(path), (None, None, None))
+        return sha256 if (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns) else None
+
+    def href_for(self, folder_id, sha256):
+        return self.uploaded.get((folder_id, sha256))
+
+    def record(self, folder_id, path, stat, result):
+        entry = {
+            'folder_id': folder_id,
+            'sha256': result.sha256,
+            'href': result.href,
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'at': datetime.now().isoformat()
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            self.uploaded[(folder_id, result.sha256)] = result.href
+            self._hashes[entry['path']] = (stat.st_size, stat.st_mtime_ns, result.sha256)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class UploadProgress:
+    """
+    Running totals shared by the upload threads; bytes are counted as they are sent,
+    and taken back out when an attempt fails, so bytes_sent covers delivered files only
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.files = {'uploaded': 0, 'skipped': 0, 'failed': 0}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes_sent += count
+
+    def add_result(self, result):
+        with self._lock:
+            self.files[result.outcome] += 1
+
+    def snapshot(self):
+        """Totals so far, with throughput in MiB per second"""
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return dict(self.files, bytes_sent=self.bytes_sent, elapsed=round(elapsed, 2),
+                        mib_per_second=round(self.bytes_sent / 1048576 / elapsed, 2) if elapsed else 0.0)
+
+class _CountingReader:
+    """File wrapper that reports each block read by the HTTP client to an UploadProgress"""
+
+    def __init__(self, file, size, progress):
+        self._file = file
+        self._size = size
+        self._progress = progress
+        self.count = 0
+
+    def __len__(self):
+        # Lets requests send a Content-Length instead of chunking
+        return self._size
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        if self._progress and data:
+            self.count += len(data)
+            self._progress.add_bytes(len(data))
+        return data
+
+    def discard(self):
+        """Take this attempt's bytes back out of the totals after it failed"""
+        if self._progress and self.count:
+            self._progress.add_bytes(-self.count)
+        self.count = 0
+
+def _backoff_seconds(attempt):
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempt - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+def upload_file(client, account_id, folder_id, path, manifest=None, progress=None):
+    """
+    Upload one file, streaming it from disk. Files the manifest has already seen in this
+    folder (by content hash) are skipped; transient failures are retried with backoff,
+    reopening the file for each attempt.
+    """
+    try:
+        stat = os.stat(path)
+        sha256 = (manifest and manifest.known_hash(path, stat)) or hash_file(path).hexdigest()
+    except OSError as e:
+        return UploadResult(path, None, 0, 'failed', None, 0, str(e))
+
+    href = manifest.href_for(folder_id, sha256) if manifest else None
+    if href:
+        return UploadResult(path, sha256, stat.st_size, 'skipped', href, 0, None)
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+        reader = None
+        try:
+            with open(path, 'rb') as f:
+                reader = _CountingReader(f, stat.st_size, progress)
+                response_data = client.upload_document(account_id, folder_id, os.path.basename(path),
+                                                       reader, stat.st_size, content_type)
+        except OSError as e:
+            if reader:
+                reader.discard()
+            return UploadResult(path, sha256, stat.st_size, 'failed', None, attempt, str(e))
+        except CLMError as e:
+            reader.discard()
+            if e.status_code not in RETRYABLE_STATUS_CODES or attempt == UPLOAD_ATTEMPTS:
+                return UploadResult(path, sha256, stat.st_size, 'failed', None, attempt, str(e))
+            delay = _backoff_seconds(attempt)
+            logger.warning(f"Upload of {path} failed ({str(e)}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        result = UploadResult(path, sha256, stat.st_size, 'uploaded', response_data.get('Href'), attempt, None)
+        if manifest:
+            manifest.record(folder_id, path, stat, result)
+        return result
+
+def upload_files(client, account_id, folder_id, paths, workers=8, manifest=None, progress=None):
+    """
+    Upload a stream of files with at most `workers` in flight, yielding an UploadResult as
+    each finishes. Pass an UploadProgress to watch bytes and throughput while it runs.
+    """
+    progress = progress or UploadProgress()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def finish(future):
+            result = future.result()
+            progress.add_result(result)
+            return result
+
+        for path in paths:
+            pending.add(executor.submit(upload_file, client, account_id, folder_id, path, manifest, progress))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield finish(future)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield finish(future)
@@ -3,8 +3,6 @@ import json
 import streamlit as st
 from pathlib import Path
 from datetime import datetime, timedelta
-import requests # type: ignore
-from docusign_esign import ApiClient # type: ignore
 
 class DocuSignAuth:
     def __init__(self):
@@ -15,8 +13,14 @@ class DocuSignAuth:
             st.warning("DOCUSIGN_AUTH_SERVER environment variable not set.") # Optional warning
             # You might want to raise an Exception here or provide a default if applicable
 
+        # Full OAuth base URL, e.g. https://account-d.docusign.com/oauth or a local simulator
+        self.oauth_base_url = (os.getenv('DOCUSIGN_OAUTH_BASE_URL') or
+                               (f"https://{self.auth_server}/oauth" if self.auth_server else None))
+        if self.oauth_base_url:
+            self.oauth_base_url = self.oauth_base_url.rstrip('/')
+
         self.token_path = os.getenv('TOKEN_PATH', os.path.join('.tokens', 'token.json'))
-        self.api_client = ApiClient()
+        self._api_client = None
         self.redirect_uri = None  # Will be set dynamically
         
         # Create token directory if it doesn't exist
@@ -24,6 +28,14 @@ class DocuSignAuth:
         if token_dir:
             Path(token_dir).mkdir(parents=True, exist_ok=True)
 
+    @property
+    def api_client(self):
+        """DocuSign eSignature API client, created on first use (the SDK is slow to import)"""
+        if self._api_client is None:
+            from docusign_esign import ApiClient # type: ignore
+            self._api_client = ApiClient()
+        return self._api_client
+
     def _get_credentials(self):
         """Get credentials from session state or fallback to env"""
         # If we have client_id in session state, use both values from session state
@@ -57,11 +69,11 @@ class DocuSignAuth:
         # Use environment variable for the default redirect URI
         self.redirect_uri = redirect_uri or os.getenv('DOCUSIGN_REDIRECT_URI', 'http://localhost:8501')
         
-        if not self.auth_server:
+        if not self.oauth_base_url:
              raise Exception("DocuSign Auth Server Hostname is not configured (DOCUSIGN_AUTH_SERVER env var missing)")
         
         return (
-            f"https://{self.auth_server}/oauth/auth"
+            f"{self.oauth_base_url}/auth"
             f"?response_type=code"
             f"&scope=signature%20impersonation%20spring_write%20spring_read"
             f"&client_id={client_id}"
@@ -83,7 +95,7 @@ class DocuSignAuth:
             
         print(f"DEBUG [get_token_from_code]: Got credentials: client_id={client_id[:8]}...")
             
-        url = f"https://{self.auth_server}/oauth/token"
+        url = f"{self.oauth_base_url}/token"
         
         # IMPORTANT: Force the redirect URI to be the Render URL consistently
         consistent_redirect_uri = "https://clm-api-examples.onrender.com/"
@@ -97,6 +109,7 @@ class DocuSignAuth:
         }
         
         print(f"DEBUG [get_token_from_code]: URI='{data['redirect_uri']}', ClientID='{client_id}'")
+        import requests # type: ignore
         response = requests.post(url, data=data)
         
         print(f"DEBUG [get_token_from_code-RESPONSE]: Status={response.status_code}, Headers={response.headers}")
@@ -114,13 +127,14 @@ class DocuSignAuth:
         if not client_id or not client_secret:
             raise Exception("DocuSign Integration Key (Client ID) and Secret Key are required")
             
-        url = f"https://{self.auth_server}/oauth/token"
+        url = f"{self.oauth_base_url}/token"
         data = {
             'grant_type': 'refresh_token',
             'refresh_token': refresh_token,
             'client_id': client_id,
             'client_secret': client_secret
         }
+        import requests # type: ignore
         response = requests.post(url, data=data)
         if response.status_code == 200:
             token_data = response.json()
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import base64
+import hashlib
+import logging
+import argparse
+from io import BytesIO
+from functools import lru_cache
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(SRC_DIR, 'image')
+
+# Streamlit serves ./static next to the main script at app/static/ when
+# server.enableStaticServing is on (see .streamlit/config.toml)
+STATIC_DIR = os.path.join(SRC_DIR, 'static')
+STATIC_URL_PATH = 'app/static'
+
+# Cards show images at 150 CSS px, so 300 px covers high-DPI screens
+CARD_IMAGE_SIZE = 300
+
+# Shown when a card has no image; inline so it never needs the network
+PLACEHOLDER_IMAGE_URL = "data:image/svg+xml," + quote(
+    '<svg xmlns="http://www.w3.org/2000/svg" width="150" height="150">'
+    '<rect width="150" height="150" rx="12" fill="#F0F2F6"/></svg>'
+)
+
+HASHED_FILENAME = re.compile(r'^[\w-]+\.[0-9a-f]{12}\.(png|webp)$')
+
+def _pillow():
+    """Return the PIL.Image module, or None when Pillow isn't installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+def encode_image(data, max_size=CARD_IMAGE_SIZE):
+    """
+    Downscale an image to fit max_size and pick the smallest of PNG or WebP.
+    Without Pillow the original bytes are returned untouched.
+    Returns (bytes, extension).
+    """
+    Image = _pillow()
+    if Image is None:
+        return data, 'png'
+
+    with Image.open(BytesIO(data)) as image:
+        image.load()
+        if max(image.size) > max_size:
+            image.thumbnail((max_size, max_size), Image.LANCZOS)
+        candidates = []
+        png = BytesIO()
+        image.save(png, format='PNG', optimize=True)
+        candidates.append((png.getvalue(), 'png'))
+        try:
+            webp = BytesIO()
+            image.save(webp, format='WEBP', quality=90, method=6)
+            candidates.append((webp.getvalue(), 'webp'))
+        except (OSError, KeyError):
+            # Pillow built without WebP support
+            pass
+    candidates.append((data, 'png'))
+    return min(candidates, key=lambda candidate: len(candidate[0]))
+
+def hashed_stem(name, data, max_size):
+    """Name a file after its source content and size so its URL never serves stale bytes"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    digest = hashlib.sha256(data + str(max_size).encode('ascii')).hexdigest()[:12]
+    return f"{stem}.{digest}"
+
+def publish_image(name, max_size=CARD_IMAGE_SIZE, image_dir=IMAGE_DIR, static_dir=STATIC_DIR):
+    """Write the optimised, content-hashed copy of src/image/<name> into the static folder and return its filename"""
+    with open(os.path.join(image_dir, name), 'rb') as f:
+        source = f.read()
+    stem = hashed_stem(name, source, max_size)
+    # Already published by another process or an earlier run: skip the re-encode
+    for extension in ('webp', 'png'):
+        if os.path.exists(os.path.join(static_dir, f"{stem}.{extension}")):
+            return f"{stem}.{extension}"
+
+    data, extension = encode_image(source, max_size)
+    filename = f"{stem}.{extension}"
+    path = os.path.join(static_dir, filename)
+    os.makedirs(static_dir, exist_ok=True)
+    # Write then rename so a concurrent request never sees a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return filename
+
+@lru_cache(maxsize=64)
+def card_image_url(name, max_size=CARD_IMAGE_SIZE):
+    """URL for a card image, built once per process; falls back to an inline copy if it can't be published"""
+    if not name:
+        return PLACEHOLDER_IMAGE_URL
+    try:
+        return f"{STATIC_URL_PATH}/{publish_image(name, max_size)}"
+    except FileNotFoundError:
+        logger.warning(f"Card image not found: {name}")
+        return PLACEHOLDER_IMAGE_URL
+    except OSError as e:
+        # Read-only deployments: embed the image rather than reach out to the network
+        logger.warning(f"Could not publish {name} to {STATIC_DIR}, embedding it instead: {str(e)}")
+        with open(os.path.join(IMAGE_DIR, name), 'rb') as f:
+            data, extension = encode_image(f.read(), max_size)
+        return f"data:image/{extension};base64,{base64.b64encode(data).decode('ascii')}"
+
+def prune_static_dir(keep, static_dir=STATIC_DIR):
+    """Delete hashed copies that are no longer current; returns the removed filenames"""
+    removed = []
+    if not os.path.isdir(static_dir):
+        return removed
+    for filename in os.listdir(static_dir):
+        if filename not in keep and HASHED_FILENAME.match(filename):
+            os.remove(os.path.join(static_dir, filename))
+            removed.append(filename)
+    return removed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish src/image as optimised, content-hashed static files")
+    parser.add_argument('--max-size', type=int, default=CARD_IMAGE_SIZE, help="Longest side in pixels")
+    parser.add_argument('--prune', action='store_true', help="Remove hashed copies that are no longer current")
+    args = parser.parse_args(argv)
+
+    if _pillow() is None:
+        print("Pillow is not installed: images are published at their original size", file=sys.stderr)
+
+    published = set()
+    for name in sorted(os.listdir(IMAGE_DIR)):
+        if not name.lower().endswith(('.png', '.jpg', '.jpeg')):
+            continue
+        filename = publish_image(name, args.max_size)
+        published.add(filename)
+        original = os.path.getsize(os.path.join(IMAGE_DIR, name))
+        optimised = os.path.getsize(os.path.join(STATIC_DIR, filename))
+        print(f"{name:25s} {original:>8,} -> {optimised:>8,} bytes  {STATIC_URL_PATH}/{filename}")
+
+    if args.prune:
+        for filename in prune_static_dir(published):
+            print(f"Removed {filename}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
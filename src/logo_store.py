@@ -0,0 +1,90 @@
+import os
+import re
+import hashlib
+import logging
+
+from image_assets import _pillow, encode_image
+
+logger = logging.getLogger(__name__)
+
+# Logos are displayed at up to 150 CSS px; 300 px keeps them sharp on high-DPI screens
+LOGO_MAX_SIZE = 300
+
+# Oldest logos are removed once the store holds more than this many files
+LOGO_STORE_LIMIT = 200
+
+LOGO_ID_PATTERN = re.compile(r'^[0-9a-f]{24}\.(png|webp)$')
+
+class LogoError(ValueError):
+    """Raised when an uploaded file can't be used as a logo"""
+
+def _unreadable_image_errors():
+    """What decoding a bad upload can raise: truncated or unknown files, odd modes, decompression bombs"""
+    Image = _pillow()
+    errors = (OSError, ValueError)
+    return errors + (Image.DecompressionBombError,) if Image else errors
+
+class LogoStore:
+    """
+    Content-addressed store of downsampled logos on disk, shared by every session.
+    Sessions keep only the returned logo id (a short filename), never the image bytes.
+    """
+
+    def __init__(self, directory=None, max_size=LOGO_MAX_SIZE, limit=LOGO_STORE_LIMIT):
+        self.directory = directory or os.getenv('LOGO_STORE_DIR', '.logos')
+        self.max_size = max_size
+        self.limit = limit
+
+    def _digest(self, data):
+        return hashlib.sha256(data + str(self.max_size).encode('ascii')).hexdigest()[:24]
+
+    def path(self, logo_id):
+        """Path of a stored logo, or None if the id is unknown or malformed"""
+        if not logo_id or not LOGO_ID_PATTERN.match(logo_id):
+            return None
+        path = os.path.join(self.directory, logo_id)
+        return path if os.path.exists(path) else None
+
+    def put(self, data):
+        """Downsample and store an uploaded image once; returns its logo id"""
+        digest = self._digest(data)
+        for extension in ('webp', 'png'):
+            existing = self.path(f"{digest}.{extension}")
+            if existing:
+                # Mark it as recently used so pruning keeps it
+                os.utime(existing)
+                return f"{digest}.{extension}"
+
+        try:
+            encoded, extension = encode_image(data, self.max_size)
+        except _unreadable_image_errors() as e:
+            raise LogoError(f"Could not read the image: {str(e)}") from e
+
+        logo_id = f"{digest}.{extension}"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, logo_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+        logger.info(f"Stored logo {logo_id}: {len(data)} -> {len(encoded)} bytes")
+        self.prune()
+        return logo_id
+
+    def prune(self):
+        """Remove the least recently used logos beyond the store limit"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if LOGO_ID_PATTERN.match(entry.name)]
+        except FileNotFoundError:
+            return 0
+        if len(entries) <= self.limit:
+            return 0
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        removed = 0
+        for entry in entries[:len(entries) - self.limit]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
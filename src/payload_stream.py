@@ -0,0 +1,147 @@
+import io
+import os
+import csv
+import sys
+import json
+import argparse
+from collections import namedtuple
+
+from payload_templates import PayloadTemplate, PayloadTemplateError, SOURCING_TEMPLATE
+
+# One generated payload, or the reason a record could not be turned into one
+PayloadResult = namedtuple('PayloadResult', ['record_number', 'payload', 'error'])
+
+# Counts over the first records of a file, with the first few payloads and errors;
+# truncated is True if the file has more records than were read
+PayloadPreview = namedtuple('PayloadPreview', ['valid', 'invalid', 'payloads', 'errors', 'truncated'])
+
+RECORD_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl'
+}
+
+def detect_format(name):
+    """Work out the record format from a file name"""
+    extension = os.path.splitext(name or '')[1].lower()
+    if extension not in RECORD_FORMATS:
+        raise ValueError(f"Unsupported record file type '{extension}', expected one of: {', '.join(RECORD_FORMATS)}")
+    return RECORD_FORMATS[extension]
+
+def iter_records(text_file, record_format):
+    """Yield dict records one at a time from an open CSV or JSONL text file"""
+    if record_format == 'csv':
+        reader = csv.DictReader(text_file)
+        for row in reader:
+            # DictReader files extra values under None and fills missing ones with None
+            if None in row:
+                yield PayloadTemplateError(f"Line {reader.line_num} has more values than there are columns")
+            elif None in row.values():
+                yield PayloadTemplateError(f"Line {reader.line_num} has fewer values than there are columns")
+            else:
+                yield row
+    elif record_format == 'jsonl':
+        for line_number, line in enumerate(text_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                # Pass the bad line on so the caller can report it against its record number
+                yield PayloadTemplateError(f"Line {line_number} is not valid JSON: {str(e)}")
+    else:
+        raise ValueError(f"Unknown record format: {record_format}")
+
+def template_for_columns(column_map=None):
+    """Build a payload template mapping TemplateFieldData elements to record columns"""
+    if not column_map:
+        # Columns named after the elements in docs/sourcing.xml map straight across
+        return PayloadTemplate(SOURCING_TEMPLATE.fields)
+    return PayloadTemplate(list(column_map.items()))
+
+def iter_payloads(text_file, record_format, template):
+    """Lazily turn a record stream into XML payloads, one record in memory at a time"""
+    for record_number, record in enumerate(iter_records(text_file, record_format), start=1):
+        if isinstance(record, Exception):
+            yield PayloadResult(record_number, None, str(record))
+            continue
+        try:
+            yield PayloadResult(record_number, template.render(record), None)
+        except PayloadTemplateError as e:
+            yield PayloadResult(record_number, None, str(e))
+
+def preview_payloads(text_file, record_format, template, preview_count=3, limit=1000):
+    """Generate payloads for at most `limit` records, keeping the first preview_count payloads and errors"""
+    valid = invalid = 0
+    payloads = []
+    errors = []
+    for result in iter_payloads(text_file, record_format, template):
+        if valid + invalid >= limit:
+            return PayloadPreview(valid, invalid, payloads, errors, True)
+        if result.error:
+            invalid += 1
+            if len(errors) < preview_count:
+                errors.append(f"Record {result.record_number}: {result.error}")
+            continue
+        valid += 1
+        if len(payloads) < preview_count:
+            payloads.append(result.payload)
+    return PayloadPreview(valid, invalid, payloads, errors, False)
+
+def open_record_file(path):
+    """Open a record file for streaming (utf-8, tolerating a BOM from spreadsheet exports)"""
+    return open(path, 'r', encoding='utf-8-sig', newline='')
+
+def wrap_binary_upload(binary_file):
+    """Expose an uploaded binary file (e.g. from st.file_uploader) as a streaming text file"""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+def parse_column_map(pairs):
+    """Parse Element=column pairs from the command line"""
+    column_map = {}
+    for pair in pairs or []:
+        element, separator, column = pair.partition('=')
+        if not separator or not element or not column:
+            raise argparse.ArgumentTypeError(f"Expected Element=column, got '{pair}'")
+        column_map[element] = column
+    return column_map
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate TemplateFieldData XML payloads from a CSV or JSONL record file"
+    )
+    parser.add_argument('records', help="CSV or JSONL file with one customer/agreement record per row")
+    parser.add_argument('--map', dest='column_map', action='append', metavar='ELEMENT=COLUMN',
+                        help="Map an XML element to a record column (repeatable). Defaults to the sourcing.xml elements.")
+    parser.add_argument('--format', choices=sorted(set(RECORD_FORMATS.values())),
+                        help="Record format, detected from the file extension if omitted")
+    parser.add_argument('--output', '-o', help="Write JSON lines of {record, payload} here instead of stdout")
+    parser.add_argument('--skip-invalid', action='store_true', help="Report invalid records and carry on")
+    args = parser.parse_args(argv)
+
+    record_format = args.format or detect_format(args.records)
+    template = template_for_columns(parse_column_map(args.column_map))
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    written = failed = 0
+    try:
+        with open_record_file(args.records) as records:
+            for result in iter_payloads(records, record_format, template):
+                if result.error:
+                    failed += 1
+                    print(f"Record {result.record_number}: {result.error}", file=sys.stderr)
+                    if not args.skip_invalid:
+                        return 1
+                    continue
+                output.write(json.dumps({'record': result.record_number, 'payload': result.payload}) + '\n')
+                written += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Generated {written} payloads ({failed} invalid records)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import re
+from functools import lru_cache
+import xml.etree.ElementTree as ET
+
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-16" standalone="yes"?>'
+
+XML_DECLARATION_PATTERN = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# Element names we are prepared to emit (a conservative subset of XML names)
+XML_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_.-]*$')
+
+# Characters that are not allowed anywhere in an XML 1.0 document
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+_ATTRIBUTE_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+class PayloadTemplateError(ValueError):
+    """Raised when a template is malformed or a record does not fit it"""
+
+def escape_xml_text(value):
+    """Escape a value for use as XML element text"""
+    if value is None:
+        return ''
+    return INVALID_XML_CHARS.sub('', str(value)).translate(_ESCAPES)
+
+class PayloadTemplate:
+    """A TemplateFieldData style payload, compiled once and rendered from dict records"""
+
+    def __init__(self, fields, root='TemplateFieldData', root_attributes=None, declaration=XML_DECLARATION):
+        """
+        fields is an ordered list of (element_name, source) pairs, where source is a
+        dotted key path into the record (e.g. 'customer.billing.city') or a tuple of keys,
+        looked up literally. A bare element name can be passed instead of a pair when the
+        record key matches it.
+        """
+        if root_attributes is None:
+            root_attributes = {'displayName': '', 'displayValue': ''}
+
+        self.root = root
+        self.fields = []
+        self._paths = []
+        for field in fields:
+            element_name, source = (field, field) if isinstance(field, str) else field
+            if not XML_NAME_PATTERN.match(element_name):
+                raise PayloadTemplateError(f"Invalid XML element name: {element_name!r}")
+            self.fields.append(element_name)
+            self._paths.append(source if isinstance(source, tuple) else tuple(source.split('.')))
+
+        if len(set(self.fields)) != len(self.fields):
+            raise PayloadTemplateError("Template fields must be unique")
+        if not XML_NAME_PATTERN.match(root):
+            raise PayloadTemplateError(f"Invalid XML root element name: {root!r}")
+
+        # Compile the layout into a single positional format string
+        attributes = ''.join(
+            f' {name}="{str(value).translate(_ATTRIBUTE_ESCAPES)}"'
+            for name, value in root_attributes.items()
+        )
+        static = lambda text: text.replace('{', '{{').replace('}', '}}')
+        lines = [static(declaration)] if declaration else []
+        lines.append(f"<{root}{static(attributes)}>")
+        lines.extend(f"  <{name}>{{}}</{name}>" for name in self.fields)
+        lines.append(f"</{root}>")
+        self._format = '\n'.join(lines)
+
+    def _lookup(self, record, path):
+        """Follow a key path into a nested record"""
+        value = record
+        for key in path:
+            value = value[key]
+        return value
+
+    def missing_fields(self, record):
+        """Return the element names whose source is absent from the record"""
+        missing = []
+        for name, path in zip(self.fields, self._paths):
+            try:
+                self._lookup(record, path)
+            except (KeyError, TypeError, IndexError):
+                missing.append(name)
+        return missing
+
+    def render(self, record):
+        """Render one record into an XML payload string"""
+        values = []
+        for name, path in zip(self.fields, self._paths):
+            try:
+                value = self._lookup(record, path)
+            except (KeyError, TypeError, IndexError):
+                raise PayloadTemplateError(
+                    f"Record is missing fields: {', '.join(self.missing_fields(record))}"
+                ) from None
+            values.append(escape_xml_text(value))
+        return self._format.format(*values)
+
+    def render_many(self, records, skip_invalid=False):
+        """Render an iterable of records lazily, optionally skipping ones that do not fit"""
+        for record in records:
+            try:
+                yield self.render(record)
+            except PayloadTemplateError:
+                if not skip_invalid:
+                    raise
+
+def strip_xml_declaration(xml_text):
+    """Remove a leading <?xml ...?> declaration, returning the rest of the document"""
+    # Python's parser refuses str input that declares a non-UTF-8 encoding
+    return XML_DECLARATION_PATTERN.sub('', xml_text, count=1)
+
+def parse_payload_xml(xml_text, what="Payload"):
+    """Parse a TemplateFieldData style document from a string, returning its root element"""
+    try:
+        return ET.fromstring(strip_xml_declaration(xml_text))
+    except ET.ParseError as e:
+        raise PayloadTemplateError(f"{what} is not well-formed XML: {str(e)}") from None
+
+@lru_cache(maxsize=64)
+def compile_template_xml(template_xml):
+    """Compile an example TemplateFieldData document into a template keyed by its element names"""
+    root = parse_payload_xml(template_xml, what="Template")
+    return PayloadTemplate(
+        # Records are keyed by element name, which may itself contain dots
+        [(child.tag, (child.tag,)) for child in root],
+        root=root.tag,
+        root_attributes=dict(root.attrib),
+        declaration=XML_DECLARATION if XML_DECLARATION_PATTERN.match(template_xml) else None
+    )
+
+# Payload for the sourcing flow (same layout as docs/sourcing.xml)
+SOURCING_TEMPLATE = PayloadTemplate([
+    ('Agreement_Type', 'agreement_type'),
+    ('Account_Name', 'customer.name'),
+    ('Billing_Address', 'customer.billing.address'),
+    ('Billing_City', 'customer.billing.city'),
+    ('Billing_State', 'customer.billing.state'),
+    ('Billing_Postal_Code', 'customer.billing.postal_code'),
+    ('Billing_Country', 'customer.billing.country'),
+])
+
+# Default parameters offered when launching a DocGen form by hand
+DOCGEN_PARAMS_TEMPLATE = PayloadTemplate(
+    [('Source', 'source')],
+    root='Params',
+    root_attributes={},
+    declaration=None
+)
@@ -0,0 +1,30 @@
+import time
+import threading
+
+class RateLimiter:
+    """
+    Token bucket shared between threads: `rate` units per second, bursts of up to `burst`.
+    Units are whatever the caller counts, e.g. API calls or bytes.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        # The default of 1 spaces calls evenly, so no one-second window ever sees more than `rate`
+        self.burst = burst
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Block until `amount` units are allowed. Units are reserved up front, so a large request
+        (a whole chunk of bytes) waits for its share and later callers queue behind it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait_seconds = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait_seconds:
+            time.sleep(wait_seconds)
@@ -0,0 +1,203 @@
+import os
+import time
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# One CLM data center: API hosts to choose between (primary first) and its upload host
+Region = namedtuple('Region', ['code', 'api_urls', 'upload_url'])
+
+def springcm_region(code, uat=False):
+    """Region entry for a SpringCM data center such as na11 or eu11"""
+    environment = 'uat' if uat else ''
+    return Region(
+        f"{environment}{code}",
+        [f"https://api{environment}{code}.springcm.com/v2"],
+        f"https://apiupload{environment}{code}.springcm.com/v2"
+    )
+
+REGIONS = {region.code: region for region in [
+    springcm_region('na11', uat=True),
+    springcm_region('eu11', uat=True),
+    springcm_region('na11'),
+    springcm_region('na21'),
+    springcm_region('na31'),
+    springcm_region('eu11'),
+]}
+
+# Accounts without a configured region live here (the host the app always used)
+DEFAULT_REGION = 'uatna11'
+
+# Seconds between background health and latency probes of the endpoints in use
+PROBE_INTERVAL_SECONDS = 60
+PROBE_TIMEOUT_SECONDS = 5
+
+# Weight of the newest latency sample in the moving average
+LATENCY_SMOOTHING = 0.3
+
+def probe_endpoint(session, url, timeout=PROBE_TIMEOUT_SECONDS):
+    """
+    Time an unauthenticated GET of an API base URL. Any answer below 500 (typically 401)
+    means the host is up; returns the latency in seconds or raises.
+    """
+    started = time.monotonic()
+    response = session.get(url, timeout=timeout, allow_redirects=False)
+    response.close()
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return time.monotonic() - started
+
+class EndpointPool:
+    """Candidate API base URLs for one region, with their health and smoothed latency"""
+
+    def __init__(self, urls, upload_url=None):
+        if not urls:
+            raise ValueError("An endpoint pool needs at least one URL")
+        self.urls = [url.rstrip('/') for url in urls]
+        self.upload_url = upload_url
+        self.last_used = time.monotonic()
+        self._healthy = {url: True for url in self.urls}
+        self._latency = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        """The healthy endpoint with the lowest latency; the primary if none is known to be up"""
+        with self._lock:
+            self.last_used = time.monotonic()
+            healthy = [url for url in self.urls if self._healthy[url]]
+            if not healthy:
+                return self.urls[0]
+            # Unprobed endpoints sort after probed ones, keeping the registry's order among themselves
+            return min(healthy, key=lambda url: (url not in self._latency, self._latency.get(url, 0), self.urls.index(url)))
+
+    def record(self, url, latency=None, error=None):
+        """Store a probe result for one endpoint"""
+        with self._lock:
+            if url not in self._healthy:
+                return
+            if error is not None:
+                if self._healthy[url]:
+                    logger.warning(f"CLM endpoint {url} is down: {error}")
+                self._healthy[url] = False
+                return
+            if not self._healthy[url]:
+                logger.info(f"CLM endpoint {url} is back up")
+            self._healthy[url] = True
+            previous = self._latency.get(url)
+            self._latency[url] = latency if previous is None else (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * previous
+            )
+
+    def mark_down(self, url, error="connection failed"):
+        """Take an endpoint out of rotation until a probe finds it healthy again"""
+        self.record(url.rstrip('/'), error=error)
+
+    def status(self):
+        """Health and latency per endpoint, for display"""
+        with self._lock:
+            return [
+                {'url': url, 'healthy': self._healthy[url],
+                 'latency_ms': round(self._latency[url] * 1000, 1) if url in self._latency else None}
+                for url in self.urls
+            ]
+
+class RegionResolver:
+    """
+    Works out which CLM host serves an account and keeps the choice current.
+
+    Accounts map to regions (CLM_ACCOUNT_REGIONS, else CLM_REGION, else the UAT NA11
+    default). Each region's endpoints are probed in the background while it is in use,
+    and calls go to the fastest healthy one; when a call can't connect, the endpoint is
+    marked down and the next best takes over.
+    """
+
+    def __init__(self, regions=None, account_regions=None, default_region=DEFAULT_REGION,
+                 override_urls=None, probe=None, probe_interval=PROBE_INTERVAL_SECONDS):
+        """override_urls, if given, replace every region's API hosts (e.g. a proxy or the local simulator)"""
+        self.regions = regions or REGIONS
+        self.account_regions = account_regions or {}
+        self.default_region = default_region
+        self.override_urls = override_urls
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def from_environment(cls, probe=None, default_region=None, **kwargs):
+        """Build a resolver from CLM_API_BASE_URL, CLM_REGION (unless default_region is given) and CLM_ACCOUNT_REGIONS"""
+        override = os.getenv('CLM_API_BASE_URL')
+        return cls(
+            account_regions=parse_account_regions(os.getenv('CLM_ACCOUNT_REGIONS')),
+            default_region=default_region or os.getenv('CLM_REGION') or DEFAULT_REGION,
+            # A comma separated list gives failover candidates in priority order
+            override_urls=[url.strip() for url in override.split(',') if url.strip()] if override else None,
+            probe=probe,
+            **kwargs
+        )
+
+    def region_for(self, account_id):
+        code = self.account_regions.get(account_id, self.default_region)
+        if code not in self.regions:
+            raise ValueError(f"Unknown CLM region '{code}', expected one of: {', '.join(sorted(self.regions))}")
+        return self.regions[code]
+
+    def pool_for(self, account_id):
+        """The endpoint pool serving an account, created (and probed) on first use"""
+        region = self.region_for(account_id)
+        with self._lock:
+            pool = self._pools.get(region.code)
+            if pool is None:
+                urls = self.override_urls or region.api_urls
+                pool = self._pools[region.code] = EndpointPool(urls, None if self.override_urls else region.upload_url)
+                if self.probe and len(pool.urls) > 1:
+                    # Only worth choosing between several candidates
+                    self._ensure_prober()
+            return pool
+
+    def base_url(self, account_id):
+        return self.pool_for(account_id).base_url
+
+    def probe_all(self):
+        """Probe every endpoint of the pools used since the last round"""
+        with self._lock:
+            pools = list(self._pools.values())
+        cutoff = time.monotonic() - self.probe_interval * 2
+        for pool in pools:
+            if pool.last_used < cutoff:
+                continue
+            for url in pool.urls:
+                try:
+                    pool.record(url, latency=self.probe(url))
+                except Exception as e:
+                    pool.record(url, error=str(e))
+
+    def _ensure_prober(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='region-prober', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.probe_all()
+            time.sleep(self.probe_interval)
+
+def parse_account_regions(spec):
+    """Parse 'account_id=region,account_id=region' into a dict"""
+    account_regions = {}
+    for pair in (spec or '').split(','):
+        account_id, separator, region = pair.strip().partition('=')
+        if separator and account_id and region:
+            account_regions[account_id.strip()] = region.strip()
+    return account_regions
+
+def make_probe(session=None):
+    """A probe function for RegionResolver, on the given HTTP session or a new one"""
+    if session is None:
+        import requests
+        session = requests.Session()
+    return lambda url: probe_endpoint(session, url)
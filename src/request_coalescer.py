@@ -0,0 +1,51 @@
+import copy
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class RequestCoalescer:
+    """
+    Lets concurrent identical reads share one upstream call. The first caller for a key
+    makes the call; callers arriving while it is in flight wait for it and get the same
+    result, or the same error. Nothing is kept once the call finishes, so this never
+    serves stale data the way a cache could.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, func):
+        """Return func(), or the result of an identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                # Each waiter raises its own copy, so tracebacks don't pile up on one shared instance
+                raise copy.copy(call.error) from call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
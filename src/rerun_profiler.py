@@ -0,0 +1,183 @@
+import os
+import re
+import time
+import cProfile
+import logging
+import threading
+from datetime import datetime
+from functools import wraps
+from contextlib import contextmanager
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+def _flag(name):
+    return (os.getenv(name) or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Stage timing is opt-in; while it is off, timed() hands functions back untouched
+ENABLED = _flag('PROFILE_RERUNS')
+
+# If set, each rerun also runs under cProfile and the slowest are saved here as .pstats files
+DUMP_DIR = os.getenv('PROFILE_DUMP_DIR')
+
+# Reruns faster than this are never saved; at most MAX_DUMPS files are kept, the slowest
+SLOW_RERUN_MS = float(os.getenv('PROFILE_SLOW_MS') or 500)
+MAX_DUMPS = 20
+
+# Time spent in one stage over a rerun; path names the enclosing stages, e.g. "view:docgen > clm_request"
+StageTiming = namedtuple('StageTiming', ['path', 'calls', 'total_ms', 'self_ms'])
+
+_local = threading.local()
+
+class RerunProfile:
+    """Stage timings of one script run, collected on the thread running it"""
+
+    def __init__(self, label=None):
+        self.label = label
+        self.started = time.perf_counter()
+        self.finished = None
+        self.profiler = None
+        self.dump_path = None
+        # Open stages as [path, started, seconds spent in child stages]
+        self._stack = []
+        # path -> [calls, total seconds, self seconds], in the order stages were first entered
+        self._totals = {}
+
+    def enter(self, name):
+        path = (self._stack[-1][0] if self._stack else ()) + (name,)
+        self._totals.setdefault(path, [0, 0.0, 0.0])
+        self._stack.append([path, time.perf_counter(), 0.0])
+
+    def exit(self):
+        path, started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        totals = self._totals[path]
+        totals[0] += 1
+        totals[1] += elapsed
+        totals[2] += elapsed - children
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def innermost(self):
+        return self._stack[-1][0][-1] if self._stack else None
+
+    @property
+    def total_ms(self):
+        finished = self.finished if self.finished is not None else time.perf_counter()
+        return (finished - self.started) * 1000
+
+    def stages(self):
+        return [StageTiming(' > '.join(path), calls, total * 1000, self_time * 1000)
+                for path, (calls, total, self_time) in self._totals.items()]
+
+    def unaccounted_ms(self):
+        """Time outside every top-level stage: Streamlit itself and uninstrumented code"""
+        return self.total_ms - sum(total * 1000 for path, (_, total, _) in self._totals.items() if len(path) == 1)
+
+def current():
+    """The profile of the rerun running on this thread, if profiling is on"""
+    return getattr(_local, 'profile', None)
+
+@contextmanager
+def stage(name):
+    """Time a block as a stage of the current rerun; does nothing outside a profiled rerun"""
+    profile = current()
+    # Recursive calls count towards the stage already open
+    if profile is None or profile.innermost() == name:
+        yield
+        return
+    profile.enter(name)
+    try:
+        yield
+    finally:
+        profile.exit()
+
+def timed(name=None):
+    """Decorator timing every call of a function as a stage (named after the function by default)"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class SlowRerunDumps:
+    """Directory of cProfile dumps that keeps only the slowest reruns, named by duration"""
+
+    FILE_PATTERN = re.compile(r'^(\d+)ms-.*\.pstats$')
+
+    def __init__(self, directory, keep=MAX_DUMPS, threshold_ms=SLOW_RERUN_MS):
+        self.directory = directory
+        self.keep = keep
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _existing(self):
+        """(duration in ms, file name) of the saved dumps, fastest first"""
+        found = []
+        for filename in os.listdir(self.directory):
+            match = self.FILE_PATTERN.match(filename)
+            if match:
+                found.append((int(match.group(1)), filename))
+        return sorted(found)
+
+    def add(self, profile):
+        """Save a profiled rerun if it is among the slowest; returns the file path or None"""
+        total_ms = int(profile.total_ms)
+        if total_ms < self.threshold_ms:
+            return None
+        with self._lock:
+            existing = self._existing()
+            if len(existing) >= self.keep and total_ms <= existing[0][0]:
+                return None
+            label = re.sub(r'[^A-Za-z0-9_-]+', '_', profile.label or 'rerun')
+            path = os.path.join(self.directory,
+                                f"{total_ms:07d}ms-{label}-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.pstats")
+            profile.profiler.dump_stats(path)
+            for _, filename in existing[:max(0, len(existing) + 1 - self.keep)]:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+            logger.info(f"Saved profile of a {total_ms} ms rerun to {path}")
+            return path
+
+_dumps = SlowRerunDumps(DUMP_DIR) if ENABLED and DUMP_DIR else None
+
+def begin_rerun(label=None):
+    """Start profiling the rerun about to run on this thread"""
+    profile = RerunProfile(label)
+    if _dumps:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            profile.profiler = profiler
+        except ValueError:
+            # Newer Pythons allow one active profiler per process; overlapping reruns go without
+            pass
+    _local.profile = profile
+    return profile
+
+def end_rerun():
+    """Finish the rerun on this thread, saving its cProfile data if it was one of the slow ones"""
+    profile = current()
+    _local.profile = None
+    if profile is None:
+        return None
+    if profile.profiler:
+        profile.profiler.disable()
+    while profile._stack:
+        profile.exit()
+    profile.finished = time.perf_counter()
+    if profile.profiler:
+        try:
+            profile.dump_path = _dumps.add(profile)
+        except OSError as e:
+            logger.warning(f"Could not save rerun profile: {str(e)}")
+    return profile
@@ -0,0 +1,177 @@
+import re
+import html
+from functools import lru_cache
+
+import streamlit as st
+
+# Card, button and column styling for the catalog view
+APP_STYLES = """
+    .feature-card {
+        border: 1px solid #ddd;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 10px 0;
+        background-color: white;
+        height: 100%;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        text-align: center;
+    }
+    .feature-card img {
+        max-width: 150px;
+        height: 150px;
+        object-fit: contain;
+        margin: auto;
+    }
+    .feature-title {
+        margin: 15px 0;
+        font-size: 1.2em;
+        font-weight: bold;
+    }
+    .feature-description {
+        margin: 10px 0;
+        min-height: 60px;
+        color: #666;
+    }
+    .stColumns {
+        gap: 2rem;
+    }
+    /* Custom button styling */
+    .stButton > button {
+        width: 100%;
+        height: 3rem;
+        line-height: 1;
+        padding: 0 1.5rem;
+        font-size: 1rem;
+        font-weight: 500;
+        border-radius: 8px;
+        transition: all 0.3s ease;
+        margin-top: 1rem;
+        display: flex !important;
+        align-items: center;
+        justify-content: center;
+        white-space: nowrap;
+    }
+    /* Active button */
+    .stButton > button:not([disabled]) {
+        background-color: #00b4e6;
+        color: white;
+        border: none;
+        box-shadow: 0 2px 4px rgba(0, 180, 230, 0.2);
+    }
+    .stButton > button:not([disabled]):hover {
+        background-color: #0099cc;
+        box-shadow: 0 4px 8px rgba(0, 180, 230, 0.3);
+        transform: translateY(-1px);
+    }
+    /* Disabled button */
+    .stButton > button[disabled] {
+        background-color: #f5f5f5;
+        color: #999;
+        border: 1px solid #ddd;
+        cursor: not-allowed;
+        opacity: 0.8;
+    }
+"""
+
+# Hides success and info messages a few seconds after they appear
+MESSAGE_AUTOHIDE_SCRIPT = """
+    // Function to hide success and info messages after 5 seconds
+    function hideAllMessages() {
+        setTimeout(function() {
+            const messages = document.querySelectorAll('.stSuccess, .stInfo');
+            messages.forEach(function(message) {
+                message.style.transition = 'opacity 1s ease-out';
+                message.style.opacity = '0';
+                setTimeout(function() {
+                    message.style.display = 'none';
+                }, 1000);
+            });
+        }, 5000); // Wait 5 seconds before starting to fade
+    }
+
+    // Function to set up a mutation observer to watch for new messages
+    function setupMessageObserver() {
+        const observer = new MutationObserver(function(mutations) {
+            let newMessageAdded = false;
+            mutations.forEach(function(mutation) {
+                if (mutation.type === 'childList' && mutation.addedNodes.length > 0) {
+                    mutation.addedNodes.forEach(function(node) {
+                        if (node.nodeType === 1) { // Element node
+                            if (node.classList &&
+                                (node.classList.contains('stSuccess') ||
+                                 node.classList.contains('stInfo'))) {
+                                newMessageAdded = true;
+                            }
+                            // Also check children of added nodes
+                            if (node.querySelectorAll('.stSuccess, .stInfo').length > 0) {
+                                newMessageAdded = true;
+                            }
+                        }
+                    });
+                }
+            });
+            if (newMessageAdded) {
+                hideAllMessages();
+            }
+        });
+        observer.observe(document.body, {
+            childList: true,
+            subtree: true
+        });
+    }
+
+    // Run when DOM is fully loaded
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', function() {
+            hideAllMessages();
+            setupMessageObserver();
+        });
+    } else {
+        hideAllMessages();
+        setupMessageObserver();
+    }
+"""
+
+FEATURE_CARD_TEMPLATE = (
+    '<div class="feature-card">'
+    '<img src="{image_url}" alt="">'
+    '<div class="feature-title">{title}</div>'
+    '<div class="feature-description">{description}</div>'
+    '</div>'
+)
+
+def minify_css(css):
+    """Strip comments and collapse whitespace in a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).replace(';}', '}').strip()
+
+def minify_js(script):
+    """Drop comments and indentation from a script (line structure is kept, so it stays safe)"""
+    lines = []
+    for line in script.splitlines():
+        line = re.sub(r'\s//\s.*$', '', line).strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+# Built once at import; each view emits the blocks it needs as a single element per rerun
+ASSETS = {
+    'catalog_styles': f"<style>{minify_css(APP_STYLES)}</style>",
+    'message_autohide': f"<script>{minify_js(MESSAGE_AUTOHIDE_SCRIPT)}</script>"
+}
+
+def inject_assets(*names):
+    """Emit the named style and script blocks together in one markdown element"""
+    st.markdown(''.join(ASSETS[name] for name in names), unsafe_allow_html=True)
+
+@lru_cache(maxsize=128)
+def feature_card_html(title, description, image_url):
+    """Render a catalog card from the precomputed template (cached per distinct card)"""
+    return FEATURE_CARD_TEMPLATE.format(
+        image_url=html.escape(image_url, quote=True),
+        title=html.escape(title),
+        description=html.escape(description)
+    )
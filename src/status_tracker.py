@@ -0,0 +1,162 @@
+import time
+import heapq
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Polling starts fast after a change and slows down while nothing happens
+MIN_POLL_SECONDS = 2
+MAX_POLL_SECONDS = 60
+BACKOFF_FACTOR = 2
+
+# Stop polling a contract nobody has looked at for this long
+WATCH_IDLE_SECONDS = 300
+
+# Contract statuses after which polling stops
+FINAL_STATUSES = frozenset(['Signed', 'Executed', 'Completed', 'Cancelled', 'Rejected'])
+
+class StatusSnapshot:
+    """Latest known status of one watched contract"""
+
+    def __init__(self):
+        self.data = None
+        self.error = None
+        self.checked_at = None
+        self.changed_at = None
+        self.interval = MIN_POLL_SECONDS
+        self.final = False
+        # Set once a status has been pushed to us; polling then only backs up the pushes
+        self.pushed = False
+
+    @property
+    def status(self):
+        return (self.data or {}).get('contract_status')
+
+class StatusTracker:
+    """
+    Polls contract status URLs on background threads and shares the results.
+
+    Every session watching the same URL reads the same snapshot, so a contract
+    is polled once no matter how many users have it open. Intervals double while
+    the status stays the same (or the service errors) and reset when it changes.
+    """
+
+    def __init__(self, fetch, min_interval=MIN_POLL_SECONDS, max_interval=MAX_POLL_SECONDS,
+                 idle_seconds=WATCH_IDLE_SECONDS, workers=4):
+        """fetch(url) returns the decoded status JSON or raises"""
+        self.fetch = fetch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.idle_seconds = idle_seconds
+        self._snapshots = {}
+        self._last_seen = {}
+        self._in_flight = set()
+        self._due = {}
+        self._schedule = []
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='status-poll')
+        self._thread = threading.Thread(target=self._run, name='status-tracker', daemon=True)
+        self._thread.start()
+
+    def watch(self, url):
+        """Register interest in a URL and return its current snapshot (polling starts right away if new)"""
+        with self._condition:
+            self._last_seen[url] = time.monotonic()
+            snapshot = self._snapshots.get(url)
+            if snapshot is None:
+                snapshot = self._snapshots[url] = StatusSnapshot()
+                self._schedule_locked(url, 0)
+            return snapshot
+
+    def poll_now(self, url):
+        """Ask for an immediate poll, e.g. when the user clicks refresh"""
+        with self._condition:
+            snapshot = self.watch(url)
+            snapshot.interval = self.min_interval
+            snapshot.final = False
+            self._schedule_locked(url, 0)
+            return snapshot
+
+    def notify(self, url, data):
+        """
+        Record a status pushed to us (e.g. by a webhook) without polling; data is merged
+        into what is already known, e.g. {'contract_status': 'Signed'}. Returns False if
+        nobody is watching the URL. Watched URLs that receive pushes are polled at the
+        maximum interval from then on.
+        """
+        with self._condition:
+            snapshot = self._snapshots.get(url)
+            if snapshot is None:
+                return False
+            # Notifications can arrive out of order; never move a finished contract back
+            if snapshot.final and data.get('contract_status') not in FINAL_STATUSES:
+                return True
+            snapshot.pushed = True
+            data = dict(snapshot.data or {}, **data)
+        self._record(url, data, None, pushed=True)
+        return True
+
+    def _schedule_locked(self, url, delay):
+        # Only the latest entry per URL counts; older ones are skipped when popped
+        due = self._due[url] = time.monotonic() + delay
+        heapq.heappush(self._schedule, (due, url))
+        self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._schedule or self._schedule[0][0] > time.monotonic():
+                    timeout = self._schedule[0][0] - time.monotonic() if self._schedule else None
+                    self._condition.wait(timeout)
+                due, url = heapq.heappop(self._schedule)
+                if self._due.get(url) != due:
+                    continue
+                idle = time.monotonic() - self._last_seen.get(url, 0) > self.idle_seconds
+                if idle:
+                    # Nobody is looking any more
+                    self._snapshots.pop(url, None)
+                    self._last_seen.pop(url, None)
+                    self._due.pop(url, None)
+                    continue
+                if url in self._in_flight or self._snapshots[url].final:
+                    continue
+                self._in_flight.add(url)
+            self._executor.submit(self._poll, url)
+
+    def _poll(self, url):
+        try:
+            data, error = self.fetch(url), None
+            if not isinstance(data, dict):
+                raise ValueError(f"Status response is not a JSON object: {str(data)[:100]}")
+        except Exception as e:
+            data, error = None, str(e)
+            logger.warning(f"Status poll failed for {url}: {error}")
+        self._record(url, data, error)
+
+    def _record(self, url, data, error, pushed=False):
+        with self._condition:
+            if not pushed:
+                self._in_flight.discard(url)
+            snapshot = self._snapshots.get(url)
+            if snapshot is None:
+                return
+            snapshot.checked_at = time.time()
+            if error:
+                snapshot.error = error
+                snapshot.interval = min(snapshot.interval * BACKOFF_FACTOR, self.max_interval)
+            else:
+                if snapshot.data is None or data.get('contract_status') != snapshot.status:
+                    snapshot.changed_at = snapshot.checked_at
+                    snapshot.interval = self.min_interval
+                else:
+                    snapshot.interval = min(snapshot.interval * BACKOFF_FACTOR, self.max_interval)
+                snapshot.data = data
+                snapshot.error = None
+                snapshot.final = snapshot.status in FINAL_STATUSES
+            if not snapshot.final:
+                delay = self.max_interval if snapshot.pushed else snapshot.interval
+                # Jitter keeps many watched contracts from polling in lockstep
+                self._schedule_locked(url, delay * random.uniform(0.9, 1.1))
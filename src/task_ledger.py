@@ -0,0 +1,209 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from clm_errors import CLMError
+
+# Task and workflow statuses that will not change again; everything else is reconciled
+FINAL_TASK_STATUSES = ('Success', 'Completed', 'Complete', 'Failed', 'Error', 'Cancelled', 'Terminated')
+
+def default_ledger_path():
+    return os.getenv('TASK_LEDGER_DB', os.path.join('.tasks', 'ledger.db'))
+
+def payload_hash(xml_payload):
+    """Fingerprint a payload so duplicate submissions are easy to spot without storing the XML"""
+    return hashlib.sha256((xml_payload or '').encode('utf-8')).hexdigest()
+
+class TaskLedger:
+    """SQLite record of every DocLauncher task and workflow submitted, with its latest known status"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            href TEXT PRIMARY KEY,
+            account_id TEXT NOT NULL,
+            config_href TEXT,
+            payload_hash TEXT,
+            submitted_at REAL NOT NULL,
+            status TEXT,
+            result_url TEXT,
+            resolved_url TEXT,
+            checked_at REAL,
+            error TEXT,
+            kind TEXT NOT NULL DEFAULT 'doclauncher',
+            name TEXT
+        );
+        CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, checked_at);
+        CREATE INDEX IF NOT EXISTS tasks_submitted ON tasks (account_id, submitted_at);
+    """
+
+    COLUMNS = ('href', 'account_id', 'config_href', 'payload_hash', 'submitted_at',
+               'status', 'result_url', 'resolved_url', 'checked_at', 'error', 'kind', 'name')
+
+    # Columns added after the first release, created on ledgers that predate them
+    ADDED_COLUMNS = (
+        ('resolved_url', 'TEXT'),
+        ('kind', "TEXT NOT NULL DEFAULT 'doclauncher'"),
+        ('name', 'TEXT')
+    )
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_ledger_path()
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Streamlit reruns happen on different threads, so share one connection behind a lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            # WAL lets the CLI reconcile while the app keeps writing
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+            for column, column_type in self.ADDED_COLUMNS:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        self._conn.close()
+
+    def _rows(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def record_submission(self, account_id, config_href, xml_payload, response_data, kind='doclauncher', name=None):
+        """Store a newly created task or workflow; returns its Href (None if CLM didn't return one)"""
+        href = response_data.get('Href')
+        if not href:
+            return None
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO tasks (href, account_id, config_href, payload_hash, submitted_at,
+                                   status, result_url, checked_at, kind, name)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (href) DO UPDATE SET
+                    status = excluded.status, result_url = excluded.result_url, checked_at = excluded.checked_at
+                """,
+                (href, account_id, config_href, payload_hash(xml_payload), now,
+                 response_data.get('Status'), response_data.get('DocLauncherResultUrl'), now, kind, name)
+            )
+        return href
+
+    def update_statuses(self, updates):
+        """Apply (href, status, result_url, error) updates in one transaction"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE tasks SET
+                    status = COALESCE(?, status),
+                    result_url = COALESCE(?, result_url),
+                    error = ?,
+                    checked_at = ?
+                WHERE href = ?
+                """,
+                [(status, result_url, error, now, href) for href, status, result_url, error in updates]
+            )
+        return len(updates)
+
+    def set_resolved_url(self, href, resolved_url):
+        """Cache where a task's result URL redirects to"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE tasks SET resolved_url = ? WHERE href = ?", (resolved_url, href))
+
+    def get(self, href):
+        rows = self._rows(f"SELECT {', '.join(self.COLUMNS)} FROM tasks WHERE href = ?", (href,))
+        return rows[0] if rows else None
+
+    def pending(self, limit=100, checked_before=None, account_id=None, kind=None):
+        """Tasks without a final status, least recently checked first"""
+        placeholders = ', '.join('?' for _ in FINAL_TASK_STATUSES)
+        sql = f"""
+            SELECT {', '.join(self.COLUMNS)} FROM tasks
+            WHERE (status IS NULL OR status NOT IN ({placeholders}))
+        """
+        params = list(FINAL_TASK_STATUSES)
+        if checked_before is not None:
+            sql += " AND (checked_at IS NULL OR checked_at < ?)"
+            params.append(checked_before)
+        if account_id:
+            sql += " AND account_id = ?"
+            params.append(account_id)
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY checked_at IS NOT NULL, checked_at LIMIT ?"
+        params.append(limit)
+        return self._rows(sql, params)
+
+    def recent(self, limit=50, account_id=None, status=None, kind=None):
+        """Most recently submitted tasks, newest first"""
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM tasks WHERE 1 = 1"
+        params = []
+        if account_id:
+            sql += " AND account_id = ?"
+            params.append(account_id)
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " ORDER BY submitted_at DESC LIMIT ?"
+        params.append(limit)
+        return self._rows(sql, params)
+
+    def status_counts(self, account_id=None, kind=None):
+        """Number of tasks per status"""
+        sql = "SELECT COALESCE(status, 'Unknown'), COUNT(*) FROM tasks WHERE 1 = 1"
+        params = []
+        if account_id:
+            sql += " AND account_id = ?"
+            params.append(account_id)
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        sql += " GROUP BY 1 ORDER BY 2 DESC"
+        with self._lock:
+            return dict(self._conn.execute(sql, params).fetchall())
+
+def _check_task(client, task):
+    try:
+        response_data = client.request_json("GET", task['href'])
+    except CLMError as e:
+        return (task['href'], None, None, str(e))
+    if not isinstance(response_data, dict):
+        # One odd response fails that task rather than the whole reconcile run
+        return (task['href'], None, None, "Task response is not a JSON object")
+    return (task['href'], response_data.get('Status'), response_data.get('DocLauncherResultUrl'), None)
+
+def reconcile_pending(ledger, client, account_id=None, kind=None, batch_size=200, workers=8, on_batch=None):
+    """
+    Refresh every pending task from CLM, `workers` requests at a time, writing each batch
+    in one transaction. Tasks are visited once per call even if they stay pending.
+    Returns {'checked', 'changed', 'failed'}; on_batch(totals) is called after each batch.
+    """
+    started = time.time()
+    totals = {'checked': 0, 'changed': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = ledger.pending(limit=batch_size, checked_before=started, account_id=account_id, kind=kind)
+            if not batch:
+                break
+            updates = list(executor.map(lambda task: _check_task(client, task), batch))
+            ledger.update_statuses(updates)
+            for task, (_, status, _, error) in zip(batch, updates):
+                totals['checked'] += 1
+                if error:
+                    totals['failed'] += 1
+                elif status != task['status']:
+                    totals['changed'] += 1
+            if on_batch:
+                on_batch(dict(totals))
+    return totals
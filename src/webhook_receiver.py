@@ -0,0 +1,282 @@
+import os
+import sys
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import sqlite3
+import argparse
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from task_ledger import FINAL_TASK_STATUSES, TaskLedger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEBHOOK_PORT = 8502
+
+# Connect sends one signature header per active HMAC key: X-DocuSign-Signature-1, -2, ...
+SIGNATURE_HEADER_PREFIX = 'X-DocuSign-Signature-'
+MAX_SIGNATURE_HEADERS = 10
+
+# Notifications are small; anything bigger is refused before it is read
+MAX_BODY_BYTES = 1024 * 1024
+
+# Event ids are kept this long for de-duplication of redelivered notifications
+EVENT_RETENTION_SECONDS = 7 * 24 * 3600
+
+# One received notification, reduced to what the app acts on; payload is the full JSON body
+WebhookEvent = namedtuple('WebhookEvent', ['event_id', 'event_type', 'subject', 'status', 'received_at', 'payload'])
+
+def sign_payload(body, secret):
+    """Connect-style signature: base64 HMAC-SHA256 of the raw request body"""
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+def verify_signature(body, headers, secrets):
+    """True if any signature header matches the body under any of the secrets (so keys can be rotated)"""
+    expected = [sign_payload(body, secret) for secret in secrets]
+    for number in range(1, MAX_SIGNATURE_HEADERS + 1):
+        signature = headers.get(f"{SIGNATURE_HEADER_PREFIX}{number}")
+        if signature is None:
+            break
+        if any(hmac.compare_digest(signature, candidate) for candidate in expected):
+            return True
+    return False
+
+def parse_event(body):
+    """
+    Normalise a CLM or Connect notification. CLM events carry EventId, EventType, Href and
+    Status; Connect events carry event, uri and data. Without an id a hash of the body is
+    used, so a redelivered notification is still recognised.
+    """
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("Notification body must be a JSON object")
+    inner = data.get('data') if isinstance(data.get('data'), dict) else {}
+    event_id = data.get('EventId') or data.get('eventId')
+    if not event_id:
+        # Connect bumps retryCount on each redelivery, so it is left out of the fingerprint
+        fingerprint = json.dumps({key: value for key, value in data.items() if key != 'retryCount'}, sort_keys=True)
+        event_id = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+    return WebhookEvent(
+        str(event_id),
+        data.get('EventType') or data.get('event'),
+        data.get('Href') or data.get('uri') or inner.get('envelopeId'),
+        data.get('Status') or data.get('contract_status') or (inner.get('envelopeSummary') or {}).get('status'),
+        time.time(),
+        data
+    )
+
+def default_event_store_path():
+    return os.getenv('WEBHOOK_EVENTS_DB', os.path.join('.tasks', 'events.db'))
+
+class EventStore:
+    """SQLite log of received notifications, keyed by event id so each is processed once"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            event_id TEXT PRIMARY KEY,
+            event_type TEXT,
+            subject TEXT,
+            status TEXT,
+            received_at REAL NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS events_subject ON events (subject, received_at);
+        CREATE INDEX IF NOT EXISTS events_received ON events (received_at);
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_event_store_path()
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Handler threads share one connection behind a lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def add(self, event):
+        """Store an event; returns False if its id has been seen before"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO events (event_id, event_type, subject, status, received_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (event.event_id, event.event_type, event.subject, event.status, event.received_at,
+                 json.dumps(event.payload))
+            )
+            return cursor.rowcount == 1
+
+    def recent(self, limit=50, subject=None):
+        """Most recently received events, newest first"""
+        sql = "SELECT event_id, event_type, subject, status, received_at, payload FROM events"
+        params = []
+        if subject:
+            sql += " WHERE subject = ?"
+            params.append(subject)
+        sql += " ORDER BY received_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [WebhookEvent(*row[:5], json.loads(row[5])) for row in rows]
+
+    def prune(self, older_than=EVENT_RETENTION_SECONDS):
+        """Forget events received more than older_than seconds ago"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM events WHERE received_at < ?",
+                                      (time.time() - older_than,)).rowcount
+
+def update_ledger(ledger, event):
+    """Apply a task or workflow status event to the ledger; returns True if it changed a known task"""
+    if not event.subject or not event.status:
+        return False
+    task = ledger.get(event.subject)
+    if not task:
+        return False
+    # Notifications can arrive out of order; never move a finished task back to in progress
+    if task['status'] in FINAL_TASK_STATUSES and event.status not in FINAL_TASK_STATUSES:
+        return False
+    ledger.update_statuses([(event.subject, event.status, event.payload.get('DocLauncherResultUrl'), None)])
+    return True
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Accepts signed notifications on any path"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CLMWebhookReceiver/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # Health check for load balancers
+        self._send_json(200, {"status": "ok"})
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.close_connection = True
+            return self._send_json(400, {"Message": "Invalid Content-Length"})
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            return self._send_json(413, {"Message": "Notification too large"})
+        body = self.rfile.read(length)
+        if not verify_signature(body, self.headers, receiver.secrets):
+            logger.warning(f"Rejected webhook with a missing or invalid signature from {self.client_address[0]}")
+            return self._send_json(401, {"Message": "Invalid signature"})
+        try:
+            event = parse_event(body)
+        except ValueError as e:
+            return self._send_json(400, {"Message": str(e)})
+        is_new = receiver.receive(event)
+        # Duplicates are acknowledged too, so the sender stops retrying
+        self._send_json(200, {"received": True, "duplicate": not is_new})
+
+class WebhookReceiver:
+    """
+    Embedded HTTP endpoint for status notifications. Each verified event is stored once
+    and handed to every subscriber, so status changes reach the app without polling.
+    """
+
+    def __init__(self, store, secrets, host='0.0.0.0', port=DEFAULT_WEBHOOK_PORT):
+        if not secrets:
+            raise ValueError("At least one webhook signing secret is required")
+        self.store = store
+        self.secrets = list(secrets)
+        self.host = host
+        self.port = port
+        self.received = 0
+        self.duplicates = 0
+        self._subscribers = []
+        self._server = None
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Call callback(event) for every new event"""
+        self._subscribers.append(callback)
+
+    def receive(self, event):
+        """Store an event and fan it out to subscribers; returns False for duplicates"""
+        if not self.store.add(event):
+            self.duplicates += 1
+            return False
+        self.received += 1
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Webhook subscriber failed for event {event.event_id}: {str(e)}")
+        return True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving on a background thread (raises OSError if the port is taken)"""
+        self.store.prune()
+        self._server = ThreadingHTTPServer((self.host, self.port), WebhookHandler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='webhook-receiver', daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook receiver listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+def secrets_from_environment():
+    """Signing secrets from WEBHOOK_SECRET, comma separated while a key is being rotated"""
+    return [secret.strip() for secret in os.getenv('WEBHOOK_SECRET', '').split(',') if secret.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Receive signed CLM/Connect notifications and apply them to the task ledger"
+    )
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('WEBHOOK_PORT', DEFAULT_WEBHOOK_PORT)))
+    parser.add_argument('--events', help="Event store database (default: WEBHOOK_EVENTS_DB or .tasks/events.db)")
+    parser.add_argument('--ledger', help="Task ledger database (default: TASK_LEDGER_DB or .tasks/ledger.db)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    secrets = secrets_from_environment()
+    if not secrets:
+        print("Set WEBHOOK_SECRET to the HMAC key configured for the notifications", file=sys.stderr)
+        return 1
+
+    ledger = TaskLedger(args.ledger)
+    receiver = WebhookReceiver(EventStore(args.events), secrets, host=args.host, port=args.port)
+    receiver.subscribe(lambda event: update_ledger(ledger, event))
+    receiver.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        receiver.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
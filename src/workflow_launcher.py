@@ -0,0 +1,101 @@
+import logging
+import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from clm_errors import CLMError
+from payload_stream import iter_records
+from payload_templates import PayloadTemplateError
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Workflow starts per second, kept under the CLM account's API rate limit
+DEFAULT_RATE_PER_SECOND = 10
+
+# One limiter per account, shared by every launch in the process, since CLM limits the account
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# One workflow to start: the workflow name and its XML parameters
+WorkflowLaunch = namedtuple('WorkflowLaunch', ['record_number', 'name', 'params'])
+
+# What happened to one launch; href and status come from CLM on success
+LaunchResult = namedtuple('LaunchResult', ['record_number', 'name', 'href', 'status', 'error'])
+
+def iter_workflow_launches(text_file, record_format, default_name=None, template=None):
+    """
+    Stream WorkflowLaunches from a CSV or JSONL file. Each record names its workflow in a
+    `workflow` field (or default_name is used) and carries XML in `params`; with a template,
+    the XML is rendered from the record's fields instead. Bad records become failed LaunchResults.
+    """
+    for record_number, record in enumerate(iter_records(text_file, record_format), start=1):
+        if isinstance(record, Exception):
+            yield LaunchResult(record_number, None, None, None, str(record))
+            continue
+        name = record.get('workflow') or default_name
+        if not name:
+            yield LaunchResult(record_number, None, None, None, f"Record {record_number} has no workflow name")
+            continue
+        try:
+            params = template.render(record) if template else record.get('params')
+        except PayloadTemplateError as e:
+            yield LaunchResult(record_number, name, None, None, str(e))
+            continue
+        if not params:
+            yield LaunchResult(record_number, name, None, None, f"Record {record_number} has no params XML")
+            continue
+        yield WorkflowLaunch(record_number, name, params)
+
+def limiter_for(account_id, rate_per_second=None):
+    """The process-wide RateLimiter of an account, set to rate_per_second if one is given"""
+    with _limiters_lock:
+        limiter = _limiters.get(account_id)
+        if limiter is None:
+            limiter = _limiters[account_id] = RateLimiter(rate_per_second or DEFAULT_RATE_PER_SECOND)
+        elif rate_per_second:
+            limiter.rate = float(rate_per_second)
+        return limiter
+
+def start_workflow(client, account_id, launch, limiter=None, ledger=None):
+    """Start one workflow, waiting for the rate limiter before every attempt, and record it in the ledger"""
+    try:
+        # Retries after a 429 wait their turn too, so they count against the account's rate
+        response_data = client.start_workflow(account_id, launch.name, launch.params,
+                                              pace=limiter.acquire if limiter else None)
+    except CLMError as e:
+        return LaunchResult(launch.record_number, launch.name, None, None, str(e))
+    if ledger:
+        try:
+            ledger.record_submission(account_id, None, launch.params, response_data, kind='workflow', name=launch.name)
+        except sqlite3.Error as e:
+            # The workflow is running either way; report it rather than lose the result
+            logger.error(f"Failed to record workflow {response_data.get('Href')}: {str(e)}")
+    return LaunchResult(launch.record_number, launch.name, response_data.get('Href'), response_data.get('Status'), None)
+
+def launch_workflows(client, account_id, launches, workers=8, rate_per_second=DEFAULT_RATE_PER_SECOND,
+                     ledger=None, limiter=None):
+    """
+    Start a stream of workflows concurrently, never faster than rate_per_second, yielding a
+    LaunchResult for each as it completes. Only a bounded number of launches is held in memory.
+    Unless a limiter is passed in, the account's shared one is used, so concurrent batches
+    for the same account share one rate.
+    """
+    if limiter is None and rate_per_second:
+        limiter = limiter_for(account_id, rate_per_second)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for launch in launches:
+            if isinstance(launch, LaunchResult):
+                yield launch
+                continue
+            pending.add(executor.submit(start_workflow, client, account_id, launch, limiter, ledger))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
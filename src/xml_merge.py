@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import argparse
+from functools import lru_cache
+from collections import namedtuple
+from collections.abc import Mapping
+import xml.etree.ElementTree as ET
+
+from payload_templates import PayloadTemplateError, compile_template_xml, parse_payload_xml, strip_xml_declaration
+from payload_stream import detect_format, iter_records, open_record_file
+
+# One merged payload, the record fields the template has no element for, or why the merge failed
+MergeResult = namedtuple('MergeResult', ['record_number', 'payload', 'unknown_fields', 'error'])
+
+# Bytes read per chunk when streaming XML record files
+XML_CHUNK_SIZE = 64 * 1024
+
+def _element_values(element, what):
+    """Flat {tag: text} of an element's children; nested elements are not supported"""
+    values = {}
+    for child in element:
+        if len(child):
+            raise PayloadTemplateError(f"{what} element <{child.tag}> has child elements, only flat fields are supported")
+        values[child.tag] = (child.text or '').strip()
+    return values
+
+def check_record(data):
+    """Reject records that aren't a mapping of field names, e.g. a JSON array or a CSV row with extra values"""
+    if not isinstance(data, Mapping):
+        raise PayloadTemplateError(f"Record must be an object of field values, not {type(data).__name__}")
+    if None in data:
+        # csv.DictReader puts values beyond the header row under None
+        raise PayloadTemplateError("Record has more values than there are columns")
+    bad_keys = [key for key in data if not isinstance(key, str)]
+    if bad_keys:
+        raise PayloadTemplateError(f"Record field names must be text, got {bad_keys[0]!r}")
+
+class MergeTemplate:
+    """
+    A TemplateFieldData document used as a merge template: its elements give the
+    payload layout, and their text gives the value used when a record leaves one out.
+    """
+
+    def __init__(self, template_xml):
+        self.template = compile_template_xml(template_xml)
+        self.defaults = _element_values(parse_payload_xml(template_xml, what="Template"), "Template")
+        self._fields = frozenset(self.template.fields)
+
+    @property
+    def fields(self):
+        return self.template.fields
+
+    def merge(self, data, fill_defaults=True):
+        """
+        Merge one record (a dict, or a TemplateFieldData XML string) into the template.
+        Returns (payload, unknown_fields); without fill_defaults every element must be in the record.
+        """
+        if isinstance(data, str):
+            data = xml_record(data)
+        check_record(data)
+        unknown_fields = sorted(key for key in data if key not in self._fields)
+        record = {**self.defaults, **data} if fill_defaults else data
+        return self.template.render(record), unknown_fields
+
+    def merge_many(self, records, fill_defaults=True, strict=False):
+        """
+        Lazily merge a record stream, yielding a MergeResult per record. Exceptions in the
+        stream become failed results; with strict, fields the template lacks fail the record too.
+        """
+        for record_number, record in enumerate(records, start=1):
+            if isinstance(record, Exception):
+                yield MergeResult(record_number, None, [], str(record))
+                continue
+            try:
+                payload, unknown_fields = self.merge(record, fill_defaults)
+            except PayloadTemplateError as e:
+                yield MergeResult(record_number, None, [], str(e))
+                continue
+            if strict and unknown_fields:
+                yield MergeResult(record_number, None, unknown_fields,
+                                  f"Fields not in the template: {', '.join(unknown_fields)}")
+                continue
+            yield MergeResult(record_number, payload, unknown_fields, None)
+
+@lru_cache(maxsize=64)
+def load_merge_template(template_xml):
+    """Parse a merge template once per distinct template text"""
+    return MergeTemplate(template_xml)
+
+def xml_record(xml_text):
+    """The fields of one TemplateFieldData XML document as a dict"""
+    return _element_values(parse_payload_xml(xml_text, what="Record"), "Record")
+
+def iter_xml_records(text_file, chunk_size=XML_CHUNK_SIZE):
+    """
+    Stream dict records from an XML file without loading it whole. The file is either one
+    TemplateFieldData document or a root element holding many of them, e.g.
+    <Records><TemplateFieldData>...</TemplateFieldData>...</Records>.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    depth = 0
+    root = None
+    single_record = None
+    first_chunk = True
+    try:
+        while True:
+            chunk = text_file.read(chunk_size)
+            if not chunk:
+                break
+            if first_chunk:
+                chunk = strip_xml_declaration(chunk)
+                first_chunk = False
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    if root is None:
+                        root = element
+                    continue
+                depth -= 1
+                if depth != 1:
+                    continue
+                if single_record is None:
+                    # A leaf directly under the root means the whole file is one record
+                    single_record = not len(element)
+                if single_record:
+                    continue
+                try:
+                    yield _element_values(element, "Record")
+                except PayloadTemplateError as e:
+                    yield e
+                # Drop finished records so memory stays flat however long the file is
+                root.clear()
+        parser.close()
+    except ET.ParseError as e:
+        yield PayloadTemplateError(f"Record file is not well-formed XML: {str(e)}")
+        return
+    if single_record and root is not None:
+        try:
+            yield _element_values(root, "Record")
+        except PayloadTemplateError as e:
+            yield e
+
+def detect_merge_format(name):
+    """Record format for merging: xml as well as the csv/jsonl formats payload_stream reads"""
+    if os.path.splitext(name or '')[1].lower() == '.xml':
+        return 'xml'
+    return detect_format(name)
+
+def iter_merge_records(text_file, record_format):
+    if record_format == 'xml':
+        return iter_xml_records(text_file)
+    return iter_records(text_file, record_format)
+
+def validate_payload(xml_payload, template=None):
+    """
+    Check a payload locally before it is sent to CLM. Returns a list of problems:
+    XML that is not well-formed, and with a template, elements it is missing or does not know.
+    """
+    try:
+        root = parse_payload_xml(xml_payload)
+    except PayloadTemplateError as e:
+        return [str(e)]
+    if template is None:
+        # Any well-formed payload goes, nested elements included
+        return []
+    try:
+        values = _element_values(root, "Payload")
+    except PayloadTemplateError as e:
+        return [str(e)]
+    problems = []
+    missing = [name for name in template.fields if name not in values]
+    if missing:
+        problems.append(f"Missing elements: {', '.join(missing)}")
+    unknown = [name for name in values if name not in template.defaults]
+    if unknown:
+        problems.append(f"Elements not in the template: {', '.join(unknown)}")
+    return problems
+
+def write_merged(results, output, on_error=None):
+    """Write merged payloads as JSON lines of {record, payload}; returns (written, failed)"""
+    written = failed = 0
+    for result in results:
+        if result.error:
+            failed += 1
+            if on_error:
+                on_error(result)
+            continue
+        output.write(json.dumps({'record': result.record_number, 'payload': result.payload}) + '\n')
+        written += 1
+    return written, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Merge CSV, JSONL or XML records into a TemplateFieldData template, offline"
+    )
+    parser.add_argument('template', help="TemplateFieldData XML whose element text is used as default values")
+    parser.add_argument('records', help="CSV, JSONL or XML file of records keyed by element name")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'xml'],
+                        help="Record format, detected from the file extension if omitted")
+    parser.add_argument('--output', '-o', help="Write JSON lines of {record, payload} here instead of stdout")
+    parser.add_argument('--no-defaults', action='store_true',
+                        help="Fail records that leave out an element instead of using the template's value")
+    parser.add_argument('--strict', action='store_true', help="Fail records with fields the template does not have")
+    args = parser.parse_args(argv)
+
+    with open_record_file(args.template) as f:
+        template = load_merge_template(f.read())
+    record_format = args.format or detect_merge_format(args.records)
+
+    def report(result):
+        print(f"Record {result.record_number}: {result.error}", file=sys.stderr)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        with open_record_file(args.records) as records:
+            results = template.merge_many(iter_merge_records(records, record_format),
+                                          fill_defaults=not args.no_defaults, strict=args.strict)
+            written, failed = write_merged(results, output, on_error=report)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Merged {written} payloads ({failed} failed records)", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, SRC_DIR)
+
+from clm_simulator import CLMSimulator, SimulatorConfig  # noqa: E402
+
+@pytest.fixture
+def simulator():
+    """A local CLM stand-in on a free port, stopped after the test"""
+    with CLMSimulator(SimulatorConfig(seed=1)) as simulator:
+        yield simulator
+
+@pytest.fixture
+def client(simulator):
+    from clm_client import CLMClient
+    return CLMClient('test-token', f"{simulator.base_url}/v2", max_retries=2)
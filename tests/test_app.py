@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import SRC_DIR
+
+AppTest = pytest.importorskip('streamlit.testing.v1').AppTest
+
+@pytest.fixture
+def app_test(simulator, tmp_path, monkeypatch):
+    """The app signed in against the simulator, run from a scratch directory so its logs stay out of the repo"""
+    monkeypatch.chdir(tmp_path)
+    for name, value in simulator.environment.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setenv('TASK_LEDGER_DB', str(tmp_path / 'ledger.db'))
+    at = AppTest.from_file(f"{SRC_DIR}/app.py", default_timeout=30)
+    at.session_state.authenticated = True
+    at.session_state.token_data = {'access_token': 'test-token', 'refresh_token': 'refresh', 'token_type': 'Bearer',
+                                   'expires_in': 28800, 'timestamp': datetime.now().isoformat()}
+    at.session_state.account_id = 'acct'
+    return at
+
+def test_docgen_fetches_each_configuration_page_once(app_test, simulator):
+    app_test.session_state.current_view = 'docgen'
+    app_test.run()
+    assert not app_test.exception
+    # The first page is rendered straight away and each rerun appends the next one
+    assert len(app_test.session_state.config_catalog) == 250
+    assert app_test.session_state.configs_next_url is None
+    assert app_test.selectbox[0].options
+    assert simulator.server.state.request_count == 3
+
+    app_test.run()
+    assert simulator.server.state.request_count == 3
@@ -0,0 +1,33 @@
+import os
+import sys
+
+from conftest import SRC_DIR
+
+sys.path.insert(0, os.path.join(os.path.dirname(SRC_DIR), 'benchmarks'))
+
+from bench_clm import check_limits, compare_to_baseline, working_directory  # noqa: E402
+
+def results(**benchmarks):
+    return {'results': benchmarks}
+
+def test_payloads_over_their_limit_fail():
+    current = results(catalog={'emitted_bytes': 5200, 'emitted_bytes_limit': 5000}, parse={'ops_per_second': 10})
+    assert check_limits(current) == ['catalog']
+    assert check_limits(results(catalog={'emitted_bytes': 3800, 'emitted_bytes_limit': 5000})) == []
+
+def test_slower_or_larger_results_are_regressions():
+    baseline = results(parse={'ops_per_second': 100}, render={'ops_per_second': 100},
+                       catalog={'ops_per_second': 5, 'emitted_bytes': 3800})
+    current = results(parse={'ops_per_second': 80}, render={'ops_per_second': 90},
+                      catalog={'ops_per_second': 5, 'emitted_bytes': 3900}, new={'ops_per_second': 1})
+    assert compare_to_baseline(current, baseline, tolerance=0.15) == ['parse', 'catalog']
+
+def test_working_directory_is_restored(tmp_path):
+    before = os.getcwd()
+    try:
+        with working_directory(str(tmp_path)):
+            assert os.getcwd() == str(tmp_path)
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert os.getcwd() == before
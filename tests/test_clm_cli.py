@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+import clm_cli
+from conftest import SRC_DIR
+
+@pytest.fixture
+def output(monkeypatch):
+    """Everything the CLI writes to stdout, as the objects it serialised"""
+    written = []
+    monkeypatch.setattr(clm_cli, 'write_json', lambda data: written.append(data))
+    monkeypatch.setattr(clm_cli, 'write_json_line', lambda data: written.append(data))
+    return written
+
+@pytest.fixture
+def run(simulator, tmp_path):
+    def run(*argv):
+        return clm_cli.main(['--token', 'test-token', '--account-id', 'acct', '--base-url', f"{simulator.base_url}/v2",
+                             '--ledger', str(tmp_path / 'ledger.db')] + list(argv))
+    return run
+
+def test_no_token_is_a_usage_error(monkeypatch, tmp_path):
+    monkeypatch.delenv('CLM_ACCESS_TOKEN', raising=False)
+    monkeypatch.setenv('TOKEN_PATH', str(tmp_path / 'missing.json'))
+    assert clm_cli.main(['--account-id', 'acct', 'configurations']) == 2
+
+def test_configurations_can_be_searched(run, output):
+    assert run('configurations', '--search', 'configuration 12', '--limit', '3') == 0
+    assert output[0][0]['Name'].startswith('Simulated Configuration 12 (')
+    assert output[0][0]['Href']
+
+def test_configurations_stream_as_lines(run, output):
+    assert run('configurations', '--jsonl') == 0
+    assert len(output) == 250
+
+def test_launches_are_recorded_and_listed_offline(run, output, tmp_path):
+    assert run('launch', '--config', 'config-href', '--xml', '<Data/>') == 0
+    assert run('start-workflow', '--name', 'Approve', '--xml', '<Params/>') == 0
+    output.clear()
+    assert clm_cli.main(['--ledger', str(tmp_path / 'ledger.db'), 'tasks', '--counts']) == 0
+    assert output == [{'Success': 1, 'Completed': 1}]
+    output.clear()
+    assert clm_cli.main(['--ledger', str(tmp_path / 'ledger.db'), 'tasks', '--kind', 'workflow']) == 0
+    assert [task['name'] for task in output] == ['Approve']
+
+def test_api_errors_exit_with_1(run, output, capsys):
+    assert run('launch', '--config', 'config-href', '--xml', '') == 1
+    assert 'API Error (400)' in capsys.readouterr().err
+
+def test_the_cli_does_not_import_streamlit():
+    code = "import sys, clm_cli; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR).returncode == 0
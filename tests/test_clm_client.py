@@ -0,0 +1,112 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from clm_client import CLMClient, CLMError, make_session
+from clm_simulator import CLMSimulator, SimulatorConfig
+
+@pytest.fixture
+def cookie_server():
+    """A server that sets a cookie on every response and records the Cookie headers it is sent"""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            received.append(self.headers.get('Cookie'))
+            self.send_response(200)
+            self.send_header('Set-Cookie', 'session=user-a; Path=/')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", received
+    server.shutdown()
+    server.server_close()
+
+def test_shared_session_keeps_no_cookies(cookie_server):
+    url, received = cookie_server
+    session = make_session()
+    first = CLMClient('token-a', url, session=session)
+    second = CLMClient('token-b', url, session=session)
+    first.request_json('GET', f"{url}/one")
+    second.request_json('GET', f"{url}/two")
+    assert len(session.cookies) == 0
+    assert received == [None, None]
+
+def test_server_errors_are_retried_then_reported():
+    with CLMSimulator(SimulatorConfig(seed=1, error_rate=1.0)) as simulator:
+        retries = []
+        client = CLMClient('test-token', f"{simulator.base_url}/v2", max_retries=3, on_retry=retries.append)
+        with pytest.raises(CLMError) as raised:
+            client.get_configurations('acct')
+        assert raised.value.status_code == 500
+        assert simulator.server.state.request_count == 3
+        assert len(retries) == 2
+
+def test_throttling_gives_up_with_429():
+    with CLMSimulator(SimulatorConfig(seed=1, throttle_rate=1.0, retry_after_seconds=0)) as simulator:
+        client = CLMClient('test-token', f"{simulator.base_url}/v2", max_retries=2)
+        with pytest.raises(CLMError) as raised:
+            client.start_workflow('acct', 'Approve', '<Params/>')
+        assert raised.value.status_code == 429
+
+def test_configuration_pages_are_followed(client):
+    configurations = client.get_configurations('acct')
+    assert configurations['Total'] == 250
+    assert len({item['Href'] for item in configurations['Items']}) == 250
+
+class RecordingRedirects(BaseHTTPRequestHandler):
+    """HEAD /redirect?to=<url> answers 302 to that URL; anything else is 200. Authorization headers are recorded."""
+
+    seen = []
+
+    def do_HEAD(self):
+        self.seen.append((self.headers.get('Host'), self.path, self.headers.get('Authorization')))
+        if self.path.startswith('/redirect?to='):
+            self.send_response(302)
+            self.send_header('Location', self.path[len('/redirect?to='):])
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def redirect_server():
+    RecordingRedirects.seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingRedirects)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], RecordingRedirects.seen
+    server.shutdown()
+    server.server_close()
+
+def test_result_urls_resolve_to_the_doclauncher_form(client):
+    task = client.create_doc_launcher_task('acct', 'config-href', '<Data/>')
+    resolved = client.resolve_result_url(task['DocLauncherResultUrl'])
+    assert resolved.endswith(f"/doclauncher/form/{task['Href'].rsplit('/', 1)[1]}")
+
+def test_the_token_is_not_sent_to_another_host(redirect_server):
+    port, seen = redirect_server
+    client = CLMClient('secret-token', f"http://127.0.0.1:{port}")
+    same_host = f"http://127.0.0.1:{port}/form"
+    assert client.resolve_result_url(f"http://127.0.0.1:{port}/redirect?to={same_host}") == same_host
+    other_host = f"http://localhost:{port}/form"
+    assert client.resolve_result_url(f"http://127.0.0.1:{port}/redirect?to={other_host}") == other_host
+    authorization = [(host.split(':')[0], auth) for host, _, auth in seen]
+    assert authorization == [('127.0.0.1', 'Bearer secret-token'), ('127.0.0.1', 'Bearer secret-token'),
+                             ('127.0.0.1', 'Bearer secret-token'), ('localhost', None)]
+
+def test_redirect_loops_give_up(redirect_server):
+    port, _ = redirect_server
+    url = f"http://127.0.0.1:{port}/redirect?to=/redirect?to=/redirect?to=/redirect?to=/redirect?to=/redirect?to=/x"
+    with pytest.raises(CLMError, match='redirects'):
+        CLMClient('token', f"http://127.0.0.1:{port}").resolve_result_url(url)
@@ -0,0 +1,45 @@
+import time
+
+import requests
+
+from clm_simulator import CLMSimulator, SimulatorConfig
+
+def test_configurations_are_paged_with_next_links(simulator):
+    url = f"{simulator.base_url}/v2/acct/doclauncherconfigurations?limit=100"
+    pages = 0
+    names = []
+    while url:
+        body = requests.get(url, timeout=5).json()
+        names.extend(item['Name'] for item in body['Items'])
+        url = body.get('Next')
+        pages += 1
+    assert pages == 3 and len(set(names)) == 250
+
+def test_tasks_finish_after_task_seconds():
+    with CLMSimulator(SimulatorConfig(seed=1, task_seconds=0.2)) as simulator:
+        task = requests.post(f"{simulator.base_url}/v2/acct/doclaunchertasks", timeout=5,
+                             json={'Data': '<Data/>', 'DocLauncherConfiguration': {'Href': 'h'}}).json()
+        assert task['Status'] == 'Processing'
+        time.sleep(0.25)
+        assert requests.get(task['Href'], timeout=5).json()['Status'] == 'Success'
+
+def test_bad_requests_and_unknown_routes(simulator):
+    assert requests.post(f"{simulator.base_url}/v2/acct/doclaunchertasks", json={}, timeout=5).status_code == 400
+    assert requests.get(f"{simulator.base_url}/v2/acct/nothing", timeout=5).status_code == 404
+
+def test_the_rate_limit_answers_429_with_retry_after():
+    with CLMSimulator(SimulatorConfig(seed=1, rate_limit=3, retry_after_seconds=2)) as simulator:
+        responses = [requests.get(f"{simulator.base_url}/v2/acct/documents/1", timeout=5) for _ in range(5)]
+    assert [response.status_code for response in responses].count(429) == 2
+    assert responses[-1].headers['Retry-After'] == '2'
+
+def test_document_content_supports_ranges(simulator):
+    url = f"{simulator.base_url}/v2/acct/documents/1/content"
+    whole = requests.get(url, timeout=5)
+    part = requests.get(url, headers={'Range': 'bytes=100-', 'If-Range': whole.headers['ETag']}, timeout=5)
+    assert part.status_code == 206 and part.content == whole.content[100:]
+    stale = requests.get(url, headers={'Range': 'bytes=100-', 'If-Range': '"stale"'}, timeout=5)
+    assert stale.status_code == 200 and stale.content == whole.content
+
+def test_environment_points_the_app_at_the_simulator(simulator):
+    assert all(simulator.base_url in value for value in simulator.environment.values() if value.startswith('http'))
@@ -0,0 +1,34 @@
+from config_catalog import ConfigCatalog, config_display_name
+
+def configs(*names):
+    return [{'Name': name, 'Id': str(n), 'Href': f"href/{n}"} for n, name in enumerate(names)]
+
+def test_display_names():
+    assert config_display_name({'Name': 'NDA', 'Id': '7'}) == 'NDA (7)'
+    assert config_display_name({'Name': 'NDA'}) == 'NDA'
+    assert config_display_name({}) == 'Unnamed'
+
+def test_pages_extend_the_index_and_later_hrefs_win():
+    catalog = ConfigCatalog(configs('NDA', 'MSA'))
+    catalog.add_items([{'Name': 'NDA', 'Id': '0', 'Href': 'href/new'}, {'Name': 'SOW', 'Id': '2', 'Href': 'href/2'}])
+    assert len(catalog) == 3
+    assert catalog.href_for('NDA (0)') == 'href/new'
+    assert catalog.href_for('missing') is None
+
+def test_ranking_puts_prefixes_before_substrings():
+    catalog = ConfigCatalog(configs('Master Services Agreement', 'Services Order', 'Professional Services', 'NDA'))
+    results = catalog.search('services')
+    assert results[0] == 'Services Order (1)'
+    assert set(results) == {'Services Order (1)', 'Master Services Agreement (0)', 'Professional Services (2)'}
+    # Fuzzy matches only fill the list after the token matches
+    assert catalog.search('mast serv')[0] == 'Master Services Agreement (0)'
+    assert catalog.search('vices ord')[0] == 'Services Order (1)'
+
+def test_empty_queries_list_in_fetch_order():
+    catalog = ConfigCatalog(configs(*[f"Config {n}" for n in range(30)]))
+    assert catalog.search('', limit=3) == ['Config 0 (0)', 'Config 1 (1)', 'Config 2 (2)']
+
+def test_misspellings_fall_back_to_fuzzy_matches():
+    catalog = ConfigCatalog(configs('Purchase Agreement', 'Employment Offer'))
+    assert catalog.search('purchse agreemnt')[0] == 'Purchase Agreement (0)'
+    assert catalog.search('zzzz') == []
@@ -0,0 +1,50 @@
+import pytest
+
+from customer_directory import InMemoryCustomerDirectory, SQLiteCustomerDirectory, customers_from_records
+
+CUSTOMERS = [
+    {"id": "1", "name": "Acme Industries", "billing": {"city": "Denver", "country": "US"}},
+    {"id": "2", "name": "Globex", "billing": {"city": "Berlin", "country": "DE"}},
+    {"id": "3", "name": "Industrial Light", "billing": {"city": "Paris", "country": "FR"}},
+]
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def directory(request, tmp_path):
+    if request.param == 'memory':
+        yield InMemoryCustomerDirectory(CUSTOMERS)
+        return
+    directory = SQLiteCustomerDirectory(str(tmp_path / 'customers.db'))
+    directory.import_customers(CUSTOMERS)
+    yield directory
+    directory.close()
+
+def names(customers):
+    return [customer["name"] for customer in customers]
+
+def test_lookups(directory):
+    assert directory.get(2)["name"] == "Globex"
+    assert directory.get_by_name("acme industries")["id"] == "1"
+    assert directory.get("missing") is None
+
+def test_search_pages_and_prefixes(directory):
+    assert names(directory.search(limit=2)) == ["Acme Industries", "Globex"]
+    assert names(directory.search(offset=2)) == ["Industrial Light"]
+    assert set(names(directory.search("ind"))) == {"Acme Industries", "Industrial Light"}
+    assert names(directory.search("glo")) == ["Globex"]
+
+def test_renaming_drops_the_old_name():
+    directory = InMemoryCustomerDirectory(CUSTOMERS)
+    directory.add({"id": "2", "name": "Initech"})
+    assert directory.get_by_name("Globex") is None
+    assert directory.get_by_name("initech")["id"] == "2"
+    assert names(directory.search()) == ["Acme Industries", "Industrial Light", "Initech"]
+
+def test_renaming_hands_a_shared_name_to_the_other_customer():
+    directory = InMemoryCustomerDirectory(CUSTOMERS + [{"id": "4", "name": "Globex"}])
+    directory.add({"id": "4", "name": "Globex East"})
+    assert directory.get_by_name("globex")["id"] == "2"
+
+def test_records_without_a_name_are_skipped():
+    customers = list(customers_from_records([{"name": "Acme", "city": "Denver"}, {"id": "x"}, ValueError()]))
+    assert customers == [{"id": "Acme", "name": "Acme", "billing": {
+        "address": "", "city": "Denver", "state": "", "postal_code": "", "country": ""}}]
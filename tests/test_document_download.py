@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+from clm_client import CLMClient
+from clm_simulator import CLMSimulator, SimulatorConfig
+from document_download import (download_document, download_documents, full_content_size, parse_content_range,
+                               parse_digest, safe_filename)
+
+SIZE = 64 * 1024
+
+def expected_content(doc_id, size=SIZE):
+    """What the simulator serves for a document"""
+    block = hashlib.sha256(doc_id.encode('utf-8')).digest() * 1024
+    return (block * (size // len(block) + 1))[:size]
+
+def test_header_parsing():
+    assert parse_content_range('bytes 100-199/200') == (100, 200)
+    assert parse_content_range('bytes 100-199/*') == (100, None)
+    assert parse_content_range('bytes */200') is None
+    assert parse_digest({'Digest': 'md5=abc, sha-256=AAEC'}) == '000102'
+    assert parse_digest({}) is None
+    assert full_content_size({'Content-Length': '10'}) == 10
+    assert full_content_size({'Content-Length': '10', 'Content-Encoding': 'gzip'}) is None
+
+def test_file_names_are_safe():
+    assert safe_filename('7', '../../etc/pass wd?.pdf') == '7_pass wd_.pdf'
+    assert safe_filename('7', '...') == '7'
+
+def test_documents_download_once_and_are_verified(tmp_path, simulator):
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    simulator.server.state.config.document_bytes = SIZE
+    results = list(download_documents(client, 'acct', ['a', 'b'], str(tmp_path), workers=2))
+    assert sorted(result.outcome for result in results) == ['downloaded', 'downloaded']
+    for result in results:
+        with open(result.path, 'rb') as f:
+            assert f.read() == expected_content(result.doc_id)
+    assert [result.outcome for result in download_documents(client, 'acct', ['a'], str(tmp_path))] == ['skipped']
+    assert not [name for name in os.listdir(tmp_path) if '.part' in name]
+
+def test_dropped_connections_resume(tmp_path):
+    with CLMSimulator(SimulatorConfig(seed=2, document_bytes=SIZE, interrupt_rate=0.5)) as simulator:
+        client = CLMClient('test-token', f"{simulator.base_url}/v2")
+        results = [download_document(client, 'acct', str(n), str(tmp_path), chunk_size=4096) for n in range(6)]
+    assert 'resumed' in [result.outcome for result in results]
+    for result in results:
+        if result.outcome == 'failed':
+            # Out of resumes; the partial file waits for the next run
+            assert 'run again' in result.error and os.path.exists(f"{result.path}.part")
+            continue
+        assert result.sha256 == hashlib.sha256(expected_content(result.doc_id)).hexdigest()
+
+def start_partial(client, directory, doc_id, content):
+    """Leave a .part file as an interrupted run would"""
+    path = os.path.join(directory, safe_filename(doc_id, client.get_document('acct', doc_id)['Name']))
+    response = client.open_document_content(client.document_content_url('acct', doc_id))
+    etag, sha256 = response.headers['ETag'], parse_digest(response.headers)
+    response.content  # Read the body so the connection is reused rather than reset
+    with open(f"{path}.part", 'wb') as f:
+        f.write(content)
+    with open(f"{path}.part.json", 'w', encoding='utf-8') as f:
+        json.dump({'etag': etag, 'sha256': sha256, 'size': SIZE}, f)
+    return path
+
+def test_interrupted_runs_resume_from_the_part_file(tmp_path, simulator):
+    simulator.server.state.config.document_bytes = SIZE
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    start_partial(client, str(tmp_path), 'c', expected_content('c')[:1000])
+    result = download_document(client, 'acct', 'c', str(tmp_path))
+    assert result.outcome == 'resumed' and result.bytes == SIZE
+
+def test_corrupt_partial_content_fails_the_checksum_and_is_dropped(tmp_path, simulator):
+    simulator.server.state.config.document_bytes = SIZE
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    path = start_partial(client, str(tmp_path), 'd', b'x' * 1000)
+    result = download_document(client, 'acct', 'd', str(tmp_path))
+    assert result.outcome == 'failed' and 'Checksum mismatch' in result.error
+    assert not os.path.exists(path) and not os.path.exists(f"{path}.part")
+    assert download_document(client, 'acct', 'd', str(tmp_path)).outcome == 'downloaded'
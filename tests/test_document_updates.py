@@ -0,0 +1,51 @@
+import io
+
+from clm_client import CLMClient
+from document_updates import (DocumentUpdate, UpdateJournal, UpdateResult, apply_updates, diff_attribute_groups,
+                              iter_updates, summarize)
+
+def test_diff_keeps_only_changed_values_with_their_metadata():
+    current = {'Terms': {'Region': {'AttributeType': 'Text', 'Value': 'EU'}, 'Years': {'Value': 3}}}
+    desired = {'Terms': {'Region': 'US', 'Years': '3', 'New': 'x'}}
+    assert diff_attribute_groups(current, desired) == {
+        'Terms': {'Region': {'AttributeType': 'Text', 'Value': 'US'}, 'New': {'Value': 'x'}}
+    }
+    assert diff_attribute_groups(current, {'Terms': {'Years': 3}}) == {}
+
+def test_csv_rows_are_combined_per_document():
+    rows = io.StringIO('doc_id,group,attribute,value\n1,G,A,x\n1,G,B,y\n2,G,A,z\n,G,A,q\n3,,A,q\n')
+    items = list(iter_updates(rows, 'csv'))
+    assert items[0] == DocumentUpdate('1', {'G': {'A': 'x', 'B': 'y'}})
+    assert 'no doc_id' in items[1].error
+    assert 'needs group and attribute' in items[2].error
+    assert items[3] == DocumentUpdate('2', {'G': {'A': 'z'}})
+
+def test_jsonl_records_need_attribute_groups():
+    lines = io.StringIO('{"doc_id": "1", "AttributeGroups": {"G": {"A": 1}}}\n{"doc_id": "2"}\n')
+    items = list(iter_updates(lines, 'jsonl'))
+    assert items[0] == DocumentUpdate('1', {'G': {'A': 1}})
+    assert isinstance(items[1], UpdateResult) and items[1].outcome == 'failed'
+
+def test_updates_write_only_what_changed_and_resume_from_the_journal(tmp_path, simulator):
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    updates = [
+        DocumentUpdate('1', {'Group 1': {'Attribute 1': 'New value'}}),
+        DocumentUpdate('2', {'Group 1': {'Attribute 1': 'Value 1.1'}}),
+    ]
+    assert summarize(apply_updates(client, 'acct', updates, dry_run=True)) == {'dry_run': 1, 'unchanged': 1}
+    assert simulator.server.state.document_attributes == {}
+
+    journal_path = str(tmp_path / 'journal.jsonl')
+    with UpdateJournal(journal_path) as journal:
+        assert summarize(apply_updates(client, 'acct', updates, journal=journal)) == {'updated': 1, 'unchanged': 1}
+    assert simulator.server.state.document_attributes['1']['Group 1']['Attribute 1']['Value'] == 'New value'
+
+    with UpdateJournal(journal_path) as journal:
+        assert summarize(apply_updates(client, 'acct', updates, journal=journal)) == {'skipped': 2}
+
+def test_documents_split_across_the_stream_fail(simulator):
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    rows = io.StringIO('doc_id,group,attribute,value\n1,G,A,x\n2,G,A,y\n1,G,B,z\n')
+    results = list(apply_updates(client, 'acct', iter_updates(rows, 'csv')))
+    failed = [result for result in results if result.outcome == 'failed']
+    assert len(failed) == 1 and failed[0].doc_id == '1' and 'more than once' in failed[0].error
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import document_upload
+from clm_client import CLMClient
+from clm_simulator import CLMSimulator, SimulatorConfig
+from document_upload import UploadManifest, UploadProgress, iter_upload_files, upload_file, upload_files
+
+@pytest.fixture
+def files(tmp_path):
+    source = tmp_path / 'source'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'b.pdf').write_bytes(b'b' * 3000)
+    (source / 'sub' / 'a.txt').write_bytes(b'a' * 1000)
+    (source / '.hidden').write_bytes(b'h')
+    (source / 'c.pdf.part').write_bytes(b'p')
+    return source
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(document_upload, 'BACKOFF_BASE_SECONDS', 0)
+
+def test_directories_are_walked_in_order_without_hidden_or_partial_files(files):
+    paths = list(iter_upload_files([str(files), str(files / 'b.pdf')]))
+    assert [os.path.relpath(path, files) for path in paths] == ['b.pdf', os.path.join('sub', 'a.txt'), 'b.pdf']
+
+def test_uploads_are_recorded_and_skipped_on_rerun(files, tmp_path, simulator):
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    progress = UploadProgress()
+    with UploadManifest(manifest_path) as manifest:
+        results = list(upload_files(client, 'acct', 'folder', iter_upload_files([str(files)]),
+                                    workers=2, manifest=manifest, progress=progress))
+    assert sorted(result.outcome for result in results) == ['uploaded', 'uploaded']
+    assert progress.snapshot()['bytes_sent'] == 4000
+    assert sorted(size for _, _, size in simulator.server.state.uploads.values()) == [1000, 3000]
+
+    # A copy under another name has the same content, so it is skipped too
+    (files / 'copy.pdf').write_bytes(b'b' * 3000)
+    with UploadManifest(manifest_path) as manifest:
+        outcomes = {os.path.basename(result.path): result.outcome
+                    for result in upload_files(client, 'acct', 'folder', iter_upload_files([str(files)]), manifest=manifest)}
+        assert outcomes == {'a.txt': 'skipped', 'b.pdf': 'skipped', 'copy.pdf': 'skipped'}
+        # Another folder gets its own copy
+        assert upload_file(client, 'acct', 'other', str(files / 'b.pdf'), manifest=manifest).outcome == 'uploaded'
+
+def test_partial_manifest_lines_are_ignored(tmp_path):
+    path = tmp_path / 'manifest.jsonl'
+    path.write_text('{"folder_id": "f", "sha256": "x", "href": "h", "path": "/p", "size": 1, "mtime_ns": 1}\n{"folder',
+                    encoding='utf-8')
+    with UploadManifest(str(path)) as manifest:
+        assert manifest.href_for('f', 'x') == 'h'
+
+def test_throttled_uploads_are_retried_and_count_only_delivered_bytes(files):
+    with CLMSimulator(SimulatorConfig(seed=4, throttle_rate=0.5, retry_after_seconds=0)) as simulator:
+        client = CLMClient('test-token', f"{simulator.base_url}/v2")
+        progress = UploadProgress()
+        results = [upload_file(client, 'acct', 'folder', str(files / 'b.pdf'), progress=progress) for _ in range(4)]
+    uploaded = [result for result in results if result.outcome == 'uploaded']
+    assert any(result.attempts > 1 for result in results)
+    assert progress.snapshot()['bytes_sent'] == 3000 * len(uploaded)
+
+def test_unreadable_files_fail_without_an_attempt(files, simulator):
+    client = CLMClient('test-token', f"{simulator.base_url}/v2")
+    result = upload_file(client, 'acct', 'folder', str(files / 'missing.pdf'))
+    assert result.outcome == 'failed' and result.attempts == 0
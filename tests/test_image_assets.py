@@ -0,0 +1,40 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from image_assets import encode_image, hashed_stem, prune_static_dir, publish_image
+
+Image = pytest.importorskip('PIL.Image')
+
+def png_bytes(size):
+    buffer = BytesIO()
+    Image.new('RGB', size, (10, 120, 200)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def test_images_are_downscaled_to_the_smallest_encoding():
+    source = png_bytes((600, 300))
+    data, extension = encode_image(source, max_size=100)
+    assert extension in ('png', 'webp')
+    assert len(data) <= len(source)
+    with Image.open(BytesIO(data)) as image:
+        assert image.size == (100, 50)
+
+def test_names_change_with_content_and_size():
+    assert hashed_stem('src/logo.png', b'a', 300).startswith('logo.')
+    assert hashed_stem('logo.png', b'a', 300) != hashed_stem('logo.png', b'b', 300)
+    assert hashed_stem('logo.png', b'a', 300) != hashed_stem('logo.png', b'a', 150)
+
+def test_publishing_is_idempotent_and_stale_copies_are_pruned(tmp_path):
+    image_dir, static_dir = tmp_path / 'image', tmp_path / 'static'
+    image_dir.mkdir()
+    (image_dir / 'card.png').write_bytes(png_bytes((400, 400)))
+    first = publish_image('card.png', 100, str(image_dir), str(static_dir))
+    assert publish_image('card.png', 100, str(image_dir), str(static_dir)) == first
+
+    (image_dir / 'card.png').write_bytes(png_bytes((500, 400)))
+    second = publish_image('card.png', 100, str(image_dir), str(static_dir))
+    assert second != first
+    (static_dir / 'notes.txt').write_text('kept')
+    assert prune_static_dir({second}, str(static_dir)) == [first]
+    assert sorted(os.listdir(static_dir)) == sorted([second, 'notes.txt'])
@@ -0,0 +1,15 @@
+import os
+import sys
+
+from conftest import SRC_DIR
+
+sys.path.insert(0, os.path.join(os.path.dirname(SRC_DIR), 'benchmarks'))
+
+from import_profile import profile_import  # noqa: E402
+
+def test_importing_the_app_defers_heavy_modules():
+    timings = profile_import('app')
+    assert 'app' in timings
+    # Loaded where they are first used, not at cold start
+    deferred = ('docusign_esign', 'webbrowser', 'dotenv', 'requests', 'clm_client', 'PIL')
+    assert [name for name in deferred if name in timings] == []
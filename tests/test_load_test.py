@@ -0,0 +1,29 @@
+import os
+import sys
+
+from conftest import SRC_DIR
+
+sys.path.insert(0, os.path.join(os.path.dirname(SRC_DIR), 'benchmarks'))
+
+from load_test import percentiles, summarize  # noqa: E402
+
+def session(timings, flows=1, failures=0, errors=(), cpu_seconds=0.5, rss_warm_mb=100.0, rss_peak_mb=110.0):
+    return {'timings': timings, 'flows': flows, 'failures': failures, 'errors': list(errors),
+            'cold_start_seconds': 1.0, 'cpu_seconds': cpu_seconds, 'rss_warm_mb': rss_warm_mb, 'rss_peak_mb': rss_peak_mb}
+
+def test_percentiles_are_in_milliseconds():
+    values = [n / 1000 for n in range(1, 101)]
+    assert percentiles(values) == {'p50_ms': 51.0, 'p90_ms': 91.0, 'p95_ms': 96.0, 'p99_ms': 100.0, 'max_ms': 100.0}
+    assert percentiles([]) == {}
+
+def test_sessions_are_aggregated():
+    summary = summarize([
+        session([('catalog', 0.1), ('docgen', 0.3)], errors=['boom']),
+        session([('catalog', 0.2)], flows=2, failures=1, errors=['boom'], rss_peak_mb=130.0),
+    ], wall_seconds=2.0)
+    assert (summary['sessions'], summary['reruns'], summary['flows'], summary['failed_flows']) == (2, 3, 3, 1)
+    assert summary['reruns_per_second'] == 1.5
+    assert summary['steps']['catalog']['count'] == 2
+    assert summary['cpu_ms_per_rerun'] == 1000 / 3
+    assert summary['rss_growth_mb_per_session'] == 20.0
+    assert summary['errors'] == ['boom']
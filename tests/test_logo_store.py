@@ -0,0 +1,48 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from logo_store import LogoError, LogoStore
+
+# Pillow is optional for the app, but these tests exercise the downsampling
+Image = pytest.importorskip('PIL.Image')
+
+def png_bytes(size, color=(200, 30, 30)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def test_logos_are_downsampled_and_stored_once(tmp_path):
+    store = LogoStore(str(tmp_path), max_size=64)
+    logo_id = store.put(png_bytes((400, 200)))
+    assert store.put(png_bytes((400, 200))) == logo_id
+    with Image.open(store.path(logo_id)) as image:
+        assert max(image.size) == 64
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_unknown_or_malformed_ids_have_no_path(tmp_path):
+    store = LogoStore(str(tmp_path))
+    assert store.path(None) is None
+    assert store.path('../secrets.png') is None
+    assert store.path('0' * 24 + '.png') is None
+
+def test_oldest_logos_are_pruned(tmp_path):
+    store = LogoStore(str(tmp_path), limit=2)
+    first = store.put(png_bytes((10, 10), (1, 1, 1)))
+    os.utime(store.path(first), (0, 0))
+    store.put(png_bytes((10, 10), (2, 2, 2)))
+    store.put(png_bytes((10, 10), (3, 3, 3)))
+    assert len(os.listdir(tmp_path)) == 2
+    assert store.path(first) is None
+
+@pytest.mark.parametrize('data', [b'not an image', png_bytes((20, 20))[:60]])
+def test_unreadable_uploads_raise_logo_error(tmp_path, data):
+    with pytest.raises(LogoError):
+        LogoStore(str(tmp_path)).put(data)
+
+def test_decompression_bombs_raise_logo_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100)
+    with pytest.raises(LogoError):
+        LogoStore(str(tmp_path)).put(png_bytes((50, 50)))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,60 @@
+import io
+import json
+
+import pytest
+
+from payload_stream import (detect_format, iter_payloads, iter_records, main, parse_column_map,
+                            preview_payloads, template_for_columns)
+from payload_templates import PayloadTemplateError
+
+def records(rows):
+    return io.StringIO('\n'.join(rows) + '\n')
+
+def test_formats_come_from_the_extension():
+    assert detect_format('records.CSV') == 'csv'
+    assert detect_format('records.ndjson') == 'jsonl'
+    with pytest.raises(ValueError):
+        detect_format('records.xlsx')
+
+def test_csv_rows_with_the_wrong_number_of_values_are_errors():
+    items = list(iter_records(records(['a,b', '1,2', '1', '1,2,3']), 'csv'))
+    assert items[0] == {'a': '1', 'b': '2'}
+    assert isinstance(items[1], PayloadTemplateError) and 'fewer values' in str(items[1])
+    assert isinstance(items[2], PayloadTemplateError) and 'more values' in str(items[2])
+
+def test_bad_json_lines_are_reported_by_line():
+    items = list(iter_records(records(['{"a": 1}', '', '{oops']), 'jsonl'))
+    assert items[0] == {'a': 1}
+    assert 'Line 3' in str(items[1])
+
+def test_payloads_are_rendered_per_record():
+    template = template_for_columns({'CustomerName': 'name'})
+    results = list(iter_payloads(records(['name', 'Acme & Co', '']), 'csv', template))
+    assert len(results) == 1
+    assert results[0].error is None
+    assert '<CustomerName>Acme &amp; Co</CustomerName>' in results[0].payload
+
+def test_preview_reads_only_up_to_the_limit():
+    template = template_for_columns({'CustomerName': 'name'})
+    rows = ['name'] + [f"Customer {n}" for n in range(10)] + ['a,b']
+    preview = preview_payloads(records(rows), 'csv', template, preview_count=2, limit=5)
+    assert (preview.valid, preview.invalid, preview.truncated) == (5, 0, True)
+    assert len(preview.payloads) == 2
+
+    preview = preview_payloads(records(rows), 'csv', template, limit=100)
+    assert (preview.valid, preview.invalid, preview.truncated) == (10, 1, False)
+    assert preview.errors == ['Record 11: Line 12 has more values than there are columns']
+
+def test_column_maps_need_element_and_column():
+    assert parse_column_map(['CustomerName=name']) == {'CustomerName': 'name'}
+    with pytest.raises(Exception):
+        parse_column_map(['CustomerName'])
+
+def test_cli_writes_payload_lines(tmp_path):
+    source = tmp_path / 'records.csv'
+    source.write_text('name\nAcme\nShort,row\n', encoding='utf-8')
+    output = tmp_path / 'payloads.jsonl'
+    assert main([str(source), '--map', 'CustomerName=name', '-o', str(output)]) == 1
+    assert main([str(source), '--map', 'CustomerName=name', '-o', str(output), '--skip-invalid']) == 0
+    lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert [line['record'] for line in lines] == [1]
@@ -0,0 +1,46 @@
+import pytest
+
+from payload_templates import (DOCGEN_PARAMS_TEMPLATE, SOURCING_TEMPLATE, PayloadTemplate, PayloadTemplateError,
+                               compile_template_xml, escape_xml_text, parse_payload_xml)
+
+def test_values_are_escaped_and_control_characters_dropped():
+    assert escape_xml_text('<a & b>\x01') == '&lt;a &amp; b&gt;'
+    assert escape_xml_text(None) == ''
+    assert escape_xml_text(42) == '42'
+
+def test_nested_records_render_in_field_order():
+    record = {'agreement_type': 'MSA', 'customer': {'name': 'Acme {Corp}', 'billing': {
+        'address': '1 Main St', 'city': 'Denver', 'state': 'CO', 'postal_code': '80202', 'country': 'US'}}}
+    payload = SOURCING_TEMPLATE.render(record)
+    root = parse_payload_xml(payload)
+    assert [child.tag for child in root] == SOURCING_TEMPLATE.fields
+    assert root.find('Account_Name').text == 'Acme {Corp}'
+    assert payload.startswith('<?xml')
+
+def test_missing_fields_are_named():
+    with pytest.raises(PayloadTemplateError, match='Billing_City'):
+        SOURCING_TEMPLATE.render({'agreement_type': 'MSA', 'customer': {'name': 'Acme', 'billing': {}}})
+    assert DOCGEN_PARAMS_TEMPLATE.missing_fields({}) == ['Source']
+
+def test_bad_templates_are_rejected():
+    with pytest.raises(PayloadTemplateError):
+        PayloadTemplate(['1bad'])
+    with pytest.raises(PayloadTemplateError):
+        PayloadTemplate(['Name', 'Name'])
+    with pytest.raises(PayloadTemplateError):
+        PayloadTemplate(['Name'], root='bad root')
+
+def test_render_many_can_skip_invalid_records():
+    template = PayloadTemplate(['Name'], declaration=None)
+    records = [{'Name': 'a'}, {}, {'Name': 'b'}]
+    assert len(list(template.render_many(records, skip_invalid=True))) == 2
+    with pytest.raises(PayloadTemplateError):
+        list(template.render_many(records))
+
+def test_compiled_templates_keep_root_and_literal_names():
+    template = compile_template_xml('<Data kind="x"><Customer.Name/><City/></Data>')
+    assert template.fields == ['Customer.Name', 'City']
+    payload = template.render({'Customer.Name': 'Acme', 'City': 'Denver'})
+    assert payload.startswith('<Data kind="x">')
+    with pytest.raises(PayloadTemplateError, match='not well-formed'):
+        compile_template_xml('<Data>')
@@ -0,0 +1,97 @@
+import socket
+import threading
+
+import pytest
+
+from clm_client import CLMClient, CLMError
+from region_routing import DEFAULT_REGION, EndpointPool, RegionResolver, parse_account_regions
+
+def unused_url():
+    """A local URL nothing listens on, so connecting to it is refused"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/v2"
+
+@pytest.fixture
+def hangup_url():
+    """A server that accepts connections, reads the request and hangs up without answering"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    received = []
+
+    def serve():
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return
+            received.append(connection.recv(65536))
+            connection.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}/v2", received
+    server.close()
+
+def test_parse_account_regions_skips_malformed_pairs():
+    assert parse_account_regions(' a = na11, b=eu11, bad,=x ') == {'a': 'na11', 'b': 'eu11'}
+
+def test_accounts_resolve_to_their_region():
+    resolver = RegionResolver(account_regions={'eu-account': 'eu11'})
+    assert resolver.base_url('eu-account') == 'https://apieu11.springcm.com/v2'
+    assert resolver.region_for('other').code == DEFAULT_REGION
+    assert resolver.pool_for('eu-account').upload_url == 'https://apiuploadeu11.springcm.com/v2'
+
+def test_unknown_region_is_an_error():
+    with pytest.raises(ValueError):
+        RegionResolver(account_regions={'a': 'mars1'}).pool_for('a')
+
+def test_pool_prefers_the_fastest_healthy_endpoint():
+    pool = EndpointPool(['https://a', 'https://b', 'https://c'])
+    assert pool.base_url == 'https://a'
+    pool.record('https://a', latency=0.2)
+    pool.record('https://b', latency=0.05)
+    assert pool.base_url == 'https://b'
+    pool.mark_down('https://b')
+    assert pool.base_url == 'https://a'
+    for url in pool.urls:
+        pool.mark_down(url)
+    # With nothing known to be up, the primary is tried
+    assert pool.base_url == 'https://a'
+
+def test_probes_rank_the_live_endpoint_first(simulator):
+    dead = unused_url()
+    resolver = RegionResolver(override_urls=[dead, f"{simulator.base_url}/v2"],
+                              probe=lambda url: CLMClient('t', url).session.get(url, timeout=2).elapsed.total_seconds())
+    pool = resolver.pool_for('acc')
+    resolver.probe_all()
+    assert pool.base_url == f"{simulator.base_url}/v2"
+    assert [status['healthy'] for status in pool.status()] == [False, True]
+
+def test_refused_connections_fail_over_without_using_a_retry(simulator):
+    pool = EndpointPool([unused_url(), f"{simulator.base_url}/v2"])
+    retries = []
+    client = CLMClient('t', endpoints=pool, max_retries=2, on_retry=retries.append)
+    pages = list(client.iter_configuration_pages('acc'))
+    assert pages and client.base_url == f"{simulator.base_url}/v2"
+    assert retries == []
+
+def test_bodies_sent_once_are_not_failed_over(simulator, tmp_path):
+    pool = EndpointPool([unused_url(), f"{simulator.base_url}/v2"])
+    client = CLMClient('t', endpoints=pool)
+    with pytest.raises(CLMError):
+        client.request('POST', f"{pool.base_url}/acc/doclaunchertasks", ok_statuses=(200, 201),
+                       json={}, max_retries=1)
+    assert simulator.server.state.request_count == 0
+    # The dead endpoint is out of rotation for the next call
+    assert client.base_url == f"{simulator.base_url}/v2"
+
+def test_requests_the_server_may_have_seen_are_not_sent_elsewhere(simulator, hangup_url):
+    url, received = hangup_url
+    pool = EndpointPool([url, f"{simulator.base_url}/v2"])
+    client = CLMClient('t', endpoints=pool, max_retries=1)
+    with pytest.raises(CLMError):
+        client.request('POST', f"{url}/acc/doclaunchertasks", ok_statuses=(200, 201), json={'a': 1})
+    assert len(received) == 1
+    assert simulator.server.state.request_count == 0
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from clm_client import CLMClient, CLMError
+from clm_simulator import CLMSimulator, SimulatorConfig
+from request_coalescer import RequestCoalescer
+
+def run_together(coalescer, key, func, callers=5):
+    """Call coalescer.do from several threads while func is held open, returning results or errors"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return func()
+
+    def call(_):
+        try:
+            return coalescer.do(key, slow)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        futures = [executor.submit(call, n) for n in range(callers)]
+        started.wait(5)
+        # Let the followers join the call in flight before it finishes
+        while coalescer.shared < callers - 1:
+            threading.Event().wait(0.01)
+        release.set()
+        return [future.result() for future in futures]
+
+def test_concurrent_callers_share_one_call():
+    coalescer = RequestCoalescer()
+    results = run_together(coalescer, 'key', lambda: {'n': 1})
+    assert all(result == {'n': 1} for result in results)
+    assert (coalescer.calls, coalescer.shared) == (1, 4)
+
+def test_errors_reach_every_waiter_as_their_own_copy():
+    coalescer = RequestCoalescer()
+
+    def fail():
+        raise CLMError("API Error (500)", status_code=500)
+
+    errors = run_together(coalescer, 'key', fail)
+    assert all(isinstance(error, CLMError) and error.status_code == 500 for error in errors)
+    assert len({id(error) for error in errors}) == len(errors)
+
+def test_nothing_is_kept_after_a_call():
+    coalescer = RequestCoalescer()
+    assert coalescer.do('key', lambda: 1) == 1
+    assert coalescer.do('key', lambda: 2) == 2
+    with pytest.raises(ValueError):
+        coalescer.do('key', lambda: int('x'))
+    assert coalescer.do('key', lambda: 3) == 3
+
+def test_clients_share_reads_but_not_across_tokens():
+    with CLMSimulator(SimulatorConfig(seed=1, latency_ms=200, configuration_count=10)) as simulator:
+        coalescer = RequestCoalescer()
+        url = f"{simulator.base_url}/v2"
+        clients = [CLMClient('token-a', url, coalescer=coalescer) for _ in range(4)] + [CLMClient('token-b', url, coalescer=coalescer)]
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            results = list(executor.map(lambda client: client.get_configurations('acct'), clients))
+        assert all(result['Total'] == 10 for result in results)
+        assert simulator.server.state.request_count == 2
@@ -0,0 +1,64 @@
+import cProfile
+import os
+import time
+
+import rerun_profiler
+from rerun_profiler import RerunProfile, SlowRerunDumps, begin_rerun, current, end_rerun, stage
+
+def test_stages_nest_and_split_self_time():
+    begin_rerun('view:test')
+    with stage('outer'):
+        time.sleep(0.02)
+        with stage('inner'):
+            time.sleep(0.02)
+        with stage('inner'):
+            pass
+    profile = end_rerun()
+    timings = {timing.path: timing for timing in profile.stages()}
+    assert list(timings) == ['outer', 'outer > inner']
+    assert timings['outer > inner'].calls == 2
+    assert timings['outer'].total_ms >= timings['outer > inner'].total_ms + 15
+    assert abs(timings['outer'].self_ms - (timings['outer'].total_ms - timings['outer > inner'].total_ms)) < 1
+    assert current() is None
+
+def test_recursive_stages_count_once():
+    begin_rerun()
+    with stage('fetch'):
+        with stage('fetch'):
+            pass
+    assert [timing.calls for timing in end_rerun().stages()] == [1]
+
+def test_stages_outside_a_rerun_do_nothing():
+    with stage('idle'):
+        pass
+    assert end_rerun() is None
+
+def test_open_stages_are_closed_at_the_end():
+    begin_rerun()
+    current().enter('left-open')
+    profile = end_rerun()
+    assert profile.stages()[0].calls == 1
+    assert profile.unaccounted_ms() >= 0
+
+def test_timed_leaves_functions_alone_when_disabled(monkeypatch):
+    monkeypatch.setattr(rerun_profiler, 'ENABLED', False)
+    func = lambda: 1
+    assert rerun_profiler.timed()(func) is func
+    monkeypatch.setattr(rerun_profiler, 'ENABLED', True)
+    assert rerun_profiler.timed('named')(func) is not func
+
+def profiled_rerun(total_ms, label='view:docgen'):
+    profile = RerunProfile(label)
+    profile.profiler = cProfile.Profile()
+    profile.finished = profile.started + total_ms / 1000
+    return profile
+
+def test_only_the_slowest_dumps_are_kept(tmp_path):
+    dumps = SlowRerunDumps(str(tmp_path), keep=2, threshold_ms=100)
+    assert dumps.add(profiled_rerun(50)) is None
+    for total_ms in (300, 200, 400):
+        assert dumps.add(profiled_rerun(total_ms))
+    assert dumps.add(profiled_rerun(150)) is None
+    kept = sorted(os.listdir(tmp_path))
+    assert [name[:9] for name in kept] == ['0000300ms', '0000400ms']
+    assert all('view_docgen' in name for name in kept)
@@ -0,0 +1,19 @@
+from static_assets import ASSETS, feature_card_html, minify_css, minify_js
+
+def test_css_is_minified():
+    assert minify_css('/* card */\n.a > .b {\n  color: red;\n  margin: 0;\n}\n') == '.a>.b{color:red;margin:0}'
+
+def test_js_comments_are_dropped_but_lines_kept():
+    script = "// hide messages\nconst a = 1; // one\n    if (a) {\n        go('http://x');\n    }\n"
+    assert minify_js(script) == "const a = 1;\nif (a) {\ngo('http://x');\n}"
+
+def test_assets_are_built_once():
+    assert ASSETS['catalog_styles'].startswith('<style>.feature-card{')
+    assert ASSETS['message_autohide'].startswith('<script>')
+
+def test_cards_escape_their_text():
+    card = feature_card_html('<b>Docs</b>', 'A & B', 'x.png" onerror="alert(1)')
+    assert '&lt;b&gt;Docs&lt;/b&gt;' in card
+    assert 'A &amp; B' in card
+    assert 'x.png&quot; onerror=&quot;alert(1)' in card
+    assert feature_card_html('<b>Docs</b>', 'A & B', 'x.png" onerror="alert(1)') is card
@@ -0,0 +1,52 @@
+import time
+
+from status_tracker import StatusTracker
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_polls_once_for_many_watchers_and_records_status():
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return {'contract_status': 'Draft'}
+
+    tracker = StatusTracker(fetch, min_interval=10, max_interval=10)
+    first = tracker.watch('https://status/1')
+    assert tracker.watch('https://status/1') is first
+    assert wait_for(lambda: first.status == 'Draft')
+    assert calls == ['https://status/1']
+
+def test_notify_merges_pushed_status_into_snapshot():
+    tracker = StatusTracker(lambda url: {'contract_status': 'Draft', 'contract_id': 7}, min_interval=10, max_interval=10)
+    snapshot = tracker.watch('https://status/2')
+    assert wait_for(lambda: snapshot.status == 'Draft')
+    assert tracker.notify('https://status/2', {'contract_status': 'Signed'})
+    assert snapshot.status == 'Signed' and snapshot.final and snapshot.pushed
+    assert snapshot.data['contract_id'] == 7
+
+def test_notify_never_moves_a_final_status_back():
+    tracker = StatusTracker(lambda url: {'contract_status': 'Signed'}, min_interval=10, max_interval=10)
+    snapshot = tracker.watch('https://status/3')
+    assert wait_for(lambda: snapshot.final)
+    tracker.notify('https://status/3', {'contract_status': 'In Review'})
+    assert snapshot.status == 'Signed' and snapshot.final
+
+def test_notify_ignores_unwatched_urls():
+    tracker = StatusTracker(lambda url: {}, min_interval=10, max_interval=10)
+    assert tracker.notify('https://status/unwatched', {'contract_status': 'Signed'}) is False
+
+def test_non_object_responses_are_errors_and_polling_continues():
+    responses = [['unexpected'], {'contract_status': 'Draft'}]
+    tracker = StatusTracker(lambda url: responses.pop(0) if len(responses) > 1 else responses[0],
+                            min_interval=0.05, max_interval=0.05)
+    snapshot = tracker.watch('https://status/4')
+    assert wait_for(lambda: snapshot.error is not None)
+    assert 'not a JSON object' in snapshot.error
+    assert wait_for(lambda: snapshot.status == 'Draft' and snapshot.error is None)
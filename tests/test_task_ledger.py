@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+import clm_cli
+from clm_client import CLMClient, CLMError
+from clm_simulator import CLMSimulator, SimulatorConfig
+from task_ledger import TaskLedger, payload_hash, reconcile_pending
+
+CONFIG_HREF = 'https://example.invalid/v2/acct/doclauncherconfigurations/1'
+
+def test_submissions_are_recorded_and_filtered(tmp_path):
+    ledger = TaskLedger(str(tmp_path / 'ledger.db'))
+    ledger.record_submission('acct', CONFIG_HREF, '<Data/>', {'Href': 'h1', 'Status': 'Processing'})
+    ledger.record_submission('acct', None, '<Params/>', {'Href': 'h2', 'Status': 'Completed'}, kind='workflow', name='Approve')
+    assert ledger.record_submission('acct', CONFIG_HREF, '<Data/>', {}) is None
+
+    assert ledger.get('h1')['payload_hash'] == payload_hash('<Data/>')
+    assert [task['href'] for task in ledger.pending()] == ['h1']
+    assert [task['href'] for task in ledger.recent(kind='workflow')] == ['h2']
+    assert ledger.status_counts() == {'Processing': 1, 'Completed': 1}
+
+def test_older_ledgers_gain_new_columns(tmp_path):
+    path = str(tmp_path / 'ledger.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE tasks (href TEXT PRIMARY KEY, account_id TEXT NOT NULL, config_href TEXT, "
+                     "payload_hash TEXT, submitted_at REAL NOT NULL, status TEXT, result_url TEXT, "
+                     "checked_at REAL, error TEXT)")
+    ledger = TaskLedger(path)
+    ledger.record_submission('acct', CONFIG_HREF, '<Data/>', {'Href': 'h1', 'Status': 'Processing'})
+    assert ledger.get('h1')['kind'] == 'doclauncher'
+
+def test_reconcile_refreshes_pending_tasks(tmp_path):
+    ledger = TaskLedger(str(tmp_path / 'ledger.db'))
+    with CLMSimulator(SimulatorConfig(seed=1, task_seconds=0.2)) as simulator:
+        client = CLMClient('test-token', f"{simulator.base_url}/v2")
+        for _ in range(3):
+            response_data = client.create_doc_launcher_task('acct', CONFIG_HREF, '<Data/>')
+            ledger.record_submission('acct', CONFIG_HREF, '<Data/>', response_data)
+        ledger.record_submission('acct', CONFIG_HREF, '<Data/>',
+                                 {'Href': f"{simulator.base_url}/v2/acct/doclaunchertasks/missing", 'Status': 'Processing'})
+        time.sleep(0.3)
+        totals = reconcile_pending(ledger, client, batch_size=2, workers=2)
+    assert totals == {'checked': 4, 'changed': 3, 'failed': 1}
+    assert ledger.status_counts() == {'Success': 3, 'Processing': 1}
+
+class ListClient:
+    """Answers every request with a JSON array, as a misbehaving proxy might"""
+
+    def request_json(self, method, url, **kwargs):
+        return []
+
+class FailingClient:
+    def request_json(self, method, url, **kwargs):
+        raise CLMError("API Error (404): Task not found", status_code=404)
+
+def test_non_object_task_responses_fail_only_that_task(tmp_path):
+    ledger = TaskLedger(str(tmp_path / 'ledger.db'))
+    ledger.record_submission('acct', CONFIG_HREF, '<Data/>', {'Href': 'h1', 'Status': 'Processing'})
+    assert reconcile_pending(ledger, ListClient()) == {'checked': 1, 'changed': 0, 'failed': 1}
+    task = ledger.get('h1')
+    assert task['status'] == 'Processing'
+    assert 'not a JSON object' in task['error']
+
+    assert reconcile_pending(ledger, FailingClient())['failed'] == 1
+    assert 'Task not found' in ledger.get('h1')['error']
+
+def test_launch_batch_reports_tasks_it_could_not_record(tmp_path, monkeypatch):
+    records = tmp_path / 'records.csv'
+    records.write_text('name\nAlice\nBob\n', encoding='utf-8')
+
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    outcomes = []
+    monkeypatch.setattr(TaskLedger, 'record_submission', fail)
+    monkeypatch.setattr(clm_cli, 'write_json_line', outcomes.append)
+    with CLMSimulator(SimulatorConfig(seed=1)) as simulator:
+        exit_code = clm_cli.main(['--token', 'test-token', '--account-id', 'acct',
+                                  '--base-url', f"{simulator.base_url}/v2", '--ledger', str(tmp_path / 'ledger.db'),
+                                  'launch-batch', '--config', CONFIG_HREF, '--records', str(records),
+                                  '--map', 'Name=name'])
+    assert exit_code == 0
+    assert len(outcomes) == 2
+    for outcome in outcomes:
+        assert outcome['ok'] and outcome['href']
+        assert 'not recorded in the ledger' in outcome['error']
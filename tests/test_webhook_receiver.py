@@ -0,0 +1,72 @@
+import json
+
+import pytest
+import requests
+
+from task_ledger import TaskLedger
+from status_tracker import StatusTracker
+from webhook_receiver import (EventStore, WebhookReceiver, parse_event, sign_payload, update_ledger,
+                              verify_signature)
+
+SECRET = 'test-secret'
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = TaskLedger(str(tmp_path / 'ledger.db'))
+    yield ledger
+    ledger.close()
+
+@pytest.fixture
+def receiver(tmp_path):
+    receiver = WebhookReceiver(EventStore(str(tmp_path / 'events.db')), [SECRET], host='127.0.0.1', port=0).start()
+    yield receiver
+    receiver.stop()
+
+def post(receiver, event, secret=SECRET):
+    body = json.dumps(event).encode('utf-8')
+    headers = {'Content-Type': 'application/json', 'X-DocuSign-Signature-1': sign_payload(body, secret)}
+    return requests.post(receiver.url, data=body, headers=headers, timeout=5)
+
+def test_verify_signature_accepts_any_configured_secret():
+    body = b'{"EventId": "1"}'
+    headers = {'X-DocuSign-Signature-1': 'wrong', 'X-DocuSign-Signature-2': sign_payload(body, 'old')}
+    assert verify_signature(body, headers, ['new', 'old'])
+    assert not verify_signature(body, headers, ['new'])
+
+def test_parse_event_fingerprint_ignores_retry_count():
+    first = parse_event(json.dumps({'event': 'envelope-completed', 'retryCount': 0}))
+    again = parse_event(json.dumps({'event': 'envelope-completed', 'retryCount': 3}))
+    assert first.event_id == again.event_id
+
+def test_parse_event_rejects_non_objects():
+    with pytest.raises(ValueError):
+        parse_event('[1, 2]')
+
+def test_update_ledger_never_moves_a_final_task_back(ledger):
+    href = ledger.record_submission('acc', 'cfg', '<x/>', {'Href': 'https://clm/tasks/1', 'Status': 'Success'})
+    event = parse_event(json.dumps({'EventId': 'e1', 'Href': href, 'Status': 'Processing'}))
+    assert not update_ledger(ledger, event)
+    assert ledger.get(href)['status'] == 'Success'
+
+def test_signed_events_are_applied_once(receiver, ledger):
+    href = ledger.record_submission('acc', 'cfg', '<x/>', {'Href': 'https://clm/tasks/2', 'Status': 'Processing'})
+    receiver.subscribe(lambda event: update_ledger(ledger, event))
+    event = {'EventId': 'e2', 'EventType': 'TaskCompleted', 'Href': href, 'Status': 'Success'}
+    assert post(receiver, event).json() == {'received': True, 'duplicate': False}
+    assert post(receiver, event).json() == {'received': True, 'duplicate': True}
+    assert ledger.get(href)['status'] == 'Success'
+    assert receiver.received == 1 and receiver.duplicates == 1
+
+def test_unsigned_events_are_rejected(receiver):
+    assert post(receiver, {'EventId': 'e3'}, secret='wrong').status_code == 401
+    assert receiver.received == 0
+
+def test_clm_status_events_reach_the_status_tracker(receiver):
+    # Wired the way the app wires it: the CLM Status field becomes the contract status
+    tracker = StatusTracker(lambda url: {'contract_status': 'Draft'}, min_interval=60, max_interval=60)
+    url = 'https://telemetry/services/getStatus/a/b'
+    snapshot = tracker.watch(url)
+    receiver.subscribe(lambda event: event.subject and event.status and
+                       tracker.notify(event.subject, {'contract_status': event.status}))
+    post(receiver, {'EventId': 'e4', 'Href': url, 'Status': 'Signed'})
+    assert snapshot.status == 'Signed' and snapshot.final and snapshot.pushed
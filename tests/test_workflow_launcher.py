@@ -0,0 +1,60 @@
+import io
+import time
+
+from clm_client import CLMClient
+from clm_simulator import CLMSimulator, SimulatorConfig
+from rate_limiter import RateLimiter
+from workflow_launcher import LaunchResult, WorkflowLaunch, iter_workflow_launches, launch_workflows, limiter_for
+
+class CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(1000)
+        self.calls = 0
+
+    def acquire(self, amount=1):
+        self.calls += 1
+        super().acquire(amount)
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(20)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    # The first call uses the burst; the other four wait 50 ms each
+    assert time.monotonic() - started >= 0.18
+
+def test_limiter_is_shared_per_account():
+    first = limiter_for('acct-shared', 5)
+    assert limiter_for('acct-shared') is first
+    assert first.rate == 5
+    assert limiter_for('acct-shared', 2) is first and first.rate == 2
+    assert limiter_for('acct-other') is not first
+
+def test_launches_share_the_account_limiter(monkeypatch):
+    created = []
+    monkeypatch.setattr('workflow_launcher.RateLimiter', lambda rate: created.append(rate) or RateLimiter(rate))
+    with CLMSimulator(SimulatorConfig(seed=1)) as simulator:
+        client = CLMClient('test-token', f"{simulator.base_url}/v2")
+        for _ in range(3):
+            results = list(launch_workflows(client, 'acct-batch', [WorkflowLaunch(1, 'Approve', '<Params/>')],
+                                            workers=1, rate_per_second=1000))
+            assert results[0].error is None
+    assert created == [1000]
+
+def test_throttled_retries_wait_for_the_limiter():
+    with CLMSimulator(SimulatorConfig(seed=3, throttle_rate=0.5, retry_after_seconds=0)) as simulator:
+        client = CLMClient('test-token', f"{simulator.base_url}/v2", max_retries=10)
+        limiter = CountingLimiter()
+        launches = [WorkflowLaunch(n, 'Approve', '<Params/>') for n in range(1, 5)]
+        results = list(launch_workflows(client, 'acct', launches, workers=2, limiter=limiter))
+        assert all(result.error is None for result in results)
+        # Every request the server saw, first attempts and retries alike, went through the limiter
+        assert limiter.calls == simulator.server.state.request_count
+        assert limiter.calls > len(launches)
+
+def test_bad_records_become_failed_results():
+    records = io.StringIO('workflow,params\nApprove,<Params/>\n,<Params/>\nApprove,\n')
+    items = list(iter_workflow_launches(records, 'csv'))
+    assert items[0] == WorkflowLaunch(1, 'Approve', '<Params/>')
+    assert isinstance(items[1], LaunchResult) and 'no workflow name' in items[1].error
+    assert isinstance(items[2], LaunchResult) and 'no params' in items[2].error
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+from payload_templates import PayloadTemplateError
+from xml_merge import MergeTemplate, iter_xml_records, validate_payload, write_merged
+
+TEMPLATE = "<TemplateFieldData><Account_Name>Default</Account_Name><Billing.City>Leeds</Billing.City></TemplateFieldData>"
+
+def test_validate_payload_accepts_nested_elements_without_a_template():
+    assert validate_payload("<Params><Customer><Name>A</Name></Customer></Params>") == []
+
+def test_validate_payload_reports_malformed_xml():
+    problems = validate_payload("<Params><Customer></Params>")
+    assert len(problems) == 1 and "not well-formed" in problems[0]
+
+def test_validate_payload_against_a_template():
+    template = MergeTemplate(TEMPLATE)
+    problems = validate_payload("<TemplateFieldData><Account_Name>A</Account_Name><Extra>1</Extra></TemplateFieldData>",
+                                template)
+    assert problems == ["Missing elements: Billing.City", "Elements not in the template: Extra"]
+
+def test_merge_fills_defaults_and_reports_unknown_fields():
+    payload, unknown = MergeTemplate(TEMPLATE).merge({'Account_Name': 'Acme & Co', 'Zip': '1'})
+    assert "<Account_Name>Acme &amp; Co</Account_Name>" in payload
+    assert "<Billing.City>Leeds</Billing.City>" in payload
+    assert unknown == ['Zip']
+
+def test_field_names_with_dots_merge_literally():
+    payload, _ = MergeTemplate(TEMPLATE).merge({'Billing.City': 'York'})
+    assert "<Billing.City>York</Billing.City>" in payload
+
+def test_merge_without_defaults_fails_missing_fields():
+    with pytest.raises(PayloadTemplateError):
+        MergeTemplate(TEMPLATE).merge({'Account_Name': 'A'}, fill_defaults=False)
+
+@pytest.mark.parametrize('record', [[1, 2], {None: ['extra']}, {1: 'x'}])
+def test_malformed_records_fail_individually(record):
+    results = list(MergeTemplate(TEMPLATE).merge_many([{'Account_Name': 'A'}, record, {'Account_Name': 'B'}]))
+    assert [result.error is None for result in results] == [True, False, True]
+
+def test_strict_fails_unknown_fields():
+    [result] = MergeTemplate(TEMPLATE).merge_many([{'Account_Name': 'A', 'Zip': '1'}], strict=True)
+    assert result.payload is None and result.unknown_fields == ['Zip']
+
+def test_iter_xml_records_streams_many_records():
+    text = "<Records>" + "".join(f"<TemplateFieldData><Account_Name>{n}</Account_Name></TemplateFieldData>"
+                                 for n in range(5)) + "</Records>"
+    records = list(iter_xml_records(io.StringIO(text), chunk_size=16))
+    assert [record['Account_Name'] for record in records] == ['0', '1', '2', '3', '4']
+
+def test_iter_xml_records_single_document():
+    assert list(iter_xml_records(io.StringIO(TEMPLATE))) == [{'Account_Name': 'Default', 'Billing.City': 'Leeds'}]
+
+def test_write_merged_counts_and_reports_failures():
+    output, failures = io.StringIO(), []
+    results = MergeTemplate(TEMPLATE).merge_many([{'Account_Name': 'A'}, [1]])
+    assert write_merged(results, output, on_error=failures.append) == (1, 1)
+    assert len(output.getvalue().splitlines()) == 1 and failures[0].record_number == 2